@@ -1,15 +1,25 @@
 """API endpoints for Dockerfile generation"""
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Body
-from fastapi.responses import FileResponse, Response
-from typing import Dict
+from fastapi import APIRouter, HTTPException, Body, Header, Request
+from fastapi.responses import Response, StreamingResponse
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from uuid import uuid4
+import hashlib
+import json
 import logging
 
 from app.models.schemas import (
     GenerateRequest,
     GenerateResponse,
+    BatchGenerateRequest,
+    BatchGenerateResult,
+    MatrixGenerateRequest,
+    MatrixGenerateResponse,
     AnalyzeResponse,
     UploadResponse,
+    IntegrityReport,
+    ResumableUploadCreateRequest,
+    ResumableUploadStatus,
     PythonConfig,
     NodeJSConfig,
     JavaConfig,
@@ -25,56 +35,211 @@ from app.models.schemas import (
     HarborProjectCreateRequest,
     HarborProjectCreateResponse
 )
-from app.utils.security import validate_upload
+from app.config import RESUMABLE_MAX_CHUNK_SIZE, BATCH_MAX_ITEMS
+from app.utils.archive_guard import ArchiveGuardError
 from app.utils.file_handler import upload_manager
+from app.utils.file_response import conditional_file_response, etag_matches
+from app.utils.process_pool import analysis_pool
+from app.utils.resumable_upload import resumable_upload_manager
+from app.utils.session_reaper import session_reaper
+from app.utils.storage_quota import storage_quota
 from app.services.file_analyzer import file_analyzer
 from app.services.dockerfile_generator import dockerfile_generator
+from app.services.render_cache import render_cache
+from app.services.template_engine import template_engine
+from app.services.template_registry import template_registry
+from app.services.template_watcher import template_watcher
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-@router.post("/upload/java", response_model=UploadResponse)
-async def upload_java_artifact(
-    file: UploadFile = File(...),
-    background_tasks: BackgroundTasks = None
-):
+@router.post(
+    "/upload/java",
+    response_model=UploadResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["file"],
+                        "properties": {"file": {"type": "string", "format": "binary"}}
+                    }
+                }
+            }
+        }
+    }
+)
+async def upload_java_artifact(request: Request):
     """
     Upload JAR/WAR file for analysis
 
-    - Validates file type and size
-    - Analyzes JAR structure
-    - Returns project info and session ID
+    - Streams the file to disk while validating type, magic bytes and size
+    - Stores identical artifacts once and reuses their analysis
+    - Analyzes JAR structure and verifies member CRCs
+    - Returns project info, session ID, transfer stats and integrity report
     """
     try:
-        # Validate upload
-        await validate_upload(file)
+        # Validate and save in a single streaming pass
+        session_id, file_path, filename, stats, deduplicated = await upload_manager.save_stream(request)
+
+        # Analyze JAR file (reuses the stored analysis for known content)
+        project_info, integrity = await _analyze_uploaded_artifact(session_id, file_path, stats.sha256)
+
+        logger.info(f"Uploaded and analyzed Java artifact: {filename}")
+
+        return UploadResponse(
+            session_id=session_id,
+            filename=filename,
+            size=stats.bytes_received,
+            project_info=project_info,
+            stats=stats,
+            deduplicated=deduplicated,
+            integrity=integrity
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to upload Java artifact: {e}")
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+
+
+async def _analyze_uploaded_artifact(
+    session_id: str,
+    file_path: Path,
+    digest: str
+) -> tuple[ProjectInfo, Optional[IntegrityReport]]:
+    """
+    Analyze and verify a stored artifact, discarding its session if the archive is rejected
+
+    Args:
+        session_id: Session the artifact was stored under
+        file_path: Path to the artifact
+        digest: SHA-256 of the artifact
+
+    Returns:
+        tuple: (project_info, integrity_report)
+    """
+    try:
+        return await file_analyzer.inspect_java_artifact(file_path, digest=digest)
+    except ArchiveGuardError as e:
+        await upload_manager.discard_session(session_id)
+        logger.error(f"Rejected Java artifact ({e.code}): {e}")
+        raise HTTPException(
+            status_code=422,
+            detail=f"Archive rejected ({e.code}): {e}",
+            headers={"X-Error-Code": e.code}
+        )
+    except ValueError as e:
+        await upload_manager.discard_session(session_id)
+        logger.error(f"Rejected Java artifact: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except BaseException:
+        await upload_manager.discard_session(session_id)
+        raise
+
+
+@router.post("/upload/java/resumable", response_model=ResumableUploadStatus)
+async def create_resumable_upload(request: ResumableUploadCreateRequest):
+    """
+    Start a resumable JAR/WAR upload
+
+    - Validates filename, content type and declared size up front
+    - Returns an upload ID and the suggested chunk size
+    """
+    return await resumable_upload_manager.create(
+        filename=request.filename,
+        size=request.size,
+        content_type=request.content_type
+    )
 
-        # Save file
-        session_id, file_path = await upload_manager.save_upload(file)
 
-        # Get file size
-        file_size = file_path.stat().st_size
+@router.get("/upload/java/resumable/{upload_id}", response_model=ResumableUploadStatus)
+async def get_resumable_upload(upload_id: str):
+    """
+    Get resumable upload progress
 
-        # Analyze JAR file
-        project_info = await file_analyzer.analyze_java_artifact(file_path)
+    - Returns received bytes and the ranges still missing
+    """
+    return resumable_upload_manager.status(upload_id)
 
-        logger.info(f"Uploaded and analyzed Java artifact: {file.filename}")
+
+@router.patch("/upload/java/resumable/{upload_id}", response_model=ResumableUploadStatus)
+async def upload_resumable_chunk(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset"),
+    chunk_sha256: Optional[str] = Header(None, alias="X-Chunk-SHA256")
+):
+    """
+    Upload one chunk of a resumable upload
+
+    - Body: raw chunk bytes (application/offset+octet-stream)
+    - Upload-Offset: byte offset of the chunk
+    - X-Chunk-SHA256: optional hex digest the chunk must match
+    - Chunks may be sent in any order and in parallel
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > RESUMABLE_MAX_CHUNK_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Chunk too large. Maximum chunk size: {RESUMABLE_MAX_CHUNK_SIZE} bytes"
+        )
+
+    data = await request.body()
+    return await resumable_upload_manager.write_chunk(
+        upload_id=upload_id,
+        offset=upload_offset,
+        data=data,
+        checksum=chunk_sha256
+    )
+
+
+@router.post("/upload/java/resumable/{upload_id}/finalize", response_model=UploadResponse)
+async def finalize_resumable_upload(upload_id: str):
+    """
+    Finalize a resumable upload
+
+    - Validates the assembled JAR/WAR
+    - Stores it and analyzes JAR structure
+    - Returns project info and session ID
+    """
+    try:
+        session_id, file_path, filename, size, digest, deduplicated = \
+            await resumable_upload_manager.finalize(upload_id)
+
+        project_info, integrity = await _analyze_uploaded_artifact(session_id, file_path, digest)
+
+        logger.info(f"Finalized and analyzed Java artifact: {filename}")
 
         return UploadResponse(
             session_id=session_id,
-            filename=file.filename,
-            size=file_size,
-            project_info=project_info
+            filename=filename,
+            size=size,
+            project_info=project_info,
+            deduplicated=deduplicated,
+            integrity=integrity
         )
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to upload Java artifact: {e}")
+        logger.error(f"Failed to finalize resumable upload: {e}")
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
 
+@router.delete("/upload/java/resumable/{upload_id}")
+async def abort_resumable_upload(upload_id: str):
+    """
+    Abort a resumable upload and discard received chunks
+    """
+    await resumable_upload_manager.abort(upload_id)
+    return {"upload_id": upload_id, "status": "aborted"}
+
+
 @router.post("/analyze/python", response_model=AnalyzeResponse)
 async def analyze_python_config(config: PythonConfig):
     """
@@ -147,6 +312,17 @@ async def analyze_nodejs_config(config: NodeJSConfig):
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 
+def _project_info_for(project_info: Optional[ProjectInfo], config: Dict) -> ProjectInfo:
+    """Provided project info, or a minimal one built from the config"""
+    if project_info:
+        return project_info
+    return ProjectInfo(
+        language=config.get("language"),
+        framework=config.get("framework"),
+        detected_version=config.get("runtime_version")
+    )
+
+
 @router.post("/generate", response_model=GenerateResponse)
 async def generate_dockerfile(request: GenerateRequest):
     """
@@ -158,15 +334,7 @@ async def generate_dockerfile(request: GenerateRequest):
     """
     try:
         # Use provided project_info or create minimal one from config
-        project_info = request.project_info
-        if not project_info:
-            # Create minimal project info from config
-            config = request.config
-            project_info = ProjectInfo(
-                language=config.get("language"),
-                framework=config.get("framework"),
-                detected_version=config.get("runtime_version")
-            )
+        project_info = _project_info_for(request.project_info, request.config)
 
         # Generate Dockerfile
         dockerfile_content = await dockerfile_generator.generate(
@@ -192,40 +360,129 @@ async def generate_dockerfile(request: GenerateRequest):
             }
         )
 
+    except HTTPException:
+        raise
+    except TimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to generate Dockerfile: {e}")
         raise HTTPException(status_code=500, detail=f"Generation failed: {str(e)}")
 
 
-@router.get("/download/{session_id}")
-async def download_dockerfile(session_id: str):
+@router.post("/generate/batch")
+async def generate_dockerfiles_batch(request: BatchGenerateRequest):
+    """
+    Generate many Dockerfiles in one request
+
+    - Identical items are generated once and reported for each of them
+    - Distinct items are rendered concurrently by a bounded worker pool
+    - Results stream back as NDJSON, one line per item, in completion order,
+      followed by a summary line; a failing item yields an error line and
+      does not fail the batch
+    - No sessions are written; use /api/generate for a downloadable Dockerfile
+    """
+    if len(request.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch has {len(request.items)} items (limit {BATCH_MAX_ITEMS})"
+        )
+
+    invalid: List[BatchGenerateResult] = []
+    jobs: List[Tuple[ProjectInfo, Dict]] = []
+    job_items: List[int] = []
+    for index, item in enumerate(request.items):
+        try:
+            jobs.append((_project_info_for(item.project_info, item.config), item.config))
+            job_items.append(index)
+        except ValueError as e:
+            invalid.append(BatchGenerateResult(index=index, id=item.id, status="error", error=str(e)))
+
+    async def results() -> AsyncIterator[bytes]:
+        failed = len(invalid)
+        for result in invalid:
+            yield result.model_dump_json(exclude_none=True).encode() + b"\n"
+
+        unique = 0
+        async for job_indices, dockerfile, error in dockerfile_generator.generate_batch(jobs):
+            unique += 1
+            for position, job_index in enumerate(job_indices):
+                index = job_items[job_index]
+                result = BatchGenerateResult(
+                    index=index,
+                    id=request.items[index].id,
+                    status="error" if error else "ok",
+                    dockerfile=dockerfile,
+                    error=error,
+                    deduplicated=position > 0
+                )
+                if error:
+                    failed += 1
+                yield result.model_dump_json(exclude_none=True).encode() + b"\n"
+
+        logger.info(f"Batch generated {len(request.items)} Dockerfiles ({unique} distinct, {failed} failed)")
+        summary = {"done": True, "total": len(request.items), "distinct": unique, "failed": failed}
+        yield json.dumps(summary).encode() + b"\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
+@router.post("/generate/matrix", response_model=MatrixGenerateResponse)
+async def generate_dockerfile_matrix(request: MatrixGenerateRequest):
+    """
+    Generate every combination of framework, build tool, runtime version and base image
+
+    - The combination of each axis' first value is the baseline, returned in full
+    - Every other combination is returned as a unified diff against the baseline
+    - No sessions are written
+    """
+    try:
+        project_info = _project_info_for(request.project_info, request.config)
+        return await dockerfile_generator.generate_matrix(
+            project_info,
+            request.config,
+            request.axes,
+            context_lines=request.context_lines
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.api_route("/download/{session_id}", methods=["GET", "HEAD"])
+async def download_dockerfile(session_id: str, request: Request):
     """
     Download generated Dockerfile
 
-    - Returns file response with proper headers
+    - Strong ETag from the content hash; If-None-Match returns 304
+    - Supports single byte ranges
     """
     try:
-        # Check if session exists
-        if not upload_manager.session_exists(session_id):
+        if not upload_manager.is_valid_session_id(session_id):
             raise HTTPException(status_code=404, detail="Session not found or expired")
 
-        # Get Dockerfile path
         dockerfile_path = upload_manager.get_session_dir(session_id) / "Dockerfile"
-
-        if not dockerfile_path.exists():
+        etag = upload_manager.get_session_info(session_id).get("dockerfile_sha256")
+        if not etag and dockerfile_path.exists():
+            # Sessions written before content hashes were recorded
+            etag = hashlib.sha256(dockerfile_path.read_bytes()).hexdigest()
+
+        try:
+            response = conditional_file_response(
+                request,
+                path=dockerfile_path,
+                etag=etag or "",
+                media_type="text/plain",
+                filename="Dockerfile"
+            )
+        except FileNotFoundError:
+            if not upload_manager.session_exists(session_id):
+                raise HTTPException(status_code=404, detail="Session not found or expired")
             raise HTTPException(status_code=404, detail="Dockerfile not found")
 
-        logger.info(f"Downloading Dockerfile from session {session_id}")
-
-        # Return file for download
-        return FileResponse(
-            path=str(dockerfile_path),
-            media_type="text/plain",
-            filename="Dockerfile",
-            headers={
-                "Content-Disposition": "attachment; filename=Dockerfile"
-            }
-        )
+        upload_manager.touch(session_id)
+        logger.info(f"Downloading Dockerfile from session {session_id} (status={response.status_code})")
+        return response
 
     except HTTPException:
         raise
@@ -234,19 +491,82 @@ async def download_dockerfile(session_id: str):
         raise HTTPException(status_code=500, detail=f"Download failed: {str(e)}")
 
 
+@router.api_route("/download/{session_id}/artifact", methods=["GET", "HEAD"])
+async def download_artifact(session_id: str, request: Request):
+    """
+    Download the original uploaded JAR/WAR of a session
+
+    - Strong ETag is the artifact's SHA-256; If-None-Match returns 304
+    - Supports single byte ranges for resumed downloads
+    """
+    try:
+        if not upload_manager.is_valid_session_id(session_id):
+            raise HTTPException(status_code=404, detail="Session not found or expired")
+
+        info = upload_manager.get_session_info(session_id)
+        digest = info.get("sha256")
+        filename = info.get("filename")
+        if not digest or not filename:
+            raise HTTPException(status_code=404, detail="Session not found or has no artifact")
+
+        try:
+            response = conditional_file_response(
+                request,
+                path=upload_manager.get_session_dir(session_id) / filename,
+                etag=digest,
+                media_type="application/java-archive",
+                filename=filename,
+                cache_control="private, max-age=3600, immutable"
+            )
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Session not found or expired")
+
+        upload_manager.touch(session_id)
+        logger.info(f"Downloading artifact from session {session_id} (status={response.status_code})")
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to download artifact: {e}")
+        raise HTTPException(status_code=500, detail=f"Download failed: {str(e)}")
+
+
 @router.get("/templates")
-async def list_templates():
+async def list_templates(request: Request):
     """
     List available Dockerfile templates
 
-    - Returns all supported languages and frameworks
+    - Returns registered frameworks per language and every template entry
+    - Served from the in-memory registry with an ETag; If-None-Match yields 304
+    """
+    etag = f'"{template_registry.etag}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=template_registry.body, media_type="application/json", headers=headers)
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Runtime metrics for background subsystems
+
+    - reaper: pending session expiries and reclaim throughput
+    - quota: upload store usage against its byte budget, evictions
+    - analysis_pool: archive worker queue, queue-wait and execution histograms
+    - templates: render counts and per-template render-duration histograms
+    - render_cache: rendered Dockerfile cache hits, misses and evictions
+    - template_watcher: hot template reloads and rejected templates
     """
     return {
-        "templates": {
-            "python": ["fastapi", "flask", "django"],
-            "nodejs": ["express", "nestjs", "nextjs"],
-            "java": ["spring-boot"]
-        }
+        "reaper": session_reaper.stats(),
+        "quota": storage_quota.stats(),
+        "analysis_pool": analysis_pool.stats(),
+        "templates": template_engine.stats(),
+        "render_cache": render_cache.stats(),
+        "template_watcher": template_watcher.stats()
     }
 
 
@@ -2,6 +2,10 @@
 from pathlib import Path
 import os
 
+# Runtime environment ("production" disables template auto-reload)
+APP_ENV = os.environ.get("APP_ENV", "development")
+IS_PRODUCTION = APP_ENV == "production"
+
 # Base paths
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
@@ -12,20 +16,92 @@ if os.path.exists("/app/frontend"):
     TEMPLATE_DIR = Path("/app/app/templates")
     FRONTEND_DIR = Path("/app/frontend")
     STATIC_DIR = Path("/app/frontend/static")
+    CACHE_DIR = Path("/app/.cache")
 else:
     # Local development
     UPLOAD_DIR = BASE_DIR / "uploads"
     TEMPLATE_DIR = BASE_DIR / "backend" / "app" / "templates"
     FRONTEND_DIR = BASE_DIR / "frontend"
     STATIC_DIR = BASE_DIR / "frontend" / "static"
+    CACHE_DIR = BASE_DIR / ".cache"
+
+# Template registry manifest (language, framework, build tool and variant of every template)
+TEMPLATE_MANIFEST = TEMPLATE_DIR / "manifest.json"
+
+# Hot template reload (opt-in): recompile, validate and swap changed templates without restarts
+TEMPLATE_WATCH = os.environ.get("TEMPLATE_WATCH", "").lower() in ("1", "true", "yes")
+TEMPLATE_WATCH_INTERVAL = 1.0  # Seconds between scans when polling instead of using inotify
+
+# Ahead-of-time compiled templates, built into the image and loaded in production
+TEMPLATE_BUNDLE = Path(os.environ.get("TEMPLATE_BUNDLE", CACHE_DIR / "templates.zip"))
+
+# Compiled template bytecode, shared by worker processes and kept across restarts
+TEMPLATE_BYTECODE_DIR = Path(os.environ.get("TEMPLATE_BYTECODE_DIR", CACHE_DIR / "jinja"))
+
+# Content-addressed artifact store (kept under UPLOAD_DIR so blobs can be hard-linked into sessions)
+ARTIFACT_STORE_DIR = UPLOAD_DIR / ".blobs"
+UPLOAD_STAGING_DIR = UPLOAD_DIR / ".incoming"
+RESUMABLE_UPLOAD_DIR = UPLOAD_STAGING_DIR / "resumable"  # Unfinished resumable uploads
 
 # File upload settings
 MAX_UPLOAD_SIZE = 500 * 1024 * 1024  # 500 MB
 ALLOWED_EXTENSIONS = {".jar", ".war"}
 ALLOWED_CONTENT_TYPES = ["application/java-archive", "application/x-java-archive"]
 
+# Upload storage quota
+UPLOAD_QUOTA_BYTES = 20 * 1024 * 1024 * 1024  # 20 GB budget for UPLOAD_DIR (0 disables the quota)
+QUOTA_RETRY_AFTER = 30  # Retry-After (seconds) sent when nothing can be evicted
+
+# Resumable upload settings
+RESUMABLE_CHUNK_SIZE = 8 * 1024 * 1024  # Suggested chunk size returned to clients
+RESUMABLE_MAX_CHUNK_SIZE = 64 * 1024 * 1024  # Largest single PATCH body accepted
+RESUMABLE_UPLOAD_EXPIRY = 6 * 3600  # Unfinished uploads are discarded after 6 hours
+
+# Archive analysis worker pool
+ANALYSIS_WORKERS = min(4, os.cpu_count() or 1)  # Worker processes for zip inspection
+ANALYSIS_QUEUE_DEPTH = 16  # Jobs allowed to wait for a worker before returning 503
+ANALYSIS_JOB_TIMEOUT = 120  # Seconds a single job may run, not counting queue wait
+ANALYSIS_JOB_KILL_GRACE = 10  # Seconds past the timeout before a worker stuck in native code exits
+
+# Archive inspection limits (zip-bomb guard)
+ARCHIVE_MAX_ENTRIES = 200_000  # Entries in one archive's central directory
+ARCHIVE_MAX_MEMBER_BYTES = 1024 * 1024 * 1024  # 1 GB uncompressed per member
+ARCHIVE_MAX_TOTAL_BYTES = 4 * 1024 * 1024 * 1024  # 4 GB uncompressed per archive
+ARCHIVE_MAX_RATIO = 100  # Uncompressed:compressed ratio, per member and in total
+ARCHIVE_RATIO_MIN_BYTES = 1024 * 1024  # Ratio is only enforced above 1 MB uncompressed
+ARCHIVE_MAX_METADATA_BYTES = 1024 * 1024  # Manifest and index files read into memory
+
+# Nested dependency scanning
+NESTED_JAR_MAX_BYTES = 128 * 1024 * 1024  # Largest compressed nested JAR inflated into memory
+DEPENDENCY_SCAN_PARALLEL_MIN_BYTES = 16 * 1024 * 1024  # Smaller archives are scanned by one worker
+
+# JDK module detection for jlink runtimes
+MODULE_SCAN_PARALLEL_MIN_BYTES = 16 * 1024 * 1024  # Smaller archives are scanned by one worker
+MODULE_SCAN_MAX_CLASS_BYTES = 32 * 1024 * 1024  # Larger classes are skipped and the module set marked incomplete
+
+# Archive integrity verification
+INTEGRITY_TIME_BUDGET = 30  # Wall-clock seconds each verification part may run (queue wait excluded) before reporting incomplete
+INTEGRITY_CPU_BUDGET = 60  # CPU seconds shared by all verification workers
+INTEGRITY_PARALLEL_MIN_BYTES = 16 * 1024 * 1024  # Smaller archives are verified by one worker
+
+# Template rendering
+RENDER_WORKERS = max(2, min(4, os.cpu_count() or 1))  # Threads rendering templates off the event loop
+RENDER_TIMEOUT = 10  # Seconds a single render may take, including time waiting for a thread
+
+# Batch generation
+BATCH_MAX_ITEMS = 2000  # Items accepted in one /api/generate/batch request
+BATCH_CONCURRENCY = 8  # Distinct items generated concurrently per batch
+MATRIX_MAX_VARIANTS = 500  # Combinations accepted in one /api/generate/matrix request
+
+# Rendered Dockerfile cache
+RENDER_CACHE_SIZE = 1024  # Rendered Dockerfiles kept in process memory (0 disables the cache)
+RENDER_CACHE_URL = os.environ.get("RENDER_CACHE_URL", "")  # Optional shared backend, e.g. redis://cache:6379/0
+RENDER_CACHE_TTL = 24 * 3600  # Seconds a rendered Dockerfile lives in the shared backend
+
 # Session settings
 SESSION_CLEANUP_DELAY = 3600  # 1 hour in seconds
+REAPER_INTERVAL = 30  # Longest the reaper sleeps between expiry checks (seconds)
+REAPER_BATCH_SIZE = 100  # Directories deleted per worker-thread batch
 
 # CORS settings
 ALLOWED_ORIGINS = [
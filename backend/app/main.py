@@ -3,11 +3,17 @@ import logging
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
+import asyncio
 import time
 
-from app.config import ALLOWED_ORIGINS, LOG_LEVEL, FRONTEND_DIR, STATIC_DIR
+from app.config import ALLOWED_ORIGINS, LOG_LEVEL, FRONTEND_DIR, STATIC_DIR, TEMPLATE_WATCH
 from app.api import endpoints
+from app.services.template_engine import template_engine
+from app.services.template_watcher import template_watcher
+from app.utils.process_pool import analysis_pool
+from app.utils.session_reaper import session_reaper
+from app.utils.storage_quota import storage_quota
 
 # Configure logging
 logging.basicConfig(
@@ -63,6 +69,20 @@ async def health_check():
     return {"status": "healthy", "service": "dockerfile-generator"}
 
 
+# Readiness endpoint
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint: succeeds once templates are warmed up"""
+    if not template_engine.ready:
+        return JSONResponse(status_code=503, content={"status": "warming_up", "service": "dockerfile-generator"})
+    return {
+        "status": "ready",
+        "service": "dockerfile-generator",
+        "templates": template_engine.warmed_templates,
+        "warm_up_seconds": round(template_engine.warm_up_seconds, 4)
+    }
+
+
 # Serve frontend static files
 try:
     app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
@@ -85,9 +105,19 @@ async def read_root():
 async def startup_event():
     """Run on application startup"""
     logger.info("Starting Dockerfile Generator application")
+    await session_reaper.start()
+    await storage_quota.rebuild()
+    # Liveness answers right away; readiness flips once templates are compiled
+    app.state.template_warm_up = asyncio.create_task(template_engine.warm_up())
+    if TEMPLATE_WATCH:
+        await template_watcher.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Run on application shutdown"""
     logger.info("Shutting down Dockerfile Generator application")
+    await session_reaper.stop()
+    await template_watcher.stop()
+    analysis_pool.shutdown()
+    template_engine.shutdown()
@@ -16,6 +16,7 @@ class BaseDockerConfig(BaseModel):
     system_dependencies: List[str] = Field(default_factory=list)
     service_url: Optional[str] = None
     custom_start_command: Optional[str] = None
+    build_cache: bool = False  # BuildKit cache mounts for package manager downloads
 
 
 class PythonConfig(BaseDockerConfig):
@@ -82,10 +83,23 @@ class JavaConfig(BaseDockerConfig):
     language: Literal["java"] = "java"
     framework: Literal["spring-boot"] = "spring-boot"
     build_tool: Literal["maven", "gradle", "jar"]
+    variant: Literal["default", "native"] = "default"  # "native" compiles a GraalVM native executable
     jar_file_name: Optional[str] = None
     main_class: Optional[str] = None
-    jvm_options: str = "-Xmx512m"
+    jvm_options: str = ""
+    jvm_profile: Optional[Literal["container", "fixed"]] = None  # Default: container unless only jvm_options are given
+    container_memory_mb: Optional[int] = Field(default=None, ge=64)  # Target memory limit; read from cgroups if unset
+    container_cpus: Optional[float] = Field(default=None, gt=0)  # Target CPU limit; read from cgroups if unset
     build_file_content: Optional[str] = None  # pom.xml or build.gradle content
+    layered: Optional[bool] = None  # Extract a layered Spring Boot JAR into image layers
+    jar_layers: Optional[List[str]] = None  # Layer names in layers.idx order
+    layer_tool: Optional[Literal["tools", "layertools"]] = None  # Boot 3.3+ jarmode vs the older one
+    launcher_class: Optional[str] = None  # Spring Boot launcher for the extracted layout
+    spring_boot_version: Optional[str] = None  # Overridden by the version found in an uploaded JAR
+    cds: bool = False  # Train an AppCDS archive at build time (Spring Boot 3.3+)
+    jlink: bool = False  # Ship a jlink runtime with only the JDK modules the JAR uses
+    jdk_modules: Optional[List[str]] = None  # Found when the JAR is analyzed
+    jlink_add_modules: List[str] = Field(default_factory=list)  # Modules only reached through reflection or ServiceLoader
 
     class Config:
         json_schema_extra = {
@@ -96,7 +110,9 @@ class JavaConfig(BaseDockerConfig):
                 "port": 8080,
                 "build_tool": "jar",
                 "jar_file_name": "app.jar",
-                "jvm_options": "-Xmx512m",
+                "jvm_profile": "container",
+                "container_memory_mb": 1024,
+                "container_cpus": 1,
                 "environment_vars": {"SPRING_PROFILES_ACTIVE": "prod"},
                 "health_check_path": "/actuator/health",
                 "user": "appuser",
@@ -140,6 +156,70 @@ class GenerateRequest(BaseModel):
         }
 
 
+class BatchGenerateItem(BaseModel):
+    """One Dockerfile to generate in a batch"""
+    id: Optional[str] = Field(None, description="Caller's identifier, echoed back in the result")
+    project_info: Optional[ProjectInfo] = None
+    config: Dict
+
+
+class BatchGenerateRequest(BaseModel):
+    """Request for generating many Dockerfiles at once"""
+    items: List[BatchGenerateItem] = Field(..., min_length=1)
+
+
+class BatchGenerateResult(BaseModel):
+    """One NDJSON line of a batch generation response"""
+    index: int = Field(..., description="Position of the item in the request")
+    id: Optional[str] = None
+    status: Literal["ok", "error"]
+    dockerfile: Optional[str] = None
+    error: Optional[str] = None
+    deduplicated: bool = Field(False, description="Identical to an earlier item and rendered once for both")
+
+
+# Config keys a generation matrix can vary, in the order they are combined
+MATRIX_AXES = ("framework", "build_tool", "variant", "runtime_version", "base_image")
+
+
+class MatrixGenerateRequest(BaseModel):
+    """Request for generating every combination of some config values"""
+    project_info: Optional[ProjectInfo] = None
+    config: Dict
+    axes: Dict[Literal["framework", "build_tool", "variant", "runtime_version", "base_image"], List[str]] = Field(
+        ..., description="Values to try per config key; the first value of each forms the baseline"
+    )
+    context_lines: int = Field(0, ge=0, le=10, description="Unchanged lines around each change in the diffs")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "config": {"language": "java", "framework": "spring-boot", "build_tool": "jar"},
+                "axes": {
+                    "runtime_version": ["17", "21"],
+                    "base_image": ["eclipse-temurin:17-jre-alpine", "eclipse-temurin:21-jre-alpine"]
+                }
+            }
+        }
+
+
+class MatrixVariant(BaseModel):
+    """One combination of a generation matrix"""
+    values: Dict[str, str]
+    template: Optional[str] = None
+    diff: Optional[str] = Field(None, description="Unified diff against the baseline Dockerfile")
+    identical: bool = False
+    error: Optional[str] = None
+
+
+class MatrixGenerateResponse(BaseModel):
+    """Baseline Dockerfile plus every other combination as a diff"""
+    baseline: MatrixVariant
+    dockerfile: str = Field(..., description="Baseline Dockerfile")
+    variants: List[MatrixVariant]
+    distinct_renders: int
+
+
 class GenerateResponse(BaseModel):
     """Response for Dockerfile generation"""
     dockerfile: str
@@ -147,6 +227,16 @@ class GenerateResponse(BaseModel):
     metadata: Dict[str, str] = Field(default_factory=dict)
 
 
+class TemplateInfo(BaseModel):
+    """A Dockerfile template registered in the template manifest"""
+    path: str = Field(..., description="Template path relative to the template directory")
+    language: str
+    framework: str
+    build_tool: Optional[str] = Field(None, description="Build tool the template is for; None matches any")
+    variant: str = "default"
+    version: str = Field(..., description="SHA-256 of the template source")
+
+
 class AnalyzeResponse(BaseModel):
     """Response for file/config analysis"""
     project_info: ProjectInfo
@@ -154,12 +244,62 @@ class AnalyzeResponse(BaseModel):
     suggestions: Dict[str, str] = Field(default_factory=dict)
 
 
+class UploadStats(BaseModel):
+    """Transfer statistics for a streamed upload"""
+    bytes_received: int
+    sha256: str
+    duration_seconds: float
+    bytes_per_second: float
+    time_to_first_byte: Optional[float] = Field(
+        None, description="Seconds from request start until the first artifact byte arrived"
+    )
+
+
+class IntegrityReport(BaseModel):
+    """Outcome of CRC verification of an uploaded archive"""
+    valid: bool = Field(..., description="No corrupt member was found and the JAR manifest is present")
+    complete: bool = Field(..., description="Every member was checked within the budget")
+    members_total: int
+    members_checked: int
+    bytes_decompressed: int
+    elapsed_seconds: float
+    cpu_seconds: float
+    workers: int
+    budget_exhausted: bool = False
+    failed_member: Optional[str] = None
+    error: Optional[str] = None
+
+
 class UploadResponse(BaseModel):
     """Response for file upload"""
     session_id: str
     filename: str
     size: int
     project_info: ProjectInfo
+    stats: Optional[UploadStats] = None
+    deduplicated: bool = False
+    integrity: Optional[IntegrityReport] = None
+
+
+class ResumableUploadCreateRequest(BaseModel):
+    """Request for starting a resumable artifact upload"""
+    filename: str = Field(..., description="Original JAR/WAR filename")
+    size: int = Field(..., gt=0, description="Total artifact size in bytes")
+    content_type: str = Field(default="application/java-archive", description="Artifact content type")
+
+
+class ResumableUploadStatus(BaseModel):
+    """Progress of a resumable artifact upload"""
+    upload_id: str
+    filename: str
+    size: int
+    chunk_size: int = Field(..., description="Suggested chunk size for PATCH requests")
+    received_bytes: int
+    missing_ranges: List[List[int]] = Field(
+        default_factory=list,
+        description="Byte ranges [start, end) not yet received"
+    )
+    complete: bool = False
 
 
 class JenkinsBuildRequest(BaseModel):
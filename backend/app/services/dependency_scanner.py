@@ -0,0 +1,290 @@
+"""Dependency inventory of the JARs nested inside Spring Boot JARs and WARs"""
+from pathlib import Path
+from typing import Dict, List, Optional
+import asyncio
+import io
+import os
+import re
+import struct
+import zipfile
+import logging
+
+from app.config import NESTED_JAR_MAX_BYTES, DEPENDENCY_SCAN_PARALLEL_MIN_BYTES
+from app.utils.archive_guard import ArchiveGuard, ArchiveGuardError
+from app.utils.artifact_store import artifact_store
+from app.utils.process_pool import BoundedProcessPool, analysis_pool
+
+logger = logging.getLogger(__name__)
+
+# Bump when scanner output changes so persisted inventories are recomputed
+SCAN_VERSION = 1
+SCAN_SIDECAR = "dependencies"
+
+LIB_DIRS = {
+    "BOOT-INF/lib/": "runtime",
+    "WEB-INF/lib/": "runtime",
+    "WEB-INF/lib-provided/": "provided",
+}
+
+# Stack -> artifact IDs whose presence reveals it
+STACK_MARKERS = {
+    "mvc": {"spring-webmvc"},
+    "webflux": {"spring-webflux"},
+    "tomcat": {"tomcat-embed-core"},
+    "jetty": {"jetty-server"},
+    "undertow": {"undertow-core"},
+    "netty": {"netty-transport", "reactor-netty-core", "reactor-netty-http"},
+    "hibernate": {"hibernate-core"},
+    "actuator": {"spring-boot-actuator"},
+}
+
+# Embedded servers in the order Spring Boot prefers them for each web stack
+SERVER_PREFERENCE = {
+    "mvc": ["tomcat", "jetty", "undertow"],
+    "webflux": ["netty", "tomcat", "jetty", "undertow"],
+}
+
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+_POM_PROPERTIES_RE = re.compile(r"^META-INF/maven/[^/]+/[^/]+/pom\.properties$")
+_JAR_FILENAME_RE = re.compile(r"^(?P<artifact>.+?)-(?P<version>\d[\w.\-+]*)\.jar$")
+
+
+class _MemberSlice(io.RawIOBase):
+    """Read-only, seekable view of a STORED member inside the outer archive"""
+
+    def __init__(self, file: io.BufferedReader, start: int, length: int):
+        self._file = file
+        self._start = start
+        self._length = length
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._length
+        self._position = min(max(offset, 0), self._length)
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        count = min(len(buffer), self._length - self._position)
+        if count <= 0:
+            return 0
+        self._file.seek(self._start + self._position)
+        data = self._file.read(count)
+        buffer[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+
+def _stored_member_offset(file: io.BufferedReader, info: zipfile.ZipInfo) -> int:
+    """Offset of a member's data, read from its local file header"""
+    file.seek(info.header_offset)
+    header = _LOCAL_HEADER.unpack(file.read(_LOCAL_HEADER.size))
+    if header[0] != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"Bad local header for {info.filename}")
+    return info.header_offset + _LOCAL_HEADER.size + header[9] + header[10]
+
+
+def _parse_properties(data: bytes) -> Dict[str, str]:
+    properties = {}
+    for line in data.decode("utf-8", errors="replace").splitlines():
+        line = line.strip()
+        if not line or line[0] in "#!" or "=" not in line:
+            continue
+        key, value = line.split("=", 1)
+        properties[key.strip()] = value.strip()
+    return properties
+
+
+def _describe_nested_jar(nested: zipfile.ZipFile, path: str, scope: str) -> dict:
+    """Coordinates of one nested JAR, from pom.properties or its filename"""
+    guard = ArchiveGuard()
+    guard.check_central_directory(nested.infolist())
+
+    filename = path.rsplit("/", 1)[-1]
+    candidates = []
+    for name in nested.namelist():
+        if _POM_PROPERTIES_RE.match(name):
+            properties = _parse_properties(guard.read(nested, name))
+            if properties.get("artifactId"):
+                candidates.append(properties)
+
+    # Shaded JARs carry several pom.properties; prefer the one matching the filename
+    chosen = next((p for p in candidates if filename.startswith(f"{p['artifactId']}-")), None)
+    if chosen is None and candidates:
+        chosen = candidates[0]
+    if chosen:
+        return {
+            "group": chosen.get("groupId", ""),
+            "artifact": chosen["artifactId"],
+            "version": chosen.get("version", ""),
+            "path": path,
+            "scope": scope,
+        }
+
+    match = _JAR_FILENAME_RE.match(filename)
+    return {
+        "group": "",
+        "artifact": match.group("artifact") if match else filename.removesuffix(".jar"),
+        "version": match.group("version") if match else "",
+        "path": path,
+        "scope": scope,
+    }
+
+
+def scan_nested_jars_part(file_path: str, part: int, parts: int) -> List[dict]:
+    """
+    Describe one share of the nested JARs (entry point for worker processes)
+
+    STORED nested JARs, the Spring Boot default, are opened in place as a
+    slice of the outer file; compressed ones are inflated into memory up to
+    ``NESTED_JAR_MAX_BYTES``. Nothing is extracted to disk.
+
+    Args:
+        file_path: Path to the outer JAR/WAR
+        part: Index of the share to scan
+        parts: Total number of shares
+
+    Returns:
+        list: One dict per nested JAR (group, artifact, version, path, scope)
+
+    Raises:
+        ArchiveGuardError: If an archive exceeds size or ratio limits
+    """
+    guard = ArchiveGuard()
+    guard.check_entry_count(file_path)
+    dependencies = []
+    with open(file_path, "rb") as raw, zipfile.ZipFile(raw, "r") as jar:
+        infos = jar.infolist()
+        guard.check_central_directory(infos)
+        libs = sorted(
+            (info for info in infos
+             if info.filename.endswith(".jar") and info.filename.rsplit("/", 1)[0] + "/" in LIB_DIRS),
+            key=lambda info: info.header_offset
+        )
+
+        for info in libs[part::parts]:
+            scope = LIB_DIRS[info.filename.rsplit("/", 1)[0] + "/"]
+            try:
+                if info.compress_type == zipfile.ZIP_STORED:
+                    start = _stored_member_offset(raw, info)
+                    source = io.BufferedReader(_MemberSlice(raw, start, info.compress_size))
+                else:
+                    source = io.BytesIO(guard.read(jar, info, max_bytes=NESTED_JAR_MAX_BYTES))
+                with zipfile.ZipFile(source, "r") as nested:
+                    dependencies.append(_describe_nested_jar(nested, info.filename, scope))
+            except ArchiveGuardError:
+                raise
+            except (zipfile.BadZipFile, OSError, struct.error) as e:
+                # An unreadable nested JAR is reported, not fatal
+                dependencies.append({
+                    "group": "", "artifact": info.filename.rsplit("/", 1)[-1], "version": "",
+                    "path": info.filename, "scope": scope, "error": str(e)
+                })
+    return dependencies
+
+
+class DependencyScanner:
+    """
+    Builds a dependency inventory from nested library JARs
+
+    The nested JARs are shared out across the analysis worker pool and
+    the resulting inventory is persisted next to the artifact, keyed by
+    its digest, so identical uploads are never rescanned.
+    """
+
+    def __init__(self, pool: BoundedProcessPool = analysis_pool):
+        self.pool = pool
+
+    async def scan(self, file_path: Path, digest: Optional[str] = None) -> dict:
+        """
+        Scan the nested JARs of an artifact
+
+        Args:
+            file_path: Path to JAR/WAR file
+            digest: SHA-256 of the artifact in the artifact store
+
+        Returns:
+            dict: ``dependencies`` (list of coordinates) and ``stacks`` (sorted flags)
+
+        Raises:
+            ArchiveGuardError: If an archive exceeds size or ratio limits
+        """
+        if digest:
+            cached = artifact_store.load_json(digest, SCAN_SIDECAR)
+            if cached and cached.get("version") == SCAN_VERSION:
+                return cached
+
+        size = os.path.getsize(file_path)
+        parts = self.pool.parts_for(size, DEPENDENCY_SCAN_PARALLEL_MIN_BYTES)
+        results = await asyncio.gather(*(
+            self.pool.run("scan_dependencies", scan_nested_jars_part, str(file_path), part, parts)
+            for part in range(parts)
+        ))
+
+        dependencies = sorted(
+            (dependency for result in results for dependency in result),
+            key=lambda d: (d["group"], d["artifact"], d["path"])
+        )
+        inventory = {
+            "version": SCAN_VERSION,
+            "dependencies": dependencies,
+            "stacks": self._detect_stacks(dependencies),
+        }
+        if digest:
+            artifact_store.save_json(digest, SCAN_SIDECAR, inventory)
+        logger.info(f"Scanned {len(dependencies)} nested JARs in {file_path.name}")
+        return inventory
+
+    def to_metadata(self, inventory: dict) -> Dict[str, str]:
+        """
+        Flatten an inventory into ``ProjectInfo.metadata`` entries
+
+        Args:
+            inventory: Result of ``scan``
+
+        Returns:
+            dict: ``dependency_count``, ``stacks``, ``web_stack`` and ``embedded_server``
+        """
+        stacks = inventory.get("stacks", [])
+        web_stack = "mvc" if "mvc" in stacks else "webflux" if "webflux" in stacks else ""
+        server = next((s for s in SERVER_PREFERENCE.get(web_stack, []) if s in stacks), "")
+        return {
+            "dependency_count": str(len(inventory.get("dependencies", []))),
+            "stacks": ",".join(stacks),
+            "web_stack": web_stack,
+            "embedded_server": server,
+        }
+
+    def coordinates(self, inventory: dict) -> List[str]:
+        """
+        ``group:artifact:version`` strings for ``ProjectInfo.dependencies``
+
+        Args:
+            inventory: Result of ``scan``
+
+        Returns:
+            list: Dependency coordinates
+        """
+        return [
+            ":".join(part for part in (d["group"], d["artifact"], d["version"]) if part)
+            for d in inventory.get("dependencies", [])
+        ]
+
+    def _detect_stacks(self, dependencies: List[dict]) -> List[str]:
+        artifacts = {d["artifact"] for d in dependencies}
+        return sorted(stack for stack, markers in STACK_MARKERS.items() if artifacts & markers)
+
+
+# Global instance
+dependency_scanner = DependencyScanner()
@@ -1,18 +1,60 @@
 """Dockerfile generation service"""
-from typing import Dict, Any
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import difflib
+import itertools
 import logging
 
-from app.models.schemas import ProjectInfo, PythonConfig, NodeJSConfig, JavaConfig
+from app.config import BATCH_CONCURRENCY, MATRIX_MAX_VARIANTS
+from app.models.schemas import (
+    ProjectInfo,
+    PythonConfig,
+    NodeJSConfig,
+    JavaConfig,
+    MATRIX_AXES,
+    MatrixGenerateResponse,
+    MatrixVariant,
+)
+from app.services.jar_index import CDS_MIN_BOOT_VERSION, version_tuple
+from app.services.jvm_profile import container_jvm_options, merge_jvm_options
+from app.services.render_cache import RenderCache, context_hash, render_cache
 from app.services.template_engine import template_engine
+from app.services.native_compat import native_issues
+from app.services.template_registry import DEFAULT_VARIANT, template_registry
 
 logger = logging.getLogger(__name__)
 
+# BuildKit cache mounts for each package manager's download cache (build stages run as root)
+BUILD_CACHE_MOUNTS = {
+    "pip": "--mount=type=cache,target=/root/.cache/pip",
+    "npm": "--mount=type=cache,target=/root/.npm",
+    "yarn": "--mount=type=cache,target=/usr/local/share/.cache/yarn",
+    "pnpm": "--mount=type=cache,target=/root/.local/share/pnpm/store",
+    "maven": "--mount=type=cache,target=/root/.m2",
+    "gradle": "--mount=type=cache,target=/home/gradle/.gradle",
+}
+
+# Layers written by Spring Boot when no custom layers configuration is used
+DEFAULT_BOOT_LAYERS = ["dependencies", "spring-boot-loader", "snapshot-dependencies", "application"]
+
+# jlink runtimes are linked with the musl Temurin JDK and copied onto plain Alpine
+JLINK_BUILD_IMAGE = "eclipse-temurin:{version}-jdk-alpine"
+JLINK_RUNTIME_IMAGE = "alpine:3.20"
+# Security providers are loaded through ServiceLoader, so no class names them (part of java.base from JDK 22)
+JLINK_PROVIDER_MODULES = ["jdk.crypto.ec"]
+
+# GraalVM native executables are compiled with Spring AOT and shipped on distroless (glibc, no shell)
+NATIVE_VARIANT = "native"
+NATIVE_BUILDER_IMAGE = "ghcr.io/graalvm/native-image-community:{version}"
+NATIVE_RUNTIME_IMAGE = "gcr.io/distroless/base-debian12:nonroot"
+
 
 class DockerfileGenerator:
     """Generates optimized Dockerfiles using Jinja2 templates"""
 
-    def __init__(self):
+    def __init__(self, cache: RenderCache = render_cache):
         self.template_engine = template_engine
+        self.cache = cache
 
     async def generate(
         self,
@@ -36,62 +78,177 @@ class DockerfileGenerator:
         context = self._build_context(project_info, user_config)
 
         # Render Dockerfile
-        dockerfile = await self.template_engine.render(template_name, context)
+        dockerfile = await self._render(template_name, context)
 
         logger.info(f"Generated Dockerfile for {project_info.language}/{project_info.framework}")
         return dockerfile
 
-    def _select_template(self, project_info: ProjectInfo, config: Dict[str, Any]) -> str:
+    async def _render(self, template_name: str, context: Dict[str, Any]) -> str:
+        """Render a template, reusing an earlier render of the same template version and context"""
+        dockerfile = None
+        if self.cache.enabled:
+            version = self.template_engine.template_version(template_name)
+            key = self.cache.key(template_name, version, context)
+            dockerfile = await self.cache.get(key)
+        if dockerfile is None:
+            dockerfile = await self.template_engine.render(template_name, context)
+            if self.cache.enabled:
+                await self.cache.set(key, dockerfile)
+        return dockerfile
+
+    async def generate_matrix(
+        self,
+        project_info: ProjectInfo,
+        user_config: Dict[str, Any],
+        axes: Dict[str, List[str]],
+        context_lines: int = 0
+    ) -> MatrixGenerateResponse:
         """
-        Select appropriate template based on language and framework
+        Generate the cross product of config axes as diffs against a baseline
+
+        The baseline is the combination of every axis' first value; other
+        variants come back as unified diffs against it. Template selection
+        is shared by variants with the same framework, build tool and
+        template variant, and
+        variants whose built contexts are identical are rendered once.
 
         Args:
-            project_info: Project information
-            config: User configuration
+            project_info: Detected project information
+            user_config: User-provided configuration shared by all variants
+            axes: Config key (one of ``MATRIX_AXES``) -> values to try
+            context_lines: Unchanged lines shown around each change
 
         Returns:
-            str: Template path relative to template directory
+            MatrixGenerateResponse: Baseline Dockerfile and per-variant diffs
+
+        Raises:
+            ValueError: If an axis is unknown, the matrix is too large or
+                the baseline cannot be generated
         """
-        language = project_info.language
-        framework = project_info.framework
-
-        # Map to template file
-        template_map = {
-            "python": {
-                "generic": "python/generic.dockerfile.j2",
-                "fastapi": "python/fastapi.dockerfile.j2",
-                "flask": "python/flask.dockerfile.j2",
-                "django": "python/django.dockerfile.j2",
-            },
-            "nodejs": {
-                "generic": "nodejs/generic.dockerfile.j2",
-                "express": "nodejs/express.dockerfile.j2",
-                "nestjs": "nodejs/nestjs.dockerfile.j2",
-                "nextjs": "nodejs/nextjs.dockerfile.j2",
-            },
-            "java": {
-                "spring-boot": "java/spring-boot-jar.dockerfile.j2",
-            }
-        }
+        unknown = set(axes) - set(MATRIX_AXES)
+        if unknown:
+            raise ValueError(f"Unknown matrix axes: {', '.join(sorted(unknown))}")
+        names = [name for name in MATRIX_AXES if axes.get(name)]
+        combinations = list(itertools.product(*(axes[name] for name in names)))
+        if len(combinations) > MATRIX_MAX_VARIANTS:
+            raise ValueError(f"Matrix has {len(combinations)} variants (limit {MATRIX_MAX_VARIANTS})")
+
+        selections: Dict[Tuple[str, Optional[str], Optional[str]], str] = {}
+        renders: Dict[Tuple[str, str], asyncio.Future] = {}
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+        async def limited_render(template_name: str, context: Dict[str, Any]) -> str:
+            async with semaphore:
+                return await self._render(template_name, context)
+
+        async def variant(values: Dict[str, str]) -> Tuple[str, str]:
+            variant_config = {**user_config, **values}
+            variant_info = project_info.model_copy(update={
+                "framework": values.get("framework", project_info.framework),
+                "detected_version": values.get("runtime_version", project_info.detected_version),
+            })
+            selection = (variant_info.framework, variant_config.get("build_tool"), variant_config.get("variant"))
+            if selection not in selections:
+                selections[selection] = self._select_template(variant_info, variant_config)
+            template_name = selections[selection]
+
+            context = self._build_context(variant_info, variant_config)
+            render_key = (template_name, context_hash(context))
+            if render_key not in renders:
+                renders[render_key] = asyncio.ensure_future(limited_render(template_name, context))
+            return template_name, await renders[render_key]
+
+        value_sets = [dict(zip(names, combination)) for combination in combinations]
+        results = await asyncio.gather(*(variant(values) for values in value_sets), return_exceptions=True)
+
+        if isinstance(results[0], BaseException):
+            raise ValueError(f"Baseline variant failed: {results[0]}")
+        baseline_template, baseline = results[0]
+        baseline_lines = baseline.splitlines(keepends=True)
+
+        variants = []
+        for values, result in zip(value_sets[1:], results[1:]):
+            if isinstance(result, BaseException):
+                variants.append(MatrixVariant(values=values, error=str(result) or type(result).__name__))
+                continue
+            template_name, dockerfile = result
+            diff = "".join(difflib.unified_diff(
+                baseline_lines, dockerfile.splitlines(keepends=True),
+                fromfile="baseline", tofile="variant", n=context_lines
+            ))
+            variants.append(MatrixVariant(values=values, template=template_name, diff=diff, identical=not diff))
+
+        logger.info(
+            f"Generated {project_info.language} matrix: {len(combinations)} variants, {len(renders)} distinct renders"
+        )
+        return MatrixGenerateResponse(
+            baseline=MatrixVariant(values=value_sets[0], template=baseline_template, identical=True),
+            dockerfile=baseline,
+            variants=variants,
+            distinct_renders=len(renders)
+        )
+
+    async def generate_batch(
+        self,
+        jobs: List[Tuple[ProjectInfo, Dict[str, Any]]],
+        concurrency: int = BATCH_CONCURRENCY
+    ) -> AsyncIterator[Tuple[List[int], Optional[str], Optional[str]]]:
+        """
+        Generate many Dockerfiles concurrently, yielding them as they complete
 
-        # For Java, check build tool to select correct template
-        if language == "java":
-            build_tool = config.get("build_tool", "jar")
-            if build_tool == "maven":
-                return "java/spring-boot-maven.dockerfile.j2"
-            elif build_tool == "gradle":
-                return "java/spring-boot-gradle.dockerfile.j2"
-            else:  # jar (pre-built)
-                return "java/spring-boot-jar.dockerfile.j2"
+        Identical jobs (same project info and config) are generated once.
+        A failing job is reported with its error and does not affect the
+        others.
 
-        template_path = template_map.get(language, {}).get(framework)
+        Args:
+            jobs: (project info, user config) pairs
+            concurrency: Distinct jobs generated at the same time
+
+        Yields:
+            tuple: Indices of the jobs sharing the result, Dockerfile content
+            (None on failure) and error message (None on success)
+        """
+        groups: Dict[str, List[int]] = {}
+        for index, (project_info, config) in enumerate(jobs):
+            key = context_hash({"project_info": project_info.model_dump(), "config": config})
+            groups.setdefault(key, []).append(index)
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(indices: List[int]) -> Tuple[List[int], Optional[str], Optional[str]]:
+            project_info, config = jobs[indices[0]]
+            async with semaphore:
+                try:
+                    return indices, await self.generate(project_info, config), None
+                except Exception as e:
+                    return indices, None, str(e) or type(e).__name__
+
+        tasks = [asyncio.create_task(run(indices)) for indices in groups.values()]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                yield await completed
+        finally:
+            # The client went away or the consumer stopped early
+            for task in tasks:
+                task.cancel()
 
-        if not template_path:
-            # Fallback to generic template
-            template_path = f"{language}/generic.dockerfile.j2"
-            logger.warning(f"No specific template found, using generic: {template_path}")
+    def _select_template(self, project_info: ProjectInfo, config: Dict[str, Any]) -> str:
+        """
+        Select appropriate template based on language, framework and build tool
 
-        return template_path
+        Args:
+            project_info: Project information
+            config: User configuration
+
+        Returns:
+            str: Template path relative to template directory
+        """
+        return template_registry.select(
+            language=project_info.language,
+            framework=project_info.framework,
+            build_tool=config.get("build_tool"),
+            variant=config.get("variant") or DEFAULT_VARIANT
+        ).path
 
     def _build_context(self, project_info: ProjectInfo, config: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -126,7 +283,7 @@ class DockerfileGenerator:
             context["user"] = "appuser"
 
         if "health_check_path" not in context:
-            context["health_check_path"] = "/health"
+            context["health_check_path"] = self._default_health_check_path(project_info)
 
         # Ensure base_image has sensible default
         if not context.get("base_image"):
@@ -141,10 +298,43 @@ class DockerfileGenerator:
         elif project_info.language == "nodejs":
             context = self._adjust_nodejs_context(context, project_info)
         elif project_info.language == "java":
-            context = self._adjust_java_context(context, project_info)
+            context = self._adjust_java_context(context, project_info, config)
+
+        # BuildKit cache mounts (templates also emit the syntax directive when set)
+        context["build_cache"] = self._flag(context.get("build_cache"))
+        context["cache_mount"] = ""
+        if context["build_cache"]:
+            package_manager = self._package_manager(project_info, config, context)
+            if package_manager in BUILD_CACHE_MOUNTS:
+                # Trailing space so templates can write "RUN {{ cache_mount }}npm ci"
+                context["cache_mount"] = BUILD_CACHE_MOUNTS[package_manager] + " "
 
         return context
 
+    def _package_manager(self, project_info: ProjectInfo, config: Dict[str, Any], context: Dict) -> Optional[str]:
+        """Package manager whose download cache the build stages use"""
+        if project_info.language == "python":
+            # Every Python template installs with pip
+            return "pip"
+        if project_info.language == "nodejs":
+            return context.get("package_manager", "npm")
+        if project_info.language == "java":
+            return config.get("build_tool") or project_info.build_tool
+        return None
+
+    @staticmethod
+    def _flag(value: Any) -> bool:
+        """Boolean option that may arrive as a string from analysis metadata"""
+        if isinstance(value, str):
+            return value.lower() == "true"
+        return bool(value)
+
+    def _default_health_check_path(self, project_info: ProjectInfo) -> str:
+        """Get default health check path, using Actuator's endpoint when the JAR ships it"""
+        if "actuator" in project_info.metadata.get("stacks", "").split(","):
+            return "/actuator/health"
+        return "/health"
+
     def _default_base_image(self, language: str, version: str) -> str:
         """Get default base image for language and version"""
         defaults = {
@@ -185,18 +375,183 @@ class DockerfileGenerator:
 
         return context
 
-    def _adjust_java_context(self, context: Dict, project_info: ProjectInfo) -> Dict:
+    def _adjust_java_context(self, context: Dict, project_info: ProjectInfo, config: Dict[str, Any]) -> Dict:
         """Adjust context for Java projects"""
         # Set JAR filename from metadata
         if not context.get("jar_file_name"):
             context["jar_file_name"] = project_info.metadata.get("jar_filename", "app.jar")
 
-        # Set JVM options if not specified
-        if not context.get("jvm_options"):
-            context["jvm_options"] = "-Xmx512m"
+        context["jvm_options"] = self._jvm_options(context)
+
+        if context.get("variant") == NATIVE_VARIANT:
+            template = template_registry.select(
+                language=project_info.language,
+                framework=project_info.framework,
+                build_tool=config.get("build_tool"),
+                variant=NATIVE_VARIANT
+            )
+            self._check_native(context, prebuilt_jar=template.build_tool == "jar")
+            version = context.get("runtime_version") or "17"
+            context["native_builder_image"] = NATIVE_BUILDER_IMAGE.format(version=version)
+            context["native_runtime_image"] = NATIVE_RUNTIME_IMAGE
+
+        context["cds"] = self._use_cds(context)
+
+        # Minimal runtime linked from the JDK modules found in the uploaded JAR
+        context["jlink"] = self._use_jlink(context)
+        if context["jlink"]:
+            java_version = version_tuple(str(context.get("runtime_version") or "17"))
+            modules = set(self._split_list(context["jdk_modules"]))
+            modules.update(self._split_list(context.get("jlink_add_modules")))
+            if java_version < (22,):
+                modules.update(JLINK_PROVIDER_MODULES)
+            context["jdk_modules"] = sorted(modules)
+            context["jlink_image"] = JLINK_BUILD_IMAGE.format(version=context.get("runtime_version") or "17")
+            context["jlink_runtime_image"] = JLINK_RUNTIME_IMAGE
+            # The linked runtime lacks the JDK's default CDS archive unless jlink regenerates it
+            context["jlink_cds"] = java_version >= (17,)
+            # Numbered compression levels are deprecated from JDK 21
+            context["jlink_compress"] = "zip-6" if java_version >= (21,) else "2"
+
+        # Layered Spring Boot JAR: one image layer per Boot layer
+        context["layered"] = self._use_layered_jar(context)
+        if context["layered"]:
+            context["jar_layers"] = self._split_list(context.get("jar_layers")) or DEFAULT_BOOT_LAYERS
+
+            boot_version = version_tuple(context.get("spring_boot_version"))
+            if not context.get("layer_tool"):
+                context["layer_tool"] = "tools" if boot_version >= (3, 3) else "layertools"
+            if not context.get("launcher_class"):
+                # Launchers moved to the .launch package in Boot 3.2
+                package = "org.springframework.boot.loader"
+                if not boot_version or boot_version >= (3, 2):
+                    package += ".launch"
+                launcher = "WarLauncher" if context["jar_file_name"].endswith(".war") else "JarLauncher"
+                context["launcher_class"] = f"{package}.{launcher}"
 
         return context
 
+    def _jvm_options(self, context: Dict) -> str:
+        """
+        JVM options for the selected tuning profile
+
+        The ``container`` profile (the default unless options are given
+        without a target memory or CPU limit) sizes the heap as a share of
+        the container memory limit and tunes GC, processor count and thread
+        stacks for the detected web stack; explicit options are appended
+        without their fixed heap sizes. The ``fixed`` profile uses the given
+        options as they are.
+        """
+        options = (context.get("jvm_options") or "").strip()
+        memory_mb = context.get("container_memory_mb")
+        cpus = context.get("container_cpus")
+        profile = context.get("jvm_profile") or ("fixed" if options and not (memory_mb or cpus) else "container")
+        if profile == "fixed":
+            return options or "-Xmx512m"
+
+        return merge_jvm_options(
+            container_jvm_options(
+                memory_mb=int(memory_mb) if memory_mb else None,
+                cpus=float(cpus) if cpus else None,
+                web_stack=context.get("web_stack", ""),
+                embedded_server=context.get("embedded_server", ""),
+            ),
+            options
+        )
+
+    def _check_native(self, context: Dict, prebuilt_jar: bool) -> None:
+        """
+        Reject native builds the application cannot support
+
+        Uses the analyzer's compatibility check for uploaded JARs, and the
+        Spring Boot version from the config otherwise; source builds of an
+        unknown version are left to fail in Spring AOT if unsupported. A
+        pre-built JAR only works if it carries Spring AOT output, which only
+        the analysis of an uploaded JAR can tell, so it is never assumed.
+
+        Args:
+            context: Template context
+            prebuilt_jar: Whether the native image is built from a pre-built JAR
+
+        Raises:
+            ValueError: If the application cannot be built as a native image
+        """
+        if prebuilt_jar and "native_issues" not in context and "aot_processed" not in context:
+            raise ValueError(
+                "Native image build not supported: a pre-built JAR must be uploaded and analyzed "
+                "to confirm it was built with Spring AOT processing"
+            )
+        if "native_issues" in context:
+            issues = [issue for issue in context["native_issues"].split("; ") if issue]
+        elif prebuilt_jar:
+            issues = native_issues(
+                context.get("spring_boot_version"),
+                aot_processed=str(context["aot_processed"]) == "True"
+            )
+        elif context.get("spring_boot_version"):
+            issues = native_issues(context["spring_boot_version"])
+        else:
+            issues = []
+        if context.get("system_dependencies"):
+            issues.append("system dependencies cannot be installed on the distroless runtime")
+        if issues:
+            raise ValueError(f"Native image build not supported: {'; '.join(issues)}")
+
+    def _use_cds(self, context: Dict) -> bool:
+        """
+        Whether to train an AppCDS archive during the image build
+
+        The training run extracts the JAR with the ``tools`` jarmode and
+        stops once the context is refreshed, which needs Spring Boot 3.3+.
+        Older or unknown versions, and custom start commands, build the
+        image without the archive. The application context must start
+        without external services for the training run to succeed.
+        """
+        if not self._flag(context.get("cds")) or context.get("custom_start_command"):
+            return False
+        boot_version = context.get("spring_boot_version")
+        if version_tuple(boot_version) < CDS_MIN_BOOT_VERSION:
+            logger.info(f"AppCDS needs Spring Boot 3.3+, building without it (found {boot_version or 'unknown'})")
+            return False
+        return True
+
+    def _use_jlink(self, context: Dict) -> bool:
+        """
+        Whether to ship a jlink runtime instead of the full JRE image
+
+        Needs the JDK modules found when the JAR was analyzed; without them,
+        or when some classes were too large to scan, the image keeps the
+        full JRE. Only the pre-built JAR template renders the jlink stage.
+        """
+        if not self._flag(context.get("jlink")):
+            return False
+        if not self._split_list(context.get("jdk_modules")):
+            logger.info("No JDK modules known for this JAR, building on the full JRE image")
+            return False
+        if str(context.get("jdk_modules_complete", True)) == "False":
+            logger.info("JDK module scan of this JAR is incomplete, building on the full JRE image")
+            return False
+        return True
+
+    @staticmethod
+    def _split_list(value: Any) -> List[str]:
+        """List option that may arrive comma-separated from analysis metadata"""
+        if isinstance(value, str):
+            return [item for item in value.split(",") if item]
+        return list(value or [])
+
+    def _use_layered_jar(self, context: Dict) -> bool:
+        """
+        Whether to extract a pre-built Spring Boot JAR into image layers
+
+        Layering is used when requested or detected at upload, but not with
+        a custom start command, which expects the plain app.jar. Only the
+        pre-built JAR template renders the layered mode.
+        """
+        if context.get("custom_start_command"):
+            return False
+        return self._flag(context.get("layered"))
+
 
 # Global instance
 dockerfile_generator = DockerfileGenerator()
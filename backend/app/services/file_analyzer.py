@@ -1,4 +1,5 @@
 """File and configuration analysis service"""
+import asyncio
 import zipfile
 import json
 import re
@@ -6,15 +7,29 @@ from pathlib import Path
 from typing import Dict, Optional
 import logging
 
-from app.models.schemas import ProjectInfo
+from app.models.schemas import IntegrityReport, ProjectInfo
+from app.services.dependency_scanner import dependency_scanner
+from app.services.jar_index import CDS_MIN_BOOT_VERSION, JarIndex, version_tuple
+from app.services.module_scanner import module_scanner
+from app.services.native_compat import native_issues, native_metadata
+from app.utils.artifact_store import artifact_store
+from app.utils.process_pool import analysis_pool
+from app.utils.archive_guard import ArchiveGuard
+from app.utils.archive_integrity import verify_archive
 
 logger = logging.getLogger(__name__)
 
+# Bump when analyzer output changes so persisted analyses are recomputed
+ANALYSIS_VERSION = 10
+ANALYSIS_SIDECAR = "analysis"
+
+BOOT_LOADER_PACKAGE = "org.springframework.boot.loader."
+
 
 class FileAnalyzer:
     """Analyzes files and configurations to detect language, framework, and build tools"""
 
-    async def analyze_java_artifact(self, file_path: Path) -> ProjectInfo:
+    async def analyze_java_artifact(self, file_path: Path, digest: Optional[str] = None) -> ProjectInfo:
         """
         Analyze JAR/WAR file
 
@@ -25,56 +40,176 @@ class FileAnalyzer:
 
         Args:
             file_path: Path to JAR/WAR file
+            digest: SHA-256 of the artifact in the artifact store
 
         Returns:
             ProjectInfo: Detected project information
+
+        Raises:
+            ValueError: If the archive is corrupt or not a JAR/WAR
+            ArchiveGuardError: If the archive exceeds size or ratio limits
+        """
+        project_info, _ = await self.inspect_java_artifact(file_path, digest)
+        return project_info
+
+    async def inspect_java_artifact(
+        self,
+        file_path: Path,
+        digest: Optional[str] = None
+    ) -> tuple[ProjectInfo, Optional[IntegrityReport]]:
+        """
+        Analyze a JAR/WAR file and verify its integrity
+
+        When the artifact's digest is known, a previously persisted analysis
+        for the same content is returned without reopening the archive.
+        Otherwise the archive is analyzed, CRC-verified and its nested
+        dependency JARs and JDK module usage scanned concurrently in the
+        analysis worker pool, keeping zip scanning off the event loop.
+
+        Args:
+            file_path: Path to JAR/WAR file
+            digest: SHA-256 of the artifact in the artifact store
+
+        Returns:
+            tuple: (project_info, integrity_report)
+
+        Raises:
+            ValueError: If the archive is corrupt or not a JAR/WAR
+            ArchiveGuardError: If the archive exceeds size or ratio limits
         """
+        if digest:
+            cached = self._load_cached_analysis(digest)
+            if cached:
+                project_info, report = cached
+                project_info.metadata["jar_filename"] = file_path.name
+                logger.info(f"Using cached analysis for artifact {digest[:12]}")
+                return project_info, report
+
+        report, project_info, inventory, modules = await asyncio.gather(
+            verify_archive(file_path),
+            analysis_pool.run("analyze_java_artifact", analyze_java_archive, str(file_path)),
+            dependency_scanner.scan(file_path, digest),
+            module_scanner.scan(file_path, digest),
+            return_exceptions=True
+        )
+        if isinstance(report, BaseException):
+            raise report
+        if not report.valid:
+            location = f" ({report.failed_member})" if report.failed_member else ""
+            raise ValueError(f"Invalid JAR/WAR structure{location}: {report.error}")
+        if isinstance(project_info, BaseException):
+            raise project_info
+        if isinstance(inventory, BaseException):
+            raise inventory
+        if isinstance(modules, BaseException):
+            raise modules
+
+        # What is actually inside the JAR drives runtime settings in the generator
+        project_info.dependencies = dependency_scanner.coordinates(inventory)
+        project_info.metadata.update(dependency_scanner.to_metadata(inventory))
+        project_info.metadata.update(module_scanner.to_metadata(modules))
+        project_info.metadata.update(native_metadata(native_issues(
+            project_info.metadata.get("spring_boot_version"),
+            aot_processed=project_info.metadata.get("aot_processed") == "True",
+            artifacts=(d["artifact"] for d in inventory.get("dependencies", []))
+        )))
+
+        # Only fully verified archives are cached, so a cache hit implies a valid structure;
+        # one whose verification ran out of budget is verified again next time
+        if digest and report.complete:
+            artifact_store.save_json(digest, ANALYSIS_SIDECAR, {
+                "version": ANALYSIS_VERSION,
+                "project_info": project_info.model_dump(),
+                "integrity": report.model_dump()
+            })
+
+        return project_info, report
+
+    def _load_cached_analysis(self, digest: str) -> Optional[tuple[ProjectInfo, Optional[IntegrityReport]]]:
+        """
+        Load a persisted analysis produced by the current analyzer version
+
+        Args:
+            digest: SHA-256 of the artifact
+
+        Returns:
+            Optional[tuple]: Cached (project_info, integrity_report), or None
+        """
+        cached = artifact_store.load_json(digest, ANALYSIS_SIDECAR)
+        if not cached or cached.get("version") != ANALYSIS_VERSION:
+            return None
         try:
+            report = cached.get("integrity")
+            return ProjectInfo(**cached["project_info"]), IntegrityReport(**report) if report else None
+        except Exception as e:
+            logger.warning(f"Discarding invalid cached analysis for {digest[:12]}: {e}")
+            return None
+
+    def _analyze_java_archive(self, file_path: Path) -> ProjectInfo:
+        """
+        Open and inspect a JAR/WAR archive
+
+        Args:
+            file_path: Path to JAR/WAR file
+
+        Returns:
+            ProjectInfo: Detected project information
+        """
+        try:
+            # Reject oversized central directories before zipfile parses them
+            guard = ArchiveGuard()
+            guard.check_entry_count(file_path)
+
             with zipfile.ZipFile(file_path, 'r') as jar:
-                manifest_info = self._parse_manifest(jar)
-
-                # Detect if it's a Spring Boot application
-                framework = "spring-boot" if manifest_info.get("spring_boot") else "java"
-
-                # Detect build tool from manifest or JAR structure
-                build_tool = self._detect_java_build_tool(jar, manifest_info)
-
-                return ProjectInfo(
-                    language="java",
-                    framework=framework,
-                    detected_version=manifest_info.get("java_version", "17"),
-                    build_tool=build_tool,
-                    main_class=manifest_info.get("main_class"),
-                    metadata={
-                        "spring_boot_version": manifest_info.get("spring_boot_version", ""),
-                        "fat_jar": str(manifest_info.get("fat_jar", True)),
-                        "jar_filename": file_path.name
-                    }
-                )
+                # One pass over the central directory; detectors query the index
+                index = JarIndex.from_zip(jar, guard)
+                layers_info = self._detect_boot_layers(jar, index, guard)
+
+            manifest_info = self._parse_manifest(index)
+
+            # Detect if it's a Spring Boot application
+            framework = "spring-boot" if manifest_info.get("spring_boot") else "java"
+
+            # Detect build tool from manifest or JAR structure
+            build_tool = self._detect_java_build_tool(index, manifest_info)
+
+            return ProjectInfo(
+                language="java",
+                framework=framework,
+                detected_version=manifest_info.get("java_version", "17"),
+                build_tool=build_tool,
+                main_class=manifest_info.get("main_class"),
+                metadata={
+                    "spring_boot_version": manifest_info.get("spring_boot_version", ""),
+                    "cds_available": str(
+                        version_tuple(manifest_info.get("spring_boot_version")) >= CDS_MIN_BOOT_VERSION
+                    ),
+                    "fat_jar": str(manifest_info.get("fat_jar", True)),
+                    # Spring AOT writes native-image hints next to the application classes
+                    "aot_processed": str(index.has_prefix("BOOT-INF/classes/META-INF/native-image/")),
+                    "jar_filename": file_path.name,
+                    **layers_info
+                }
+            )
 
         except Exception as e:
             logger.error(f"Failed to analyze JAR file: {e}")
             raise
 
-    def _parse_manifest(self, jar: zipfile.ZipFile) -> Dict:
+    def _parse_manifest(self, index: JarIndex) -> Dict:
         """
-        Parse MANIFEST.MF from JAR file
+        Extract relevant MANIFEST.MF information from the JAR index
 
         Args:
-            jar: ZipFile object
+            index: Index of the JAR file
 
         Returns:
             dict: Parsed manifest information
         """
         try:
-            manifest_data = jar.read('META-INF/MANIFEST.MF').decode('utf-8')
-            manifest = {}
-
-            # Parse manifest entries
-            for line in manifest_data.split('\n'):
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    manifest[key.strip()] = value.strip()
+            manifest = index.manifest
+            if not manifest:
+                raise ValueError("MANIFEST.MF is missing or empty")
 
             # Extract relevant information
             result = {}
@@ -97,7 +232,7 @@ class FileAnalyzer:
                 result['java_version'] = manifest['Build-Jdk'].split('.')[0]
 
             # Fat JAR detection (Spring Boot apps are typically fat JARs)
-            result['fat_jar'] = result.get('spring_boot', False) or 'BOOT-INF' in [f.filename for f in jar.filelist]
+            result['fat_jar'] = result.get('spring_boot', False) or index.has_dir('BOOT-INF')
 
             return result
 
@@ -105,25 +240,71 @@ class FileAnalyzer:
             logger.warning(f"Failed to parse manifest: {e}")
             return {"spring_boot": False, "fat_jar": True}
 
-    def _detect_java_build_tool(self, jar: zipfile.ZipFile, manifest_info: Dict) -> str:
+    def _detect_boot_layers(self, jar: zipfile.ZipFile, index: JarIndex, guard: ArchiveGuard) -> Dict[str, str]:
         """
-        Detect build tool (Maven, Gradle, or just JAR)
+        Detect Spring Boot layered-JAR support
+
+        A JAR can be split into image layers when it carries a layers index
+        and a jarmode that can extract it: ``tools`` (Boot 3.3+) or the older
+        ``layertools``.
 
         Args:
             jar: ZipFile object
+            index: Index of the JAR file
+            guard: Limits for reading the layers index
+
+        Returns:
+            dict: ``layered``, ``layer_tool``, ``jar_layers`` (comma-separated,
+            in layer order) and ``launcher_class`` metadata
+        """
+        layers_index = index.manifest.get("Spring-Boot-Layers-Index")
+        if not layers_index:
+            for candidate in ("BOOT-INF/layers.idx", "WEB-INF/layers.idx"):
+                if index.has(candidate):
+                    layers_index = candidate
+                    break
+
+        layers = []
+        if layers_index and index.has(layers_index):
+            for line in guard.read(jar, layers_index).decode("utf-8", errors="replace").splitlines():
+                # Top-level entries look like: - "dependencies":
+                if line.startswith('- "'):
+                    layers.append(line[3:].split('"', 1)[0])
+
+        lib_dir = "WEB-INF/lib/" if layers_index and layers_index.startswith("WEB-INF/") else "BOOT-INF/lib/"
+        if index.has_prefix(f"{lib_dir}spring-boot-jarmode-tools"):
+            layer_tool = "tools"
+        elif index.has_prefix(f"{lib_dir}spring-boot-jarmode-layertools"):
+            layer_tool = "layertools"
+        else:
+            # Without a jarmode the layers cannot be extracted
+            layer_tool = ""
+
+        main_class = index.manifest.get("Main-Class", "")
+        return {
+            "layered": str(bool(layers and layer_tool)),
+            "layer_tool": layer_tool,
+            "jar_layers": ",".join(layers),
+            "launcher_class": main_class if main_class.startswith(BOOT_LOADER_PACKAGE) else ""
+        }
+
+    def _detect_java_build_tool(self, index: JarIndex, manifest_info: Dict) -> str:
+        """
+        Detect build tool (Maven, Gradle, or just JAR)
+
+        Args:
+            index: Index of the JAR file
             manifest_info: Parsed manifest information
 
         Returns:
             str: Build tool name
         """
-        files = jar.namelist()
-
         # Check for Maven
-        if any('maven' in f.lower() for f in files):
+        if index.mentions_maven:
             return "maven"
 
         # Check for Gradle
-        if any('gradle' in f.lower() for f in files):
+        if index.mentions_gradle:
             return "gradle"
 
         # Default to JAR (pre-built artifact)
@@ -249,3 +430,16 @@ class FileAnalyzer:
 
 # Global instance
 file_analyzer = FileAnalyzer()
+
+
+def analyze_java_archive(file_path: str) -> ProjectInfo:
+    """
+    Inspect a JAR/WAR archive (entry point for analysis worker processes)
+
+    Args:
+        file_path: Path to JAR/WAR file
+
+    Returns:
+        ProjectInfo: Detected project information
+    """
+    return file_analyzer._analyze_java_archive(Path(file_path))
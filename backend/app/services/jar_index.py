@@ -0,0 +1,243 @@
+"""Single-pass index over a JAR/WAR central directory"""
+from bisect import bisect_left
+from functools import cached_property
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+import re
+import zipfile
+
+from app.utils.archive_guard import ArchiveGuard
+
+MANIFEST_PATH = "META-INF/MANIFEST.MF"
+
+# First matching prefix wins, so more specific prefixes come first
+LAYER_PREFIXES = (
+    ("boot_classes", "BOOT-INF/classes/"),
+    ("boot_lib", "BOOT-INF/lib/"),
+    ("boot_inf", "BOOT-INF/"),
+    ("web_classes", "WEB-INF/classes/"),
+    ("web_lib_provided", "WEB-INF/lib-provided/"),
+    ("web_lib", "WEB-INF/lib/"),
+    ("web_inf", "WEB-INF/"),
+    ("maven", "META-INF/maven/"),
+    ("meta_inf", "META-INF/"),
+    ("loader", "org/springframework/boot/loader/"),
+)
+OTHER_LAYER = "root"
+
+# First Spring Boot release whose tools jarmode extracts a classpath suited to AppCDS training
+CDS_MIN_BOOT_VERSION = (3, 3)
+
+_VERSION_PART_RE = re.compile(r"\d+")
+
+
+def version_tuple(version: Optional[str]) -> Tuple[int, ...]:
+    """
+    Numeric prefix of a dotted version, e.g. "3.3.2" -> (3, 3, 2)
+
+    Qualifiers such as "-SNAPSHOT" or "-M1" are ignored.
+
+    Args:
+        version: Version string
+
+    Returns:
+        tuple: Version components, empty if none could be parsed
+    """
+    parts = []
+    for part in (version or "").split("."):
+        match = _VERSION_PART_RE.match(part)
+        if not match:
+            break
+        parts.append(int(match.group()))
+    return tuple(parts)
+
+
+def parse_manifest(data: bytes) -> Dict[str, str]:
+    """
+    Parse the main section of a MANIFEST.MF
+
+    Handles continuation lines (a leading space continues the previous
+    value), which the JAR spec uses to wrap lines at 72 bytes.
+
+    Args:
+        data: Raw manifest bytes
+
+    Returns:
+        dict: Attribute name to value
+    """
+    attributes: Dict[str, str] = {}
+    last_key = None
+    for line in data.decode("utf-8", errors="replace").splitlines():
+        if not line:
+            # A blank line ends the main section
+            if attributes:
+                break
+            continue
+        if line.startswith(" ") and last_key:
+            attributes[last_key] += line[1:]
+        elif ":" in line:
+            key, value = line.split(":", 1)
+            last_key = key.strip()
+            attributes[last_key] = value.strip()
+    return attributes
+
+
+class JarIndex:
+    """
+    Everything detectors need to know about an archive's layout
+
+    Built from one pass over the central directory. Derived views (sorted
+    names for prefix queries, the directory set, layer classification and
+    the maven/gradle flags) are computed on first use and cached, so each
+    detector pays for at most one C-speed scan no matter how often it asks.
+    Detectors query the index instead of rescanning ``namelist()``.
+    """
+
+    def __init__(self, infos: List[zipfile.ZipInfo], manifest: Dict[str, str]):
+        self.infos = infos
+        self.names = [info.filename for info in infos]
+        self.manifest = manifest
+
+    @cached_property
+    def total_uncompressed(self) -> int:
+        """Sum of declared uncompressed entry sizes"""
+        return sum(info.file_size for info in self.infos)
+
+    @cached_property
+    def total_compressed(self) -> int:
+        """Sum of compressed entry sizes"""
+        return sum(info.compress_size for info in self.infos)
+
+    @cached_property
+    def entries(self) -> List[str]:
+        """Entry names in sorted order"""
+        return sorted(self.names)
+
+    @cached_property
+    def _name_set(self) -> set:
+        return set(self.names)
+
+    @cached_property
+    def _dirs(self) -> set:
+        """Every directory that contains at least one entry, with trailing slash"""
+        parents = {name[:name.rfind("/", 0, len(name) - 1) + 1] for name in self.names}
+        dirs = set()
+        for directory in parents:
+            # Walk up until reaching an ancestor that is already recorded
+            while directory and directory not in dirs:
+                dirs.add(directory)
+                directory = directory[:directory.rfind("/", 0, len(directory) - 1) + 1]
+        return dirs
+
+    @cached_property
+    def _lowered(self) -> str:
+        return "\n".join(self.names).lower()
+
+    @cached_property
+    def _layers(self) -> Dict[str, List[str]]:
+        layers: Dict[str, List[str]] = {}
+        for name in self.names:
+            layers.setdefault(self._classify(name), []).append(name)
+        return layers
+
+    @classmethod
+    def from_zip(cls, jar: zipfile.ZipFile, guard: Optional[ArchiveGuard] = None) -> "JarIndex":
+        """
+        Build an index from an open archive
+
+        Args:
+            jar: ZipFile object
+            guard: Limits to enforce; a default guard is used if omitted
+
+        Returns:
+            JarIndex: Index of the archive
+
+        Raises:
+            ArchiveGuardError: If declared sizes or ratios exceed the limits
+        """
+        guard = guard or ArchiveGuard()
+        infos = jar.infolist()
+        guard.check_central_directory(infos)
+
+        manifest = {}
+        if MANIFEST_PATH in jar.NameToInfo:
+            manifest = parse_manifest(guard.read(jar, MANIFEST_PATH))
+        return cls(infos, manifest)
+
+    @classmethod
+    def open(cls, file_path: Union[str, Path], guard: Optional[ArchiveGuard] = None) -> "JarIndex":
+        """
+        Build an index from an archive on disk
+
+        Args:
+            file_path: Path to JAR/WAR file
+            guard: Limits to enforce; a default guard is used if omitted
+
+        Returns:
+            JarIndex: Index of the archive
+
+        Raises:
+            ArchiveGuardError: If the archive exceeds the limits
+        """
+        guard = guard or ArchiveGuard()
+        guard.check_entry_count(file_path)
+        with zipfile.ZipFile(file_path, "r") as jar:
+            return cls.from_zip(jar, guard)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def has(self, name: str) -> bool:
+        """Whether an entry with exactly this name exists"""
+        return name in self._name_set
+
+    def has_dir(self, directory: str) -> bool:
+        """Whether any entry lives under ``directory`` (with or without trailing slash)"""
+        if not directory.endswith("/"):
+            directory += "/"
+        return directory in self._dirs or directory in self._name_set
+
+    def has_prefix(self, prefix: str) -> bool:
+        """Whether any entry name starts with ``prefix``"""
+        position = bisect_left(self.entries, prefix)
+        return position < len(self.entries) and self.entries[position].startswith(prefix)
+
+    def iter_prefix(self, prefix: str) -> Iterator[str]:
+        """Entry names starting with ``prefix``, in sorted order"""
+        for position in range(bisect_left(self.entries, prefix), len(self.entries)):
+            name = self.entries[position]
+            if not name.startswith(prefix):
+                break
+            yield name
+
+    def layer(self, layer: str) -> List[str]:
+        """Entries classified into a layer (see ``LAYER_PREFIXES``)"""
+        return self._layers.get(layer, [])
+
+    def layer_counts(self) -> Dict[str, int]:
+        """Number of entries per layer"""
+        return {layer: len(names) for layer, names in self._layers.items()}
+
+    def manifest_value(self, *keys: str) -> Optional[str]:
+        """First present manifest attribute among ``keys``"""
+        for key in keys:
+            if key in self.manifest:
+                return self.manifest[key]
+        return None
+
+    @property
+    def mentions_maven(self) -> bool:
+        """Any entry path contains "maven" (case-insensitive)"""
+        return "maven" in self._lowered
+
+    @property
+    def mentions_gradle(self) -> bool:
+        """Any entry path contains "gradle" (case-insensitive)"""
+        return "gradle" in self._lowered
+
+    @staticmethod
+    def _classify(name: str) -> str:
+        for layer, prefix in LAYER_PREFIXES:
+            if name.startswith(prefix):
+                return layer
+        return OTHER_LAYER
@@ -0,0 +1,103 @@
+"""Container-aware JVM option profiles"""
+from typing import List, Optional
+import math
+
+# Heap share of the container memory limit, by limit (MiB); small limits leave
+# proportionally more room for metaspace, code cache, thread stacks and buffers
+HEAP_PERCENTAGES = ((512, 50), (1024, 60), (4096, 70))
+DEFAULT_HEAP_PERCENTAGE = 75
+# Used when the limit is only known at runtime
+RUNTIME_HEAP_PERCENTAGE = 70
+
+# Below these the JVM's own server-class ergonomics would pick the serial collector
+G1_MIN_MEMORY_MB = 1792
+G1_MIN_CPUS = 2
+
+SMALL_CONTAINER_MB = 768
+THREAD_PER_REQUEST_SERVERS = {"tomcat", "jetty", "undertow"}
+
+
+def heap_percentage(memory_mb: Optional[int]) -> int:
+    """
+    MaxRAMPercentage for a container memory limit
+
+    Args:
+        memory_mb: Memory limit in MiB, or None if read from cgroups at runtime
+
+    Returns:
+        int: Heap share of the limit in percent
+    """
+    if memory_mb is None:
+        return RUNTIME_HEAP_PERCENTAGE
+    for limit, percentage in HEAP_PERCENTAGES:
+        if memory_mb < limit:
+            return percentage
+    return DEFAULT_HEAP_PERCENTAGE
+
+
+def container_jvm_options(memory_mb: Optional[int] = None, cpus: Optional[float] = None,
+                          web_stack: str = "", embedded_server: str = "") -> List[str]:
+    """
+    JVM options sized for a container
+
+    The heap is a percentage of the container memory limit, so the same
+    image fits any limit; JDK 11+ reads the limit from cgroups at startup.
+    When memory and CPUs are given, the collector and processor count are
+    pinned for them; otherwise the JVM's ergonomics choose at runtime.
+    Thread-per-request servers (Tomcat, Jetty, Undertow) get smaller
+    thread stacks; Netty event loops get a direct-memory cap instead.
+
+    Args:
+        memory_mb: Target container memory limit in MiB
+        cpus: Target container CPU limit
+        web_stack: "mvc", "webflux" or "" (from the dependency scan)
+        embedded_server: "tomcat", "jetty", "undertow", "netty" or ""
+
+    Returns:
+        list: JVM options
+    """
+    options = [f"-XX:MaxRAMPercentage={heap_percentage(memory_mb)}.0"]
+
+    if memory_mb is not None and cpus is not None:
+        if memory_mb >= G1_MIN_MEMORY_MB and cpus >= G1_MIN_CPUS:
+            options.append("-XX:+UseG1GC")
+        else:
+            options.append("-XX:+UseSerialGC")
+    if cpus is not None:
+        # A fractional limit still schedules threads on whole processors
+        options.append(f"-XX:ActiveProcessorCount={max(1, math.ceil(cpus))}")
+
+    if embedded_server in THREAD_PER_REQUEST_SERVERS or (not embedded_server and web_stack == "mvc"):
+        options.append("-Xss512k")
+    elif embedded_server == "netty" or web_stack == "webflux":
+        if memory_mb is not None:
+            options.append(f"-XX:MaxDirectMemorySize={max(64, memory_mb // 10)}m")
+
+    if memory_mb is not None and memory_mb < SMALL_CONTAINER_MB:
+        options.append("-XX:ReservedCodeCacheSize=64m")
+
+    # Let the orchestrator restart the container instead of limping on
+    options.append("-XX:+ExitOnOutOfMemoryError")
+    return options
+
+
+def merge_jvm_options(profile: List[str], user_options: str) -> str:
+    """
+    Append user options to a profile, dropping fixed heap sizes
+
+    ``-Xmx``/``-Xms`` would override the profile's percentage-based heap,
+    so they are removed; every other user option is kept and, coming last,
+    wins over the profile.
+
+    Args:
+        profile: Options from ``container_jvm_options``
+        user_options: Space-separated options from the user config
+
+    Returns:
+        str: Combined options
+    """
+    extra = [
+        option for option in (user_options or "").split()
+        if not option.startswith(("-Xmx", "-Xms")) and option not in profile
+    ]
+    return " ".join(profile + extra)
@@ -0,0 +1,261 @@
+"""JDK modules required by the classes of a JAR/WAR, for jlink runtimes"""
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
+import io
+import os
+import re
+import struct
+import zipfile
+import logging
+
+from app.config import MODULE_SCAN_MAX_CLASS_BYTES, MODULE_SCAN_PARALLEL_MIN_BYTES, NESTED_JAR_MAX_BYTES
+from app.services.dependency_scanner import LIB_DIRS, _MemberSlice, _stored_member_offset
+from app.utils.archive_guard import ArchiveGuard, ArchiveGuardError
+from app.utils.artifact_store import artifact_store
+from app.utils.process_pool import BoundedProcessPool, analysis_pool
+
+logger = logging.getLogger(__name__)
+
+# Bump when scanner output changes so persisted module sets are recomputed
+MODULE_SCAN_VERSION = 2
+MODULE_SIDECAR = "modules"
+
+# Exported JDK packages (slash form) -> module; the longest matching prefix wins
+JDK_PACKAGE_MODULES = {
+    "java": "java.base",
+    "javax/crypto": "java.base",
+    "javax/net": "java.base",
+    "javax/security/auth": "java.base",
+    "javax/security/cert": "java.base",
+    "java/awt": "java.desktop",
+    "java/awt/datatransfer": "java.datatransfer",
+    "java/applet": "java.desktop",
+    "java/beans": "java.desktop",
+    "javax/accessibility": "java.desktop",
+    "javax/imageio": "java.desktop",
+    "javax/print": "java.desktop",
+    "javax/sound": "java.desktop",
+    "javax/swing": "java.desktop",
+    "java/lang/instrument": "java.instrument",
+    "java/lang/management": "java.management",
+    "javax/management": "java.management",
+    "javax/management/remote/rmi": "java.management.rmi",
+    "java/net/http": "java.net.http",
+    "java/rmi": "java.rmi",
+    "javax/rmi/ssl": "java.rmi",
+    "java/sql": "java.sql",
+    "javax/sql": "java.sql",
+    "javax/sql/rowset": "java.sql.rowset",
+    "java/util/logging": "java.logging",
+    "java/util/prefs": "java.prefs",
+    "javax/annotation/processing": "java.compiler",
+    "javax/lang/model": "java.compiler",
+    "javax/tools": "java.compiler",
+    "javax/naming": "java.naming",
+    "javax/script": "java.scripting",
+    "javax/security/auth/kerberos": "java.security.jgss",
+    "org/ietf/jgss": "java.security.jgss",
+    "javax/security/sasl": "java.security.sasl",
+    "javax/smartcardio": "java.smartcardio",
+    "javax/transaction/xa": "java.transaction.xa",
+    "javax/xml": "java.xml",
+    "javax/xml/crypto": "java.xml.crypto",
+    "org/w3c/dom": "java.xml",
+    "org/xml/sax": "java.xml",
+    "com/sun/management": "jdk.management",
+    "com/sun/net/httpserver": "jdk.httpserver",
+    "com/sun/nio/sctp": "jdk.sctp",
+    "com/sun/security/auth": "jdk.security.auth",
+    "jdk/jfr": "jdk.jfr",
+    "jdk/net": "jdk.net",
+    "jdk/nio": "jdk.net",
+    "sun/misc": "jdk.unsupported",
+    "sun/reflect": "jdk.unsupported",
+}
+
+# Type names in the constant pool: class entries, and descriptors and signatures ("Ljava/...;").
+# Unanchored for speed; a rare match inside another name can only add a module, never drop one.
+_TYPE_NAME_RE = re.compile(rb"(?:java|javax|jdk|sun|com/sun|org/w3c|org/xml|org/ietf)/[\w/$]+")
+
+# Where the application's own classes live, by archive layout
+CLASS_DIRS = ("BOOT-INF/classes/", "WEB-INF/classes/")
+
+
+def module_for(type_name: str) -> Optional[str]:
+    """
+    JDK module exporting a type
+
+    Args:
+        type_name: Binary name in slash form, e.g. "java/sql/Connection"
+
+    Returns:
+        Optional[str]: Module name, or None for types outside the exported JDK packages
+    """
+    prefix = type_name
+    while prefix:
+        module = JDK_PACKAGE_MODULES.get(prefix)
+        if module:
+            return module
+        prefix = prefix.rpartition("/")[0]
+    return None
+
+
+def _scan_classes(archive: zipfile.ZipFile, guard: ArchiveGuard,
+                  infos: Iterable[zipfile.ZipInfo]) -> Tuple[Set[bytes], int]:
+    """JDK type names referenced by some classes of an archive, and how many classes were too large to read"""
+    referenced = set()
+    skipped = 0
+    for info in infos:
+        if info.file_size > MODULE_SCAN_MAX_CLASS_BYTES:
+            logger.warning(f"Skipping {info.filename} ({info.file_size} bytes) in the JDK module scan")
+            skipped += 1
+            continue
+        referenced.update(_TYPE_NAME_RE.findall(guard.read(archive, info, max_bytes=MODULE_SCAN_MAX_CLASS_BYTES)))
+    return referenced, skipped
+
+
+def _own_classes(infos: List[zipfile.ZipInfo]) -> List[zipfile.ZipInfo]:
+    """Classes of the archive itself, outside its nested library JARs"""
+    classes = [info for info in infos if info.filename.endswith(".class")]
+    in_class_dirs = [info for info in classes if info.filename.startswith(CLASS_DIRS)]
+    # A plain JAR keeps its classes at the root; the Boot loader there only uses java.base
+    return in_class_dirs or classes
+
+
+def scan_modules_part(file_path: str, part: int, parts: int) -> Tuple[List[str], int]:
+    """
+    JDK modules referenced by one share of an archive (entry point for worker processes)
+
+    Share 0 also covers the archive's own classes. Nested JARs are read
+    the same way as by the dependency scanner, without extracting them.
+    Classes larger than ``MODULE_SCAN_MAX_CLASS_BYTES`` are skipped and
+    counted rather than failing the scan.
+
+    Args:
+        file_path: Path to the JAR/WAR
+        part: Index of the share to scan
+        parts: Total number of shares
+
+    Returns:
+        tuple: (module names, sorted; number of skipped classes)
+
+    Raises:
+        ArchiveGuardError: If an archive exceeds size or ratio limits
+    """
+    guard = ArchiveGuard()
+    guard.check_entry_count(file_path)
+    referenced = set()
+    skipped = 0
+    with open(file_path, "rb") as raw, zipfile.ZipFile(raw, "r") as jar:
+        infos = jar.infolist()
+        guard.check_central_directory(infos)
+        if part == 0:
+            referenced, skipped = _scan_classes(jar, guard, _own_classes(infos))
+
+        libs = sorted(
+            (info for info in infos
+             if info.filename.endswith(".jar") and info.filename.rsplit("/", 1)[0] + "/" in LIB_DIRS),
+            key=lambda info: info.header_offset
+        )
+        for info in libs[part::parts]:
+            try:
+                if info.compress_type == zipfile.ZIP_STORED:
+                    start = _stored_member_offset(raw, info)
+                    source = io.BufferedReader(_MemberSlice(raw, start, info.compress_size))
+                else:
+                    source = io.BytesIO(guard.read(jar, info, max_bytes=NESTED_JAR_MAX_BYTES))
+                with zipfile.ZipFile(source, "r") as nested:
+                    nested_guard = ArchiveGuard()
+                    nested_infos = nested.infolist()
+                    nested_guard.check_central_directory(nested_infos)
+                    nested_referenced, nested_skipped = _scan_classes(
+                        nested, nested_guard, (i for i in nested_infos if i.filename.endswith(".class"))
+                    )
+                    referenced |= nested_referenced
+                    skipped += nested_skipped
+            except ArchiveGuardError:
+                raise
+            except (zipfile.BadZipFile, OSError, struct.error) as e:
+                # The dependency scan reports unreadable nested JARs
+                logger.debug(f"Skipping unreadable nested JAR {info.filename}: {e}")
+
+    modules = {module_for(name.decode("ascii")) for name in referenced}
+    modules.discard(None)
+    return sorted(modules), skipped
+
+
+class ModuleScanner:
+    """
+    Computes the JDK modules an artifact needs, like ``jdeps --print-module-deps``
+
+    Every class of the application and of its nested library JARs is
+    scanned for the JDK types named in its constant pool, and their
+    packages are mapped to the modules exporting them. Modules only
+    reached through reflection or ``ServiceLoader`` cannot be seen this
+    way, nor can those of classes too large to scan, which mark the result
+    incomplete. The work is shared out across the analysis worker pool and
+    the result is persisted next to the artifact, keyed by its digest.
+    """
+
+    def __init__(self, pool: BoundedProcessPool = analysis_pool):
+        self.pool = pool
+
+    async def scan(self, file_path: Path, digest: Optional[str] = None) -> dict:
+        """
+        Find the JDK modules used by an artifact
+
+        Args:
+            file_path: Path to JAR/WAR file
+            digest: SHA-256 of the artifact in the artifact store
+
+        Returns:
+            dict: ``modules`` (sorted module names), ``complete`` and ``skipped_classes``
+
+        Raises:
+            ArchiveGuardError: If an archive exceeds size or ratio limits
+        """
+        if digest:
+            cached = artifact_store.load_json(digest, MODULE_SIDECAR)
+            if cached and cached.get("version") == MODULE_SCAN_VERSION:
+                return cached
+
+        size = os.path.getsize(file_path)
+        parts = self.pool.parts_for(size, MODULE_SCAN_PARALLEL_MIN_BYTES)
+        results = await asyncio.gather(*(
+            self.pool.run("scan_modules", scan_modules_part, str(file_path), part, parts)
+            for part in range(parts)
+        ))
+
+        modules = set(module for found, _ in results for module in found)
+        modules.add("java.base")
+        skipped = sum(skipped for _, skipped in results)
+        result = {
+            "version": MODULE_SCAN_VERSION,
+            "modules": sorted(modules),
+            "complete": skipped == 0,
+            "skipped_classes": skipped,
+        }
+        if digest:
+            artifact_store.save_json(digest, MODULE_SIDECAR, result)
+        logger.info(f"{file_path.name} uses JDK modules: {', '.join(result['modules'])}")
+        return result
+
+    def to_metadata(self, result: dict) -> Dict[str, str]:
+        """
+        Flatten a scan result into ``ProjectInfo.metadata`` entries
+
+        Args:
+            result: Result of ``scan``
+
+        Returns:
+            dict: ``jdk_modules`` (comma-separated) and ``jdk_modules_complete``
+        """
+        return {
+            "jdk_modules": ",".join(result.get("modules", [])),
+            "jdk_modules_complete": str(result.get("complete", True)),
+        }
+
+
+# Global instance
+module_scanner = ModuleScanner()
@@ -0,0 +1,61 @@
+"""GraalVM native-image compatibility of Spring Boot applications"""
+from typing import Dict, Iterable, List, Optional
+
+from app.services.jar_index import version_tuple
+
+# Spring AOT, which native builds rely on, arrived in Spring Boot 3.0
+NATIVE_MIN_BOOT_VERSION = (3, 0)
+
+# Artifact IDs known to fail or be unsupported in native images -> reason
+PROBLEMATIC_LIBRARIES = {
+    "spring-boot-devtools": "Spring Boot DevTools is not supported in native images",
+    "log4j-core": "Spring Boot does not support Log4j 2 in native images, use Logback",
+    "springfox-core": "Springfox depends on runtime reflection, use springdoc-openapi 2",
+    "cglib": "cglib generates classes at runtime",
+    "javassist": "Javassist generates classes at runtime",
+    "groovy": "dynamic Groovy generates classes at runtime",
+    "nashorn-core": "Nashorn compiles scripts to bytecode at runtime",
+    "jython-standalone": "Jython compiles scripts to bytecode at runtime",
+}
+
+
+def native_issues(spring_boot_version: Optional[str], aot_processed: Optional[bool] = None,
+                  artifacts: Iterable[str] = ()) -> List[str]:
+    """
+    Reasons an application cannot be built as a native image
+
+    Args:
+        spring_boot_version: Spring Boot version, if known
+        aot_processed: Whether a pre-built JAR carries Spring AOT output;
+            None for source builds, where the build runs AOT processing
+        artifacts: Artifact IDs of the application's dependencies
+
+    Returns:
+        list: Human-readable issues, empty if none were found
+    """
+    issues = []
+    if not spring_boot_version:
+        issues.append("not a Spring Boot application, or its version is unknown")
+    elif version_tuple(spring_boot_version) < NATIVE_MIN_BOOT_VERSION:
+        issues.append(f"Spring Boot {spring_boot_version} predates Spring AOT (3.0+ required)")
+    if aot_processed is False:
+        issues.append("the JAR was built without Spring AOT processing (build it with the native profile)")
+    for artifact in sorted(set(artifacts) & PROBLEMATIC_LIBRARIES.keys()):
+        issues.append(f"{artifact}: {PROBLEMATIC_LIBRARIES[artifact]}")
+    return issues
+
+
+def native_metadata(issues: List[str]) -> Dict[str, str]:
+    """
+    Flatten a compatibility check into ``ProjectInfo.metadata`` entries
+
+    Args:
+        issues: Result of ``native_issues``
+
+    Returns:
+        dict: ``native_compatible`` and ``native_issues`` (semicolon-separated)
+    """
+    return {
+        "native_compatible": str(not issues),
+        "native_issues": "; ".join(issues),
+    }
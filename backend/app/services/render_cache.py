@@ -0,0 +1,188 @@
+"""Cache of rendered Dockerfiles keyed by template version and context"""
+from collections import OrderedDict
+from typing import Any, Optional
+import hashlib
+import json
+import logging
+
+from app.config import RENDER_CACHE_SIZE, RENDER_CACHE_URL, RENDER_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+# Namespace for keys in the shared backend; bump when the key layout changes
+KEY_PREFIX = "render:v1:"
+
+
+def context_hash(context: dict) -> str:
+    """
+    Canonical hash of a template context
+
+    Keys are sorted and values without a JSON form fall back to ``str``,
+    so equal contexts hash equally regardless of insertion order.
+
+    Args:
+        context: Template context variables
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    canonical = json.dumps(context, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """
+    LRU cache of rendered templates, with an optional shared backend
+
+    Entries are keyed by template name, a hash of the template source and
+    a canonical hash of the built context, so editing a template changes
+    the key and stale renders are never served. The in-process LRU is
+    always consulted first; when ``RENDER_CACHE_URL`` points at Redis and
+    the ``redis`` package is installed, misses fall through to it so
+    several workers share renders. Backend failures count as misses.
+    """
+
+    def __init__(self, max_entries: int = RENDER_CACHE_SIZE, url: str = RENDER_CACHE_URL,
+                 ttl: int = RENDER_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._backend = self._connect(url) if url else None
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._shared_hits = 0
+        self._shared_errors = 0
+
+    @staticmethod
+    def _connect(url: str) -> Optional[Any]:
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            logger.warning("RENDER_CACHE_URL is set but the redis package is not installed; using the local cache only")
+            return None
+        return redis.from_url(url)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether renders are cached at all"""
+        return self.max_entries > 0 or self._backend is not None
+
+    def key(self, template_name: str, template_version: str, context: dict) -> str:
+        """
+        Cache key for one render
+
+        Args:
+            template_name: Template path relative to the template directory
+            template_version: Hash of the template source
+            context: Template context variables
+
+        Returns:
+            str: Cache key
+        """
+        return f"{KEY_PREFIX}{template_name}:{template_version}:{context_hash(context)}"
+
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Look up a rendered template
+
+        Args:
+            key: Key from ``key``
+
+        Returns:
+            Optional[str]: Rendered content, or None on a miss
+        """
+        rendered = self._entries.get(key)
+        if rendered is not None:
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return rendered
+
+        if self._backend is not None:
+            try:
+                shared = await self._backend.get(key)
+            except Exception as e:
+                self._shared_errors += 1
+                logger.warning(f"Shared render cache lookup failed: {e}")
+                shared = None
+            if shared is not None:
+                rendered = shared.decode("utf-8") if isinstance(shared, bytes) else shared
+                self._store(key, rendered)
+                self._hits += 1
+                self._shared_hits += 1
+                return rendered
+
+        self._misses += 1
+        return None
+
+    async def set(self, key: str, rendered: str) -> None:
+        """
+        Store a rendered template
+
+        Args:
+            key: Key from ``key``
+            rendered: Rendered content
+        """
+        self._store(key, rendered)
+        if self._backend is not None:
+            try:
+                await self._backend.set(key, rendered, ex=self.ttl)
+            except Exception as e:
+                self._shared_errors += 1
+                logger.warning(f"Shared render cache store failed: {e}")
+
+    def _store(self, key: str, rendered: str) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = rendered
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def invalidate_template(self, template_name: str) -> int:
+        """
+        Drop local renders of one template, whatever its version
+
+        Shared-backend entries are left to expire; their keys carry the
+        template version, so they are never served for the new source.
+
+        Args:
+            template_name: Template path relative to the template directory
+
+        Returns:
+            int: Number of entries dropped
+        """
+        prefix = f"{KEY_PREFIX}{template_name}:"
+        stale = [key for key in self._entries if key.startswith(prefix)]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        """Drop every locally cached render"""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Cache metrics
+
+        Returns:
+            dict: Size, hit/miss/eviction counters and shared backend status
+        """
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+            "evictions": self._evictions,
+            "shared_backend": self._backend is not None,
+            "shared_hits": self._shared_hits,
+            "shared_errors": self._shared_errors,
+        }
+
+
+# Global instance
+render_cache = RenderCache()
@@ -0,0 +1,146 @@
+"""
+Ahead-of-time compiled template bundle
+
+The bundle is a zip of the modules produced by Jinja's
+``compile_templates``, stored as bytecode and loaded through a
+``ModuleLoader``, so no template is lexed, parsed or compiled at startup
+and not even the generated Python source is. It carries a stamp of the
+Python and Jinja versions and of every template source, and is ignored
+when any of them no longer matches.
+
+Build it (from the backend directory, as the Docker image does):
+    python -m app.services.template_bundle [--output PATH]
+"""
+from pathlib import Path
+from typing import Optional
+import argparse
+import hashlib
+import json
+import os
+import py_compile
+import sys
+import tempfile
+import zipfile
+import logging
+
+import jinja2
+from jinja2 import Environment, ModuleLoader
+
+from app.config import TEMPLATE_DIR, TEMPLATE_BUNDLE
+
+logger = logging.getLogger(__name__)
+
+STAMP_NAME = "bundle.json"
+
+
+def _is_template(name: str) -> bool:
+    return name.endswith(".j2")
+
+
+def sources_digest(template_dir: Path = TEMPLATE_DIR) -> str:
+    """
+    Combined hash of every template's name and source
+
+    Args:
+        template_dir: Template directory
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    digest = hashlib.sha256()
+    for path in sorted(template_dir.rglob("*.j2")):
+        digest.update(path.relative_to(template_dir).as_posix().encode("utf-8") + b"\0")
+        digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+def build_bundle(env: Environment, template_dir: Path = TEMPLATE_DIR, target: Path = TEMPLATE_BUNDLE) -> int:
+    """
+    Compile every template of an environment into a bundle
+
+    The environment must use the same options (whitespace control,
+    autoescaping) as the one that will load the bundle, since they are
+    baked into the generated code.
+
+    Args:
+        env: Environment with a loader over ``template_dir``
+        template_dir: Template directory
+        target: Bundle file to write (replaced atomically)
+
+    Returns:
+        int: Number of templates compiled
+    """
+    names = env.list_templates(filter_func=_is_template)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, staging = tempfile.mkstemp(prefix=".templates-", suffix=".zip", dir=target.parent)
+    os.close(fd)
+    try:
+        with tempfile.TemporaryDirectory() as modules, zipfile.ZipFile(staging, "w", zipfile.ZIP_DEFLATED) as bundle:
+            env.compile_templates(modules, zip=None, filter_func=_is_template, ignore_errors=False)
+            for module in sorted(Path(modules).glob("*.py")):
+                # Only bytecode is shipped; zipimport loads a .pyc without its source
+                compiled = module.with_suffix(".pyc")
+                py_compile.compile(
+                    str(module), cfile=str(compiled), dfile=module.name, doraise=True,
+                    invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH
+                )
+                bundle.write(compiled, compiled.name)
+            bundle.writestr(STAMP_NAME, json.dumps({
+                "python": sys.implementation.cache_tag,
+                "jinja2": jinja2.__version__,
+                "sources": sources_digest(template_dir),
+                "templates": len(names),
+            }))
+        os.replace(staging, target)
+    except BaseException:
+        os.unlink(staging)
+        raise
+    return len(names)
+
+
+def load_bundle(target: Path = TEMPLATE_BUNDLE, template_dir: Path = TEMPLATE_DIR) -> Optional[ModuleLoader]:
+    """
+    Loader over a compiled bundle, if one exists and is current
+
+    Args:
+        target: Bundle file
+        template_dir: Template directory the bundle must have been built from
+
+    Returns:
+        Optional[ModuleLoader]: Loader, or None to fall back to compiling from source
+    """
+    if not target.is_file():
+        return None
+    try:
+        with zipfile.ZipFile(target) as bundle:
+            stamp = json.loads(bundle.read(STAMP_NAME))
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+        logger.warning(f"Ignoring unreadable template bundle {target}: {e}")
+        return None
+
+    if stamp.get("python") != sys.implementation.cache_tag:
+        logger.warning(f"Ignoring template bundle built for {stamp.get('python')}")
+        return None
+    if stamp.get("jinja2") != jinja2.__version__:
+        logger.warning(f"Ignoring template bundle built with Jinja {stamp.get('jinja2')}")
+        return None
+    if stamp.get("sources") != sources_digest(template_dir):
+        logger.warning("Ignoring template bundle, templates changed since it was built")
+        return None
+    return ModuleLoader(str(target))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compile all templates into a bundle")
+    parser.add_argument("--output", type=Path, default=TEMPLATE_BUNDLE)
+    args = parser.parse_args()
+
+    from app.services.template_engine import TemplateEngine
+
+    engine = TemplateEngine(bytecode_dir=None, bundle_path=None)
+    count = build_bundle(engine.env, engine.template_dir, args.output)
+    print(f"Compiled {count} templates into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,106 @@
 """Template engine for rendering Dockerfiles"""
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from concurrent.futures import ThreadPoolExecutor
+from jinja2 import BaseLoader, ChoiceLoader, Environment, FileSystemBytecodeCache, FileSystemLoader, Template, select_autoescape
 from pathlib import Path
+from typing import Dict, Optional, Tuple
+import asyncio
+import hashlib
+import time
 import logging
 
-from app.config import TEMPLATE_DIR
+from app.config import (
+    TEMPLATE_DIR,
+    TEMPLATE_BUNDLE,
+    TEMPLATE_BYTECODE_DIR,
+    IS_PRODUCTION,
+    RENDER_WORKERS,
+    RENDER_TIMEOUT,
+)
+from app.services.template_bundle import load_bundle
+from app.services.template_registry import template_registry
+from app.utils.metrics import HistogramFamily
 
 logger = logging.getLogger(__name__)
 
 
 class TemplateEngine:
-    """Jinja2-based template rendering for Dockerfiles"""
+    """
+    Jinja2-based template rendering for Dockerfiles
 
-    def __init__(self, template_dir: Path = TEMPLATE_DIR):
+    In production, templates are loaded from the ahead-of-time compiled
+    bundle when a current one exists; otherwise they are compiled from
+    source, with bytecode persisted in a cache so new worker processes
+    skip recompilation. ``warm_up`` loads every template ahead of the
+    first request. In production, templates are not checked
+    for changes on every lookup. ``template_version`` hashes a template's
+    source so rendered output can be cached against it.
+
+    Rendering runs on a small dedicated thread pool under a timeout, so a
+    template fed a large context never stalls the event loop.
+
+    While the template watcher runs, changed templates are compiled and
+    validated off to the side and installed with ``swap``; until then the
+    previous version keeps being served.
+    """
+
+    def __init__(self, template_dir: Path = TEMPLATE_DIR,
+                 bytecode_dir: Optional[Path] = TEMPLATE_BYTECODE_DIR,
+                 auto_reload: bool = not IS_PRODUCTION,
+                 bundle_path: Optional[Path] = TEMPLATE_BUNDLE if IS_PRODUCTION else None,
+                 render_workers: int = RENDER_WORKERS,
+                 render_timeout: float = RENDER_TIMEOUT):
         self.template_dir = template_dir
+        self.render_timeout = render_timeout
+        self._render_executor = ThreadPoolExecutor(max_workers=render_workers, thread_name_prefix="render")
+        self.render_duration = HistogramFamily()
+        self._renders = 0
+        self._render_failures = 0
+        self._render_timeouts = 0
+        bytecode_cache = None
+        if bytecode_dir is not None:
+            try:
+                bytecode_dir.mkdir(parents=True, exist_ok=True)
+                bytecode_cache = FileSystemBytecodeCache(str(bytecode_dir))
+            except OSError as e:
+                logger.warning(f"Template bytecode cache disabled, {bytecode_dir} is not writable: {e}")
+
+        loader: BaseLoader = FileSystemLoader(str(template_dir))
+        self.loader_kind = "filesystem"
+        bundle = load_bundle(bundle_path, template_dir) if bundle_path is not None else None
+        if bundle is not None:
+            # Templates missing from the bundle still load from source
+            loader = ChoiceLoader([bundle, loader])
+            self.loader_kind = "bundle"
+
         self.env = Environment(
-            loader=FileSystemLoader(str(template_dir)),
+            loader=loader,
             trim_blocks=True,
             lstrip_blocks=True,
-            autoescape=select_autoescape(['html', 'xml'])
+            autoescape=select_autoescape(['html', 'xml']),
+            bytecode_cache=bytecode_cache,
+            auto_reload=auto_reload
         )
 
         # Add custom filters
         self.env.filters['split_jvm_options'] = self._split_jvm_options
 
+        self.ready = False
+        self.warm_up_seconds: Optional[float] = None
+        self.warmed_templates = 0
+        # Template name -> ((mtime_ns, size), source hash)
+        self._versions: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        # Hot-swapped templates, consulted before the environment; replaced, never mutated
+        self._swapped: Dict[str, Template] = {}
+        # Set by the template watcher, which then owns change detection
+        self.watched = False
+
     def _split_jvm_options(self, options: str) -> list:
         """Split JVM options string into list"""
         return [opt.strip() for opt in options.split() if opt.strip()]
 
     async def render(self, template_name: str, context: dict) -> str:
         """
-        Render a template with the given context
+        Render a template with the given context on the render thread pool
 
         Args:
             template_name: Template file name (e.g., 'python/fastapi.dockerfile.j2')
@@ -37,38 +108,150 @@ class TemplateEngine:
 
         Returns:
             str: Rendered template content
+
+        Raises:
+            TimeoutError: If rendering does not finish within ``render_timeout``
         """
+        future = asyncio.get_running_loop().run_in_executor(
+            self._render_executor, self._render_sync, template_name, context
+        )
         try:
-            template = self.env.get_template(template_name)
-            rendered = template.render(**context)
-            logger.info(f"Rendered template: {template_name}")
-            return rendered
+            rendered, elapsed = await asyncio.wait_for(future, self.render_timeout)
+        except asyncio.TimeoutError:
+            # The worker thread cannot be interrupted; it finishes in the background
+            self._render_timeouts += 1
+            logger.error(f"Rendering {template_name} exceeded {self.render_timeout}s")
+            raise TimeoutError(f"Rendering {template_name} timed out after {self.render_timeout}s")
         except Exception as e:
+            self._render_failures += 1
             logger.error(f"Failed to render template {template_name}: {e}")
             raise
 
-    def list_templates(self) -> dict:
+        self._renders += 1
+        self.render_duration.observe(template_name, elapsed)
+        logger.debug(f"Rendered template: {template_name} in {elapsed:.4f}s")
+        return rendered
+
+    def _render_sync(self, template_name: str, context: dict) -> Tuple[str, float]:
+        """Load and render a template (runs in a render thread)"""
+        started = time.perf_counter()
+        template = self._swapped.get(template_name) or self.env.get_template(template_name)
+        rendered = template.render(**context)
+        return rendered, time.perf_counter() - started
+
+    def stats(self) -> dict:
         """
-        List all available templates
+        Rendering metrics
 
         Returns:
-            dict: Templates organized by language
+            dict: Loader in use, render counters and per-template duration histograms
         """
-        templates = {
-            "python": [],
-            "nodejs": [],
-            "java": []
+        return {
+            "loader": self.loader_kind,
+            "renders": self._renders,
+            "failures": self._render_failures,
+            "timeouts": self._render_timeouts,
+            "render_seconds": self.render_duration.snapshot(),
         }
 
-        for lang in templates.keys():
-            lang_dir = self.template_dir / lang
-            if lang_dir.exists():
-                templates[lang] = [
-                    f.stem.replace('.dockerfile', '')
-                    for f in lang_dir.glob('*.dockerfile.j2')
-                ]
+    def shutdown(self) -> None:
+        """Stop the render threads"""
+        self._render_executor.shutdown(wait=False, cancel_futures=True)
 
-        return templates
+    def template_version(self, template_name: str) -> str:
+        """
+        Hash of a template's source, recomputed when the file changes
+
+        A change also drops the environment's compiled templates, so the
+        new source is rendered even when ``auto_reload`` is off. While the
+        watcher runs, the version of the template currently served is
+        returned without touching the file.
+
+        Args:
+            template_name: Template file name (e.g., 'python/fastapi.dockerfile.j2')
+
+        Returns:
+            str: SHA-256 hex digest of the template source
+        """
+        known = self._versions.get(template_name)
+        if self.watched and known is not None:
+            return known[1]
+
+        path = self.template_dir / template_name
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if known is not None and known[0] == signature:
+            return known[1]
+
+        version = hashlib.sha256(path.read_bytes()).hexdigest()
+        if known is not None and known[1] != version:
+            logger.info(f"Template changed: {template_name}")
+            if self.env.cache is not None:
+                self.env.cache.clear()
+            self._swapped = {name: t for name, t in self._swapped.items() if name != template_name}
+        self._versions[template_name] = (signature, version)
+        return version
+
+    def compile(self, template_name: str) -> Tuple[Template, Tuple[int, int], str]:
+        """
+        Compile the current source of a template without installing it
+
+        Args:
+            template_name: Template file name (e.g., 'python/fastapi.dockerfile.j2')
+
+        Returns:
+            tuple: Compiled template, file signature (mtime_ns, size) and source hash
+
+        Raises:
+            TemplateSyntaxError: If the template does not compile
+        """
+        path = self.template_dir / template_name
+        stat = path.stat()
+        data = path.read_bytes()
+        code = self.env.compile(data.decode("utf-8"), template_name, str(path))
+        template = self.env.template_class.from_code(self.env, code, self.env.make_globals(None))
+        return template, (stat.st_mtime_ns, stat.st_size), hashlib.sha256(data).hexdigest()
+
+    def swap(self, compiled: Dict[str, Tuple[Template, Tuple[int, int], str]]) -> None:
+        """
+        Install compiled templates in one step
+
+        Args:
+            compiled: Template name -> result of ``compile``
+        """
+        swapped = dict(self._swapped)
+        for name, (template, signature, version) in compiled.items():
+            swapped[name] = template
+            self._versions[name] = (signature, version)
+        self._swapped = swapped
+
+    async def warm_up(self) -> None:
+        """Compile and cache every template, then mark the engine ready"""
+        started = time.perf_counter()
+        try:
+            self.warmed_templates = await asyncio.to_thread(self._compile_all)
+        except Exception as e:
+            logger.error(f"Template warm-up failed, templates will compile on first use: {e}")
+        self.warm_up_seconds = time.perf_counter() - started
+        self.ready = True
+        logger.info(f"Warmed up {self.warmed_templates} templates ({self.loader_kind}) in {self.warm_up_seconds:.3f}s")
+
+    def _compile_all(self) -> int:
+        """Load every template into the environment cache (runs in a worker thread)"""
+        # Module loaders cannot list templates, so the registry says what to load
+        names = [entry.path for entry in template_registry.entries]
+        for name in names:
+            self.env.get_template(name)
+        return len(names)
+
+    def list_templates(self) -> dict:
+        """
+        List all available templates
+
+        Returns:
+            dict: Registered frameworks organized by language
+        """
+        return template_registry.frameworks
 
 
 # Global instance
@@ -0,0 +1,173 @@
+"""Registry of Dockerfile templates built from the template manifest"""
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+
+from app.config import TEMPLATE_DIR, TEMPLATE_MANIFEST
+from app.models.schemas import TemplateInfo
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VARIANT = "default"
+# Index key for templates that serve every build tool
+ANY_BUILD_TOOL = "*"
+
+IndexKey = Tuple[str, str, str, str]
+
+
+class _Snapshot:
+    """Immutable view of one manifest load; replaced wholesale on reload"""
+
+    def __init__(self, entries: List[TemplateInfo], defaults: Dict[str, Dict[str, str]]):
+        self.entries = entries
+        self.defaults = defaults
+        self.index: Dict[IndexKey, TemplateInfo] = {}
+        self.by_path = {entry.path: entry for entry in entries}
+        for entry in entries:
+            key = (entry.language, entry.framework, entry.build_tool or ANY_BUILD_TOOL, entry.variant)
+            if key in self.index:
+                raise ValueError(f"Duplicate template registration for {'/'.join(key)}: {entry.path}")
+            self.index[key] = entry
+
+        frameworks: Dict[str, List[str]] = {}
+        for entry in entries:
+            names = frameworks.setdefault(entry.language, [])
+            if entry.framework not in names:
+                names.append(entry.framework)
+        self.frameworks = frameworks
+
+        # /api/templates is served straight from these bytes
+        self.body = json.dumps({
+            "templates": frameworks,
+            "entries": [entry.model_dump() for entry in entries],
+        }, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+
+
+class TemplateRegistry:
+    """
+    Index of every template, keyed by language, framework, build tool and variant
+
+    Built from ``templates/manifest.json`` at startup, so selection is a
+    dictionary lookup and registering a template needs no code change.
+    ``reload`` builds a complete new snapshot and swaps it in with a
+    single assignment; readers never see a half-loaded registry, and a
+    broken manifest leaves the previous snapshot in place.
+    """
+
+    def __init__(self, manifest_path: Path = TEMPLATE_MANIFEST, template_dir: Path = TEMPLATE_DIR):
+        self.manifest_path = manifest_path
+        self.template_dir = template_dir
+        self._snapshot = self._build()
+
+    def reload(self) -> bool:
+        """
+        Rebuild the registry from the manifest and swap it in
+
+        Returns:
+            bool: Whether the registry changed
+
+        Raises:
+            ValueError: If the manifest is invalid (the current registry is kept)
+        """
+        snapshot = self._build()
+        changed = snapshot.etag != self._snapshot.etag
+        self._snapshot = snapshot
+        if changed:
+            logger.info(f"Template registry reloaded: {len(snapshot.entries)} templates")
+        return changed
+
+    def _build(self) -> _Snapshot:
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            raise ValueError(f"Cannot read template manifest {self.manifest_path}: {e}")
+
+        entries = []
+        for raw in manifest.get("templates", []):
+            path = self.template_dir / raw["path"]
+            try:
+                version = hashlib.sha256(path.read_bytes()).hexdigest()
+            except OSError as e:
+                raise ValueError(f"Template {raw['path']} listed in the manifest cannot be read: {e}")
+            entries.append(TemplateInfo(
+                path=raw["path"],
+                language=raw["language"],
+                framework=raw["framework"],
+                build_tool=raw.get("build_tool"),
+                variant=raw.get("variant", DEFAULT_VARIANT),
+                version=version,
+            ))
+
+        registered = {entry.path for entry in entries}
+        for path in self.template_dir.rglob("*.j2"):
+            name = path.relative_to(self.template_dir).as_posix()
+            if name not in registered:
+                logger.warning(f"Template {name} is not listed in {self.manifest_path.name} and cannot be selected")
+
+        return _Snapshot(entries, manifest.get("defaults", {}))
+
+    def select(self, language: str, framework: Optional[str] = None,
+               build_tool: Optional[str] = None, variant: str = DEFAULT_VARIANT) -> TemplateInfo:
+        """
+        Find the template for a project
+
+        Unknown frameworks fall back to the language's default framework,
+        and templates registered without a build tool match any build tool.
+
+        Args:
+            language: Project language
+            framework: Project framework
+            build_tool: Build tool from the user config
+            variant: Template variant
+
+        Returns:
+            TemplateInfo: The selected template
+
+        Raises:
+            ValueError: If no template is registered for the language
+        """
+        snapshot = self._snapshot
+        defaults = snapshot.defaults.get(language, {})
+        default_framework = defaults.get("framework")
+        default_build_tool = defaults.get("build_tool")
+
+        for candidate_framework in (framework, default_framework):
+            for candidate_build_tool in (build_tool or default_build_tool, ANY_BUILD_TOOL, default_build_tool):
+                entry = snapshot.index.get((language, candidate_framework, candidate_build_tool, variant))
+                if entry is not None:
+                    if candidate_framework != framework:
+                        logger.warning(f"No {language}/{framework} template found, using {entry.path}")
+                    return entry
+
+        raise ValueError(f"No template registered for {language}/{framework} (variant {variant})")
+
+    def get(self, path: str) -> Optional[TemplateInfo]:
+        """Registered template by path"""
+        return self._snapshot.by_path.get(path)
+
+    @property
+    def entries(self) -> List[TemplateInfo]:
+        """Every registered template"""
+        return self._snapshot.entries
+
+    @property
+    def frameworks(self) -> Dict[str, List[str]]:
+        """Registered frameworks per language"""
+        return self._snapshot.frameworks
+
+    @property
+    def body(self) -> bytes:
+        """Serialized template listing served by ``/api/templates``"""
+        return self._snapshot.body
+
+    @property
+    def etag(self) -> str:
+        """Validator of the current listing"""
+        return self._snapshot.etag
+
+
+# Global instance
+template_registry = TemplateRegistry()
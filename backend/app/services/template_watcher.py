@@ -0,0 +1,226 @@
+"""Background hot reload of changed templates"""
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+import asyncio
+import time
+import logging
+
+from app.config import TEMPLATE_WATCH_INTERVAL
+from app.models.schemas import JavaConfig, NodeJSConfig, ProjectInfo, PythonConfig
+from app.services.dockerfile_generator import DockerfileGenerator, dockerfile_generator
+from app.services.render_cache import RenderCache, render_cache
+from app.services.template_engine import TemplateEngine, template_engine
+from app.services.template_registry import TemplateRegistry, template_registry
+
+logger = logging.getLogger(__name__)
+
+# Example configs from the request schemas double as validation contexts
+SAMPLE_CONFIGS = {
+    "python": PythonConfig,
+    "nodejs": NodeJSConfig,
+    "java": JavaConfig,
+}
+
+
+class TemplateWatcher:
+    """
+    Recompiles changed templates in the background and swaps them in
+
+    Uses inotify through ``watchfiles`` (a requirement) and polls the
+    template directory only if it cannot be imported. Each changed template is compiled and
+    rendered against a sample context off the event loop; only templates
+    that pass are installed, all in one ``TemplateEngine.swap``, and only
+    their render-cache entries are dropped. While the watcher runs, the
+    environment's ``auto_reload`` is off and every registered template is
+    served from a version the watcher compiled, so a template that fails
+    keeps serving its previous version instead of being read back from
+    disk. Manifest changes reload the registry.
+    """
+
+    def __init__(self, engine: TemplateEngine = template_engine,
+                 registry: TemplateRegistry = template_registry,
+                 cache: RenderCache = render_cache,
+                 generator: DockerfileGenerator = dockerfile_generator,
+                 interval: float = TEMPLATE_WATCH_INTERVAL):
+        self.engine = engine
+        self.registry = registry
+        self.cache = cache
+        self.generator = generator
+        self.interval = interval
+        self.template_dir = engine.template_dir
+        self.backend: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._auto_reload: Optional[bool] = None
+        self._reloads = 0
+        self._rejected = 0
+        self._last_reload: Optional[float] = None
+        self._last_error: Optional[str] = None
+
+    async def start(self) -> None:
+        """Start watching the template directory"""
+        if self._task is not None:
+            return
+        # From here on only templates the watcher has compiled are served
+        self._auto_reload = self.engine.env.auto_reload
+        self.engine.env.auto_reload = False
+        self.engine.swap(await asyncio.to_thread(self._compile_current))
+        self.engine.watched = True
+        try:
+            import watchfiles  # noqa: F401
+            self.backend = "inotify"
+        except ImportError:
+            self.backend = "polling"
+        # The polling baseline is taken before returning so no change after start is missed
+        signatures = await asyncio.to_thread(self._scan) if self.backend == "polling" else {}
+        self._task = asyncio.create_task(self._run(signatures))
+        logger.info(f"Template watcher started ({self.backend}) on {self.template_dir}")
+
+    async def stop(self) -> None:
+        """Stop watching"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.engine.watched = False
+        if self._auto_reload is not None:
+            self.engine.env.auto_reload = self._auto_reload
+            self._auto_reload = None
+
+    async def _run(self, signatures: Dict[Path, Tuple[int, int]]) -> None:
+        if self.backend == "inotify":
+            from watchfiles import awatch
+            async for changes in awatch(self.template_dir):
+                await self._apply_safely({Path(path) for _, path in changes})
+        else:
+            while True:
+                await asyncio.sleep(self.interval)
+                current = await asyncio.to_thread(self._scan)
+                changed = {path for path in current.keys() | signatures.keys()
+                           if current.get(path) != signatures.get(path)}
+                signatures = current
+                if changed:
+                    await self._apply_safely(changed)
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        """(mtime_ns, size) of every file under the template directory"""
+        signatures = {}
+        for path in self.template_dir.rglob("*"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if path.is_file():
+                signatures[path] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    async def _apply_safely(self, paths: Set[Path]) -> None:
+        try:
+            await self.apply(paths)
+        except Exception as e:
+            self._last_error = str(e)
+            logger.error(f"Template reload failed: {e}")
+
+    async def apply(self, paths: Set[Path]) -> Dict[str, bool]:
+        """
+        Recompile, validate and install the templates among changed paths
+
+        Args:
+            paths: Changed files under the template directory
+
+        Returns:
+            dict: Template name -> whether its new version was installed
+        """
+        names = set()
+        manifest_changed = False
+        for path in paths:
+            path = Path(path).resolve()
+            if path == self.registry.manifest_path.resolve():
+                manifest_changed = True
+            elif path.suffix == ".j2" and path.exists():
+                names.add(path.relative_to(self.template_dir.resolve()).as_posix())
+
+        if manifest_changed or names:
+            # Picks up new registrations and the new version hashes
+            try:
+                self.registry.reload()
+            except ValueError as e:
+                self._last_error = str(e)
+                logger.error(f"Template manifest not reloaded, keeping the current registry: {e}")
+
+        results = {}
+        compiled = {}
+        for name in sorted(names):
+            try:
+                compiled[name] = await asyncio.to_thread(self._compile_and_validate, name)
+                results[name] = True
+            except Exception as e:
+                self._rejected += 1
+                self._last_error = f"{name}: {e}"
+                results[name] = False
+                logger.error(f"Template {name} rejected, keeping the previous version: {e}")
+
+        if compiled:
+            self.engine.swap(compiled)
+            for name in compiled:
+                self.cache.invalidate_template(name)
+            self._reloads += len(compiled)
+            self._last_reload = time.time()
+            logger.info(f"Reloaded templates: {', '.join(sorted(compiled))}")
+        return results
+
+    def _compile_current(self) -> Dict[str, tuple]:
+        """Compile the registered templates as they are now (runs in a worker thread)"""
+        compiled = {}
+        for entry in self.registry.entries:
+            try:
+                compiled[entry.path] = self.engine.compile(entry.path)
+            except Exception as e:
+                logger.error(f"Template {entry.path} does not compile: {e}")
+        return compiled
+
+    def _compile_and_validate(self, name: str) -> tuple:
+        """Compile a template and render it against a sample context (runs in a worker thread)"""
+        result = self.engine.compile(name)
+        context = self._sample_context(name)
+        if context is not None:
+            result[0].render(**context)
+        return result
+
+    def _sample_context(self, name: str) -> Optional[dict]:
+        """Context built the way ``generate`` builds it, from the schema example config"""
+        entry = self.registry.get(name)
+        if entry is None or entry.language not in SAMPLE_CONFIGS:
+            return None
+        config = dict(SAMPLE_CONFIGS[entry.language].model_config["json_schema_extra"]["example"])
+        config["framework"] = entry.framework
+        if entry.build_tool:
+            config["build_tool"] = entry.build_tool
+        project_info = ProjectInfo(
+            language=entry.language,
+            framework=entry.framework,
+            detected_version=config.get("runtime_version")
+        )
+        return self.generator._build_context(project_info, config)
+
+    def stats(self) -> dict:
+        """
+        Watcher metrics
+
+        Returns:
+            dict: Backend, reload and rejection counters
+        """
+        return {
+            "running": self._task is not None,
+            "backend": self.backend,
+            "reloads": self._reloads,
+            "rejected": self._rejected,
+            "last_reload": self._last_reload,
+            "last_error": self._last_error,
+        }
+
+
+# Global instance
+template_watcher = TemplateWatcher()
@@ -0,0 +1,239 @@
+"""Zip-bomb and decompression-ratio guard for archive inspection"""
+from pathlib import Path
+from typing import IO, Iterable, Optional, Union
+import struct
+import zipfile
+
+from app.config import (
+    ARCHIVE_MAX_ENTRIES,
+    ARCHIVE_MAX_MEMBER_BYTES,
+    ARCHIVE_MAX_TOTAL_BYTES,
+    ARCHIVE_MAX_RATIO,
+    ARCHIVE_RATIO_MIN_BYTES,
+    ARCHIVE_MAX_METADATA_BYTES,
+)
+
+# Error codes
+TOO_MANY_ENTRIES = "too_many_entries"
+MEMBER_TOO_LARGE = "member_too_large"
+TOTAL_TOO_LARGE = "total_too_large"
+RATIO_EXCEEDED = "ratio_exceeded"
+SIZE_MISMATCH = "size_mismatch"
+
+_EOCD_SIGNATURE = b"PK\x05\x06"
+_EOCD_STRUCT = struct.Struct("<4s4H2LH")
+_ZIP64_LOCATOR_SIGNATURE = b"PK\x06\x07"
+_ZIP64_LOCATOR_STRUCT = struct.Struct("<4sLQL")
+_ZIP64_EOCD_SIGNATURE = b"PK\x06\x06"
+_ZIP64_EOCD_STRUCT = struct.Struct("<4sQ2H2L4Q")
+# EOCD record plus the longest possible archive comment
+_EOCD_SEARCH_BYTES = _EOCD_STRUCT.size + 0xFFFF
+
+
+class ArchiveGuardError(Exception):
+    """An archive exceeded an inspection limit"""
+
+    def __init__(self, code: str, message: str):
+        # Both arguments are kept in args so the error survives pickling from worker processes
+        super().__init__(code, message)
+        self.code = code
+        self.message = message
+
+    def __str__(self) -> str:
+        return self.message
+
+
+def count_entries(file_path: Union[str, Path]) -> Optional[int]:
+    """
+    Entry count from the end-of-central-directory record
+
+    Reading it costs a single tail read, so oversized central directories
+    can be rejected before ``zipfile`` materializes one object per entry.
+
+    Args:
+        file_path: Path to the archive
+
+    Returns:
+        Optional[int]: Declared number of entries, or None if no record was found
+    """
+    with open(file_path, "rb") as f:
+        f.seek(0, 2)
+        size = f.tell()
+        tail_start = max(size - _EOCD_SEARCH_BYTES, 0)
+        f.seek(tail_start)
+        tail = f.read()
+
+        position = tail.rfind(_EOCD_SIGNATURE)
+        if position == -1 or len(tail) - position < _EOCD_STRUCT.size:
+            return None
+        entries = _EOCD_STRUCT.unpack_from(tail, position)[4]
+        if entries != 0xFFFF:
+            return entries
+
+        # ZIP64: the locator sits right before the classic record
+        locator = position - _ZIP64_LOCATOR_STRUCT.size
+        if locator < 0:
+            return entries
+        signature, _, zip64_offset, _ = _ZIP64_LOCATOR_STRUCT.unpack_from(tail, locator)
+        if signature != _ZIP64_LOCATOR_SIGNATURE:
+            return entries
+        f.seek(zip64_offset)
+        record = f.read(_ZIP64_EOCD_STRUCT.size)
+        if len(record) < _ZIP64_EOCD_STRUCT.size or not record.startswith(_ZIP64_EOCD_SIGNATURE):
+            return entries
+        return _ZIP64_EOCD_STRUCT.unpack(record)[7]
+
+
+class _GuardedMember:
+    """Member stream that accounts every decompressed byte"""
+
+    def __init__(self, guard: "ArchiveGuard", stream: IO[bytes], info: zipfile.ZipInfo):
+        self._guard = guard
+        self._stream = stream
+        self._info = info
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._stream.read(size)
+        self.bytes_read += len(data)
+        self._guard._account(self._info, self.bytes_read, len(data))
+        return data
+
+    def __enter__(self) -> "_GuardedMember":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stream.close()
+
+
+class ArchiveGuard:
+    """
+    Enforces size and ratio limits while an archive is inspected
+
+    Limits are checked twice: against the sizes declared in the central
+    directory before anything is decompressed, and against the bytes
+    actually produced while members are streamed. One guard tracks one
+    archive; totals accumulate across every member read through it.
+
+    Raises ``ArchiveGuardError`` with one of the module's error codes.
+    """
+
+    def __init__(self, max_entries: int = ARCHIVE_MAX_ENTRIES,
+                 max_member_bytes: int = ARCHIVE_MAX_MEMBER_BYTES,
+                 max_total_bytes: int = ARCHIVE_MAX_TOTAL_BYTES,
+                 max_ratio: float = ARCHIVE_MAX_RATIO,
+                 ratio_min_bytes: int = ARCHIVE_RATIO_MIN_BYTES):
+        self.max_entries = max_entries
+        self.max_member_bytes = max_member_bytes
+        self.max_total_bytes = max_total_bytes
+        self.max_ratio = max_ratio
+        self.ratio_min_bytes = ratio_min_bytes
+        self.compressed_bytes = 0
+        self.uncompressed_bytes = 0
+
+    def check_entry_count(self, file_path: Union[str, Path]) -> None:
+        """
+        Reject archives declaring too many entries, before opening them
+
+        Args:
+            file_path: Path to the archive
+        """
+        entries = count_entries(file_path)
+        if entries is not None and entries > self.max_entries:
+            raise ArchiveGuardError(
+                TOO_MANY_ENTRIES,
+                f"Archive declares {entries} entries (limit {self.max_entries})"
+            )
+
+    def check_central_directory(self, infos: Iterable[zipfile.ZipInfo]) -> None:
+        """
+        Check declared member sizes and compression ratios
+
+        Args:
+            infos: Archive members
+        """
+        count = 0
+        total_compressed = 0
+        total_uncompressed = 0
+        for info in infos:
+            count += 1
+            total_compressed += info.compress_size
+            total_uncompressed += info.file_size
+            self._check_member(info, info.file_size)
+
+        if count > self.max_entries:
+            raise ArchiveGuardError(TOO_MANY_ENTRIES, f"Archive has {count} entries (limit {self.max_entries})")
+        self._check_total(total_compressed, total_uncompressed)
+
+    def open(self, jar: zipfile.ZipFile, member: Union[str, zipfile.ZipInfo]) -> _GuardedMember:
+        """
+        Open a member for streaming under the guard
+
+        Args:
+            jar: Open archive
+            member: Member name or info
+
+        Returns:
+            _GuardedMember: Readable stream; use as a context manager
+        """
+        info = member if isinstance(member, zipfile.ZipInfo) else jar.getinfo(member)
+        self._check_member(info, info.file_size)
+        self.compressed_bytes += info.compress_size
+        return _GuardedMember(self, jar.open(info), info)
+
+    def read(self, jar: zipfile.ZipFile, member: Union[str, zipfile.ZipInfo],
+             max_bytes: int = ARCHIVE_MAX_METADATA_BYTES) -> bytes:
+        """
+        Read a small member (manifest, index files) in full
+
+        Args:
+            jar: Open archive
+            member: Member name or info
+            max_bytes: Largest member accepted
+
+        Returns:
+            bytes: Member content
+        """
+        info = member if isinstance(member, zipfile.ZipInfo) else jar.getinfo(member)
+        if info.file_size > max_bytes:
+            raise ArchiveGuardError(
+                MEMBER_TOO_LARGE,
+                f"{info.filename} declares {info.file_size} bytes (limit {max_bytes})"
+            )
+        with self.open(jar, info) as stream:
+            return stream.read(max_bytes + 1)[:max_bytes]
+
+    def _account(self, info: zipfile.ZipInfo, member_bytes: int, delta: int) -> None:
+        """Record decompressed output of a member as it is produced"""
+        self.uncompressed_bytes += delta
+        if member_bytes > info.file_size:
+            raise ArchiveGuardError(
+                SIZE_MISMATCH,
+                f"{info.filename} decompressed past its declared size of {info.file_size} bytes"
+            )
+        self._check_member(info, member_bytes)
+        self._check_total(self.compressed_bytes, self.uncompressed_bytes)
+
+    def _check_member(self, info: zipfile.ZipInfo, uncompressed: int) -> None:
+        if uncompressed > self.max_member_bytes:
+            raise ArchiveGuardError(
+                MEMBER_TOO_LARGE,
+                f"{info.filename} expands to {uncompressed} bytes (limit {self.max_member_bytes})"
+            )
+        if uncompressed > self.ratio_min_bytes and uncompressed > self.max_ratio * max(info.compress_size, 1):
+            raise ArchiveGuardError(
+                RATIO_EXCEEDED,
+                f"{info.filename} compression ratio exceeds {self.max_ratio}:1"
+            )
+
+    def _check_total(self, compressed: int, uncompressed: int) -> None:
+        if uncompressed > self.max_total_bytes:
+            raise ArchiveGuardError(
+                TOTAL_TOO_LARGE,
+                f"Archive expands to {uncompressed} bytes (limit {self.max_total_bytes})"
+            )
+        if uncompressed > self.ratio_min_bytes and uncompressed > self.max_ratio * max(compressed, 1):
+            raise ArchiveGuardError(
+                RATIO_EXCEEDED,
+                f"Archive compression ratio exceeds {self.max_ratio}:1"
+            )
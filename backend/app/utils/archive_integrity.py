@@ -0,0 +1,180 @@
+"""Parallel, budgeted CRC verification of ZIP-based archives"""
+from pathlib import Path
+from typing import List, Optional
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+
+from app.config import INTEGRITY_TIME_BUDGET, INTEGRITY_CPU_BUDGET, INTEGRITY_PARALLEL_MIN_BYTES
+from app.models.schemas import IntegrityReport
+from app.utils.archive_guard import ArchiveGuard, ArchiveGuardError
+from app.utils.process_pool import BoundedProcessPool, analysis_pool
+
+MANIFEST_PATH = "META-INF/MANIFEST.MF"
+READ_CHUNK_SIZE = 1024 * 1024
+# Members between checks of the stop file and the budgets
+CHECK_INTERVAL = 64
+
+
+def _partition(infos: List[zipfile.ZipInfo], part: int, parts: int) -> List[zipfile.ZipInfo]:
+    """
+    Members assigned to one part
+
+    Members are ordered by their position in the file and split into
+    contiguous runs of roughly equal compressed size, so each worker reads
+    its own region sequentially. Every worker computes the same split.
+    """
+    if parts == 1:
+        return infos
+    ordered = sorted(infos, key=lambda info: info.header_offset)
+    total = sum(info.compress_size + 1 for info in ordered)
+    low, high = total * part / parts, total * (part + 1) / parts
+    assigned = []
+    cumulative = 0
+    for info in ordered:
+        if low <= cumulative < high:
+            assigned.append(info)
+        cumulative += info.compress_size + 1
+    return assigned
+
+
+def verify_archive_part(file_path: str, part: int, parts: int, time_budget: float,
+                        cpu_budget: float, stop_path: str) -> dict:
+    """
+    CRC-check one part of an archive (entry point for worker processes)
+
+    Args:
+        file_path: Path to the archive
+        part: Index of the part to check
+        parts: Total number of parts
+        time_budget: Wall-clock seconds this part may run, counted from when it starts
+        cpu_budget: CPU seconds this part may use
+        stop_path: File whose existence tells every part to stop
+
+    Returns:
+        dict: Counters, the first failure (if any) and whether a budget ran out
+
+    Raises:
+        ArchiveGuardError: If the archive exceeds size or ratio limits
+    """
+    result = {
+        "members": 0, "checked": 0, "bytes": 0, "cpu": 0.0,
+        "failed_member": None, "error": None, "exhausted": False, "manifest": None
+    }
+    # Time spent queued in the pool does not count against the budget
+    deadline = time.time() + time_budget
+    cpu_start = time.process_time()
+
+    def out_of_budget() -> bool:
+        return time.time() > deadline or time.process_time() - cpu_start > cpu_budget
+
+    guard = ArchiveGuard()
+    info = None
+    try:
+        guard.check_entry_count(file_path)
+        with zipfile.ZipFile(file_path, "r") as jar:
+            infos = jar.infolist()
+            guard.check_central_directory(infos)
+            result["members"] = len(infos)
+            if part == 0:
+                result["manifest"] = MANIFEST_PATH in jar.NameToInfo
+
+            for position, info in enumerate(_partition(infos, part, parts)):
+                if position % CHECK_INTERVAL == 0:
+                    if os.path.exists(stop_path):
+                        break
+                    if out_of_budget():
+                        result["exhausted"] = True
+                        break
+                if not info.is_dir():
+                    # Reading a member to the end verifies its CRC-32
+                    with guard.open(jar, info) as member:
+                        while chunk := member.read(READ_CHUNK_SIZE):
+                            result["bytes"] += len(chunk)
+                            if len(chunk) == READ_CHUNK_SIZE and out_of_budget():
+                                result["exhausted"] = True
+                                break
+                    if result["exhausted"]:
+                        break
+                result["checked"] += 1
+    except ArchiveGuardError:
+        open(stop_path, "a").close()
+        raise
+    except Exception as e:
+        result["failed_member"] = info.filename if info is not None else None
+        result["error"] = str(e) or type(e).__name__
+        # Tell the other parts to stop
+        open(stop_path, "a").close()
+
+    result["cpu"] = time.process_time() - cpu_start
+    return result
+
+
+async def verify_archive(file_path: Path, pool: BoundedProcessPool = analysis_pool) -> IntegrityReport:
+    """
+    Verify every member's CRC across worker processes
+
+    Large archives are split across the pool's workers; all parts stop at
+    the first corrupt member. Verification runs under a wall-clock budget
+    and a CPU budget shared by the parts, both counted from when each part
+    starts running; when either runs out the report is marked incomplete
+    rather than failed.
+
+    Args:
+        file_path: Path to the archive
+        pool: Process pool to run the parts in
+
+    Returns:
+        IntegrityReport: Verification outcome and counters
+
+    Raises:
+        ArchiveGuardError: If the archive exceeds size or ratio limits
+    """
+    size = os.path.getsize(file_path)
+    parts = pool.parts_for(size, INTEGRITY_PARALLEL_MIN_BYTES)
+    stop_dir = tempfile.mkdtemp(prefix="integrity-")
+    stop_path = os.path.join(stop_dir, "stop")
+
+    started = time.perf_counter()
+    try:
+        results = await asyncio.gather(*(
+            pool.run(
+                "verify_archive_integrity", verify_archive_part,
+                str(file_path), part, parts, INTEGRITY_TIME_BUDGET, INTEGRITY_CPU_BUDGET / parts, stop_path
+            )
+            for part in range(parts)
+        ), return_exceptions=True)
+    finally:
+        # Only removed once every part has seen (or no longer needs) the stop file
+        shutil.rmtree(stop_dir, ignore_errors=True)
+    elapsed = time.perf_counter() - started
+
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+    failure = next((r for r in results if r["error"]), None)
+    failed_member: Optional[str] = failure["failed_member"] if failure else None
+    error: Optional[str] = failure["error"] if failure else None
+    if failure is None and results[0]["manifest"] is False:
+        error = f"{MANIFEST_PATH} is missing"
+
+    members_checked = sum(r["checked"] for r in results)
+    members_total = max(r["members"] for r in results)
+    valid = error is None
+    return IntegrityReport(
+        valid=valid,
+        complete=valid and members_checked == members_total,
+        members_total=members_total,
+        members_checked=members_checked,
+        bytes_decompressed=sum(r["bytes"] for r in results),
+        elapsed_seconds=round(elapsed, 4),
+        cpu_seconds=round(sum(r["cpu"] for r in results), 4),
+        workers=parts,
+        budget_exhausted=any(r["exhausted"] for r in results),
+        failed_member=failed_member,
+        error=error
+    )
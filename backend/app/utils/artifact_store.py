@@ -0,0 +1,188 @@
+"""Content-addressed storage for uploaded artifacts"""
+from pathlib import Path
+from typing import Any, List, Optional
+from uuid import uuid4
+import json
+import os
+import shutil
+import logging
+
+from app.config import ARTIFACT_STORE_DIR
+
+logger = logging.getLogger(__name__)
+
+BLOB_FILENAME = "artifact"
+TRASH_DIRNAME = ".trash"
+
+
+class ArtifactStore:
+    """
+    Stores each distinct artifact once, keyed by its SHA-256 digest
+
+    Sessions reference a blob through a hard link, so the blob's link count
+    is its reference count: when the last session directory is removed the
+    blob can be released. Derived data (analysis results, scans) is kept as
+    JSON sidecars next to the blob.
+    """
+
+    def __init__(self, base_path: Path = ARTIFACT_STORE_DIR):
+        self.base_path = base_path
+        self.base_path.mkdir(parents=True, exist_ok=True)
+
+    def blob_dir(self, digest: str) -> Path:
+        """Directory holding the blob and its sidecars"""
+        return self.base_path / digest[:2] / digest
+
+    def blob_path(self, digest: str) -> Path:
+        """Path of the stored artifact bytes"""
+        return self.blob_dir(digest) / BLOB_FILENAME
+
+    def has(self, digest: str) -> bool:
+        """
+        Check if a blob is stored
+
+        Args:
+            digest: SHA-256 hex digest
+
+        Returns:
+            bool: True if the blob exists
+        """
+        return self.blob_path(digest).exists()
+
+    def ingest(self, staged_path: Path, digest: str) -> bool:
+        """
+        Move a fully written file into the store
+
+        If the digest is already stored the staged copy is discarded.
+
+        Args:
+            staged_path: File on the same filesystem as the store
+            digest: SHA-256 hex digest of the file
+
+        Returns:
+            bool: True if a new blob was created, False if it was deduplicated
+        """
+        blob_path = self.blob_path(digest)
+        if blob_path.exists():
+            staged_path.unlink(missing_ok=True)
+            logger.info(f"Deduplicated artifact {digest[:12]}")
+            return False
+
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(staged_path, blob_path)
+        logger.info(f"Stored new artifact {digest[:12]}")
+        return True
+
+    def link(self, digest: str, target: Path) -> Path:
+        """
+        Reference a blob from a session directory
+
+        Args:
+            digest: SHA-256 hex digest
+            target: Path the artifact should appear at
+
+        Returns:
+            Path: The linked path
+        """
+        try:
+            os.link(self.blob_path(digest), target)
+        except OSError as e:
+            # Filesystems without hard links fall back to a private copy
+            logger.warning(f"Hard link failed for {digest[:12]}, copying instead: {e}")
+            shutil.copyfile(self.blob_path(digest), target)
+        return target
+
+    def refcount(self, digest: str) -> int:
+        """
+        Number of session references to a blob
+
+        Args:
+            digest: SHA-256 hex digest
+
+        Returns:
+            int: Reference count (0 if only the store holds it)
+        """
+        try:
+            return self.blob_path(digest).stat().st_nlink - 1
+        except FileNotFoundError:
+            return 0
+
+    def release(self, digest: str) -> Optional[Path]:
+        """
+        Detach a blob once no session references it
+
+        The blob directory is atomically moved aside so that concurrent
+        ingests never see a half-deleted blob; the caller deletes the
+        returned path (typically off the event loop).
+
+        Args:
+            digest: SHA-256 hex digest
+
+        Returns:
+            Optional[Path]: Detached directory to delete, or None if still referenced
+        """
+        if not self.has(digest) or self.refcount(digest) > 0:
+            return None
+        trash_dir = self.base_path / TRASH_DIRNAME
+        trash_dir.mkdir(exist_ok=True)
+        detached = trash_dir / f"{digest}-{uuid4().hex[:8]}"
+        os.replace(self.blob_dir(digest), detached)
+        logger.info(f"Released artifact {digest[:12]}")
+        return detached
+
+    def unreferenced(self) -> List[str]:
+        """
+        Digests of stored blobs that no session links to
+
+        Returns:
+            List[str]: Orphaned blob digests
+        """
+        orphans = []
+        for blob_path in self.base_path.glob(f"??/*/{BLOB_FILENAME}"):
+            try:
+                if blob_path.stat().st_nlink <= 1:
+                    orphans.append(blob_path.parent.name)
+            except FileNotFoundError:
+                continue
+        return orphans
+
+    def load_json(self, digest: str, name: str) -> Optional[Any]:
+        """
+        Read a JSON sidecar stored next to a blob
+
+        Args:
+            digest: SHA-256 hex digest
+            name: Sidecar name (without extension)
+
+        Returns:
+            Optional[Any]: Decoded JSON, or None if missing or unreadable
+        """
+        path = self.blob_dir(digest) / f"{name}.json"
+        try:
+            return json.loads(path.read_text())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable sidecar {path}: {e}")
+            return None
+
+    def save_json(self, digest: str, name: str, data: Any) -> None:
+        """
+        Atomically write a JSON sidecar next to a blob
+
+        Args:
+            digest: SHA-256 hex digest
+            name: Sidecar name (without extension)
+            data: JSON-serializable data
+        """
+        blob_dir = self.blob_dir(digest)
+        if not blob_dir.exists():
+            return
+        path = blob_dir / f"{name}.json"
+        tmp_path = path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(data))
+        os.replace(tmp_path, path)
+
+
+# Global instance
+artifact_store = ArtifactStore()
@@ -1,14 +1,20 @@
 """File upload and management utilities"""
 from pathlib import Path
-from uuid import uuid4
+from uuid import UUID, uuid4
 import aiofiles
-import asyncio
+import hashlib
+import json
+import os
 import shutil
 import logging
-from fastapi import UploadFile
+from fastapi import Request
 
-from app.config import UPLOAD_DIR, SESSION_CLEANUP_DELAY
-from app.utils.security import sanitize_filename
+from app.config import UPLOAD_DIR, UPLOAD_STAGING_DIR, SESSION_CLEANUP_DELAY, MAX_UPLOAD_SIZE
+from app.models.schemas import UploadStats
+from app.utils.artifact_store import artifact_store
+from app.utils.session_reaper import SESSION_INFO_FILE, read_session_info, session_reaper
+from app.utils.storage_quota import storage_quota
+from app.utils.upload_stream import check_content_length, receive_artifact
 
 logger = logging.getLogger(__name__)
 
@@ -16,56 +22,106 @@ logger = logging.getLogger(__name__)
 class UploadManager:
     """Manages file uploads and session storage"""
 
-    def __init__(self, base_path: Path = UPLOAD_DIR):
+    def __init__(self, base_path: Path = UPLOAD_DIR, staging_path: Path = UPLOAD_STAGING_DIR):
         self.base_path = base_path
         self.base_path.mkdir(parents=True, exist_ok=True)
+        self.staging_path = staging_path
+        self.staging_path.mkdir(parents=True, exist_ok=True)
 
-    async def save_upload(self, file: UploadFile) -> tuple[str, Path]:
+    async def save_stream(self, request: Request) -> tuple[str, Path, str, UploadStats, bool]:
         """
-        Save uploaded file to session directory
+        Stream a multipart artifact upload into the content-addressed store
+
+        Validation, hashing and the disk write all happen in a single pass
+        over the request body (see ``receive_artifact``). The file is staged
+        next to the store, moved in by digest (or dropped if already stored)
+        and hard-linked into a new session directory.
 
         Args:
-            file: The uploaded file
+            request: Incoming multipart/form-data request
 
         Returns:
-            tuple: (session_id, file_path)
+            tuple: (session_id, file_path, original_filename, stats, deduplicated)
+        """
+        declared = check_content_length(request)
+
+        # Hold room for the staged copy until it is accounted as a blob
+        async with storage_quota.reservation(declared or MAX_UPLOAD_SIZE):
+            session_id = str(uuid4())
+            staging_dir = self.staging_path / session_id
+            staging_dir.mkdir(parents=True, exist_ok=True)
+
+            try:
+                sink = await receive_artifact(request, staging_dir)
+                digest = sink.stats().sha256
+                file_path, deduplicated = self.commit_staged(session_id, sink.file_path, digest)
+            finally:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+
+        return session_id, file_path, sink.filename, sink.stats(), deduplicated
+
+    def commit_staged(self, session_id: str, staged_path: Path, digest: str) -> tuple[Path, bool]:
         """
-        # Generate unique session ID
-        session_id = str(uuid4())
+        Move a fully received artifact into the store and open a session on it
+
+        Args:
+            session_id: New session ID
+            staged_path: Artifact file under the staging directory
+            digest: SHA-256 hex digest of the artifact
+
+        Returns:
+            tuple: (file_path, deduplicated)
+        """
+        created = artifact_store.ingest(staged_path, digest)
+
         session_dir = self.base_path / session_id
         session_dir.mkdir(parents=True, exist_ok=True)
+        file_path = artifact_store.link(digest, session_dir / staged_path.name)
+        self._update_session_info(session_dir, sha256=digest, filename=file_path.name)
 
-        # Sanitize filename
-        safe_filename = sanitize_filename(file.filename)
-        file_path = session_dir / safe_filename
+        logger.info(f"Saved upload: {file_path.name} to session {session_id}")
 
-        # Save file in chunks (streaming for memory efficiency)
-        async with aiofiles.open(file_path, 'wb') as f:
-            while chunk := await file.read(1024 * 1024):  # 1MB chunks
-                await f.write(chunk)
+        # Schedule cleanup
+        session_reaper.schedule(session_dir, SESSION_CLEANUP_DELAY)
+        storage_quota.add(session_reaper.key_for(session_dir), digest=digest)
 
-        logger.info(f"Saved upload: {safe_filename} to session {session_id}")
+        return file_path, not created
 
-        # Schedule cleanup
-        asyncio.create_task(self._cleanup_after_delay(session_dir, SESSION_CLEANUP_DELAY))
+    def _update_session_info(self, session_dir: Path, **fields) -> None:
+        """Merge fields into the session record (artifact digest, file hashes)"""
+        info = read_session_info(session_dir)
+        info.update(fields)
+        info_path = session_dir / SESSION_INFO_FILE
+        tmp_path = info_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(info))
+        os.replace(tmp_path, info_path)
 
-        return session_id, file_path
+    def get_session_info(self, session_id: str) -> dict:
+        """
+        Get the session record
 
-    async def _cleanup_after_delay(self, directory: Path, delay: int):
+        Args:
+            session_id: Session ID
+
+        Returns:
+            dict: Artifact digest/filename and content hashes of session files
         """
-        Clean up session directory after delay
+        return read_session_info(self.get_session_dir(session_id))
+
+    def is_valid_session_id(self, session_id: str) -> bool:
+        """
+        Check that a session ID has the expected format
 
         Args:
-            directory: Directory to clean up
-            delay: Delay in seconds
+            session_id: Session ID
+
+        Returns:
+            bool: True if the ID is a UUID
         """
-        await asyncio.sleep(delay)
         try:
-            if directory.exists():
-                shutil.rmtree(directory)
-                logger.info(f"Cleaned up session directory: {directory.name}")
-        except Exception as e:
-            logger.error(f"Failed to cleanup {directory}: {e}")
+            return str(UUID(session_id)) == session_id.lower()
+        except ValueError:
+            return False
 
     def get_session_dir(self, session_id: str) -> Path:
         """
@@ -79,6 +135,24 @@ class UploadManager:
         """
         return self.base_path / session_id
 
+    def touch(self, session_id: str) -> None:
+        """
+        Mark a session as recently used so quota eviction spares it
+
+        Args:
+            session_id: Session ID
+        """
+        storage_quota.touch(session_reaper.key_for(self.get_session_dir(session_id)))
+
+    async def discard_session(self, session_id: str) -> None:
+        """
+        Delete a session right away, e.g. after its artifact failed analysis
+
+        Args:
+            session_id: Session ID
+        """
+        await session_reaper.reap_now([session_reaper.key_for(self.get_session_dir(session_id))])
+
     def session_exists(self, session_id: str) -> bool:
         """
         Check if session exists
@@ -103,12 +177,21 @@ class UploadManager:
             Path: Path to saved Dockerfile
         """
         session_dir = self.get_session_dir(session_id)
-        if not session_dir.exists():
-            session_dir.mkdir(parents=True, exist_ok=True)
-
-        dockerfile_path = session_dir / "Dockerfile"
-        async with aiofiles.open(dockerfile_path, 'w') as f:
-            await f.write(content)
+        size = len(content.encode())
+
+        async with storage_quota.reservation(size):
+            if not session_dir.exists():
+                session_dir.mkdir(parents=True, exist_ok=True)
+                session_reaper.schedule(session_dir, SESSION_CLEANUP_DELAY)
+
+            dockerfile_path = session_dir / "Dockerfile"
+            async with aiofiles.open(dockerfile_path, 'w') as f:
+                await f.write(content)
+            self._update_session_info(
+                session_dir,
+                dockerfile_sha256=hashlib.sha256(content.encode()).hexdigest()
+            )
+            storage_quota.grow(session_reaper.key_for(session_dir), size)
 
         logger.info(f"Saved Dockerfile to session {session_id}")
         return dockerfile_path
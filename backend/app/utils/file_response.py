@@ -0,0 +1,165 @@
+"""Conditional and ranged file responses"""
+from pathlib import Path
+from typing import Optional
+import os
+import re
+
+import anyio
+from fastapi import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+CHUNK_SIZE = 256 * 1024
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class SendfileResponse(Response):
+    """
+    Streams a byte range of a file
+
+    Uses the ASGI ``http.response.zerocopysend`` extension (sendfile) when
+    the server offers it, and falls back to chunked reads on a worker
+    thread otherwise.
+    """
+
+    def __init__(self, path: Path, stat_result: os.stat_result, status_code: int = 200,
+                 headers: Optional[dict] = None, media_type: Optional[str] = None,
+                 offset: int = 0, count: Optional[int] = None, method: str = "GET"):
+        self.path = path
+        self.offset = offset
+        self.count = stat_result.st_size - offset if count is None else count
+        self.send_header_only = method == "HEAD"
+        super().__init__(content=None, status_code=status_code, headers=headers, media_type=media_type)
+        self.headers["content-length"] = str(self.count)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        if self.send_header_only or self.count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            fd = os.open(self.path, os.O_RDONLY)
+            try:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": fd,
+                    "offset": self.offset,
+                    "count": self.count,
+                    "more_body": False,
+                })
+            finally:
+                os.close(fd)
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.offset)
+            remaining = self.count
+            while remaining > 0:
+                chunk = await file.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def _parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """
+    Parse a single ``bytes=`` range
+
+    Returns:
+        Optional[tuple]: (start, end) inclusive, or None when the header is
+        unsupported and the full body should be sent
+
+    Raises:
+        ValueError: If the range cannot be satisfied
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        # Multi-range and other units are served as a full response
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError("unsatisfiable range")
+    return start, min(end, size - 1)
+
+
+def conditional_file_response(
+    request: Request,
+    path: Path,
+    etag: str,
+    media_type: str,
+    filename: str,
+    cache_control: str = "no-cache"
+) -> Response:
+    """
+    Serve a file with a strong ETag, If-None-Match and Range support
+
+    Args:
+        request: Incoming request (for conditional and range headers)
+        path: File to serve
+        etag: Strong validator, e.g. the content digest
+        media_type: Response media type
+        filename: Download filename
+        cache_control: Cache-Control header value
+
+    Returns:
+        Response: 200, 206, 304 or 416 response
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    stat_result = os.stat(path)
+    quoted_etag = f'"{etag}"'
+    headers = {
+        "etag": quoted_etag,
+        "accept-ranges": "bytes",
+        "cache-control": cache_control,
+        "content-disposition": f'attachment; filename="{filename}"',
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, quoted_etag):
+        return Response(status_code=304, headers={k: headers[k] for k in ("etag", "cache-control")})
+
+    size = stat_result.st_size
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == quoted_etag):
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={"content-range": f"bytes */{size}", **headers})
+        if byte_range is not None:
+            start, end = byte_range
+            headers["content-range"] = f"bytes {start}-{end}/{size}"
+            return SendfileResponse(
+                path, stat_result, status_code=206, headers=headers, media_type=media_type,
+                offset=start, count=end - start + 1, method=request.method
+            )
+
+    return SendfileResponse(path, stat_result, headers=headers, media_type=media_type, method=request.method)
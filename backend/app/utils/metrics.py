@@ -0,0 +1,64 @@
+"""Lightweight in-process metrics"""
+from typing import Dict, Sequence
+import bisect
+
+# Upper bounds in seconds; the last bucket catches everything above
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the style of Prometheus"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Record one observation
+
+        Args:
+            value: Observed value (seconds for latency histograms)
+        """
+        self._counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> dict:
+        """
+        Export the histogram
+
+        Returns:
+            dict: count, sum, mean and cumulative bucket counts
+        """
+        cumulative: Dict[str, int] = {}
+        running = 0
+        for bound, count in zip(self.buckets, self._counts):
+            running += count
+            cumulative[f"le_{bound:g}"] = running
+        cumulative["le_inf"] = self.count
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "buckets": cumulative,
+        }
+
+
+class HistogramFamily:
+    """Histograms keyed by a label value (e.g. job or template name)"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._histograms: Dict[str, Histogram] = {}
+
+    def observe(self, label: str, value: float) -> None:
+        histogram = self._histograms.get(label)
+        if histogram is None:
+            histogram = self._histograms[label] = Histogram(self.buckets)
+        histogram.observe(value)
+
+    def snapshot(self) -> dict:
+        return {label: histogram.snapshot() for label, histogram in sorted(self._histograms.items())}
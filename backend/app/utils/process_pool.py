@@ -0,0 +1,201 @@
+"""Bounded process pool for CPU-bound archive work"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+import asyncio
+import faulthandler
+import multiprocessing
+import signal
+import time
+import logging
+
+from fastapi import HTTPException
+
+from app.config import ANALYSIS_WORKERS, ANALYSIS_QUEUE_DEPTH, ANALYSIS_JOB_TIMEOUT, ANALYSIS_JOB_KILL_GRACE
+from app.utils.metrics import HistogramFamily
+
+logger = logging.getLogger(__name__)
+
+
+class JobTimeout(BaseException):
+    """
+    A job ran longer than its execution timeout
+
+    Not an ``Exception``, so the broad handlers jobs use to report bad
+    archives cannot mistake it for a failure of their own.
+    """
+
+
+def _raise_timeout(signum, frame) -> None:
+    raise JobTimeout()
+
+
+def _timed_call(fn: Callable, timeout: float, *args) -> tuple[float, float, Any]:
+    """
+    Run fn in the worker and report when it started and finished
+
+    The timeout starts here, when the job starts executing, so time spent
+    queued never counts. It interrupts the job with ``JobTimeout``, which
+    leaves the worker usable; a job stuck in native code that cannot be
+    interrupted makes the worker exit after ``ANALYSIS_JOB_KILL_GRACE``.
+    """
+    started_at = time.time()
+    signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    faulthandler.dump_traceback_later(timeout + ANALYSIS_JOB_KILL_GRACE, exit=True)
+    try:
+        result = fn(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        faulthandler.cancel_dump_traceback_later()
+    return started_at, time.time(), result
+
+
+class BoundedProcessPool:
+    """
+    Runs blocking jobs in worker processes so they never stall the event loop
+
+    At most ``max_workers + max_queue`` jobs are admitted at once; beyond
+    that callers get a 503 instead of piling up. Each job's execution is
+    bounded by a timeout enforced inside its worker, so other jobs keep
+    running; a worker that cannot be interrupted exits and the broken
+    executor is replaced once. Queue wait and execution time are recorded
+    separately.
+    """
+
+    def __init__(self, max_workers: int = ANALYSIS_WORKERS, max_queue: int = ANALYSIS_QUEUE_DEPTH,
+                 timeout: float = ANALYSIS_JOB_TIMEOUT):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._inflight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._failed = 0
+        self.queue_wait = HistogramFamily()
+        self.execution = HistogramFamily()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """The underlying executor, created on first use"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def run(self, job: str, fn: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """
+        Run ``fn(*args)`` in a worker process
+
+        Args:
+            job: Job name used for metrics
+            fn: Picklable module-level function
+            *args: Picklable arguments
+            timeout: Override of the per-job execution timeout in seconds
+
+        Returns:
+            Any: The function's return value
+
+        Raises:
+            HTTPException: 503 if the queue is full, 504 if the job timed out
+        """
+        if self._inflight >= self.max_workers + self.max_queue:
+            self._rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Analysis queue is full, please retry later",
+                headers={"Retry-After": "5"}
+            )
+
+        self._inflight += 1
+        submitted_at = time.time()
+        executor = self.executor
+        try:
+            try:
+                started_at, finished_at, result = await asyncio.get_running_loop().run_in_executor(
+                    executor, _timed_call, fn, timeout or self.timeout, *args
+                )
+            except JobTimeout:
+                self._timed_out += 1
+                logger.error(f"{job} job exceeded {timeout or self.timeout}s of execution")
+                raise HTTPException(status_code=504, detail=f"{job} timed out")
+            except BrokenProcessPool:
+                self._failed += 1
+                self._recycle(executor)
+                raise HTTPException(status_code=500, detail=f"{job} worker crashed")
+            except Exception:
+                self._failed += 1
+                raise
+        finally:
+            self._inflight -= 1
+
+        self._completed += 1
+        self.queue_wait.observe(job, max(started_at - submitted_at, 0.0))
+        self.execution.observe(job, finished_at - started_at)
+        return result
+
+    def parts_for(self, size: int, min_bytes: int) -> int:
+        """
+        Number of jobs to split one scan of an archive into
+
+        An upload runs several split scans at once (integrity, dependencies,
+        JDK modules), so each gets half the workers rather than all of them.
+        That keeps the jobs of two large uploads within the admission limit
+        instead of turning the second one away with a 503.
+
+        Args:
+            size: Archive size in bytes
+            min_bytes: Smallest archive worth splitting
+
+        Returns:
+            int: Number of parts, at least 1
+        """
+        if size < min_bytes:
+            return 1
+        return max(1, self.max_workers // 2)
+
+    def stats(self) -> dict:
+        """
+        Pool metrics
+
+        Returns:
+            dict: Capacity, counters and per-job queue-wait/execution histograms
+        """
+        return {
+            "workers": self.max_workers,
+            "queue_depth": self.max_queue,
+            "inflight": self._inflight,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "timed_out": self._timed_out,
+            "failed": self._failed,
+            "queue_wait_seconds": self.queue_wait.snapshot(),
+            "execution_seconds": self.execution.snapshot(),
+        }
+
+    def shutdown(self) -> None:
+        """Stop worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _recycle(self, executor: ProcessPoolExecutor) -> None:
+        """
+        Replace a broken executor
+
+        Every job of a broken executor fails at once; only the first
+        failure replaces it, so later ones never tear down its successor.
+        """
+        if self._executor is not executor:
+            return
+        self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+        logger.warning("Analysis worker pool broken, starting a new one")
+
+
+# Global instance
+analysis_pool = BoundedProcessPool()
@@ -0,0 +1,346 @@
+"""Resumable chunked uploads for large Java artifacts"""
+from pathlib import Path
+from typing import Dict, List, Optional
+from uuid import UUID, uuid4
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import time
+import logging
+
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+
+from app.config import (
+    RESUMABLE_UPLOAD_DIR,
+    RESUMABLE_CHUNK_SIZE,
+    RESUMABLE_MAX_CHUNK_SIZE,
+    RESUMABLE_UPLOAD_EXPIRY,
+)
+from app.models.schemas import ResumableUploadStatus
+from app.utils.file_handler import UploadManager, upload_manager
+from app.utils.session_reaper import session_reaper
+from app.utils.storage_quota import storage_quota
+from app.utils.security import (
+    sanitize_filename,
+    validate_content_type,
+    validate_filename,
+    validate_magic_number,
+    validate_size,
+    validate_upload,
+)
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "upload.json"
+
+
+class _UploadState:
+    """Persisted bookkeeping for one resumable upload"""
+
+    def __init__(self, upload_id: str, filename: str, size: int, content_type: str,
+                 ranges: Optional[List[List[int]]] = None, created_at: Optional[float] = None):
+        self.upload_id = upload_id
+        self.filename = filename
+        self.size = size
+        self.content_type = content_type
+        self.ranges = ranges or []
+        self.created_at = created_at or time.time()
+        self.finalizing = False
+        # Chunk writes in progress; finalize waits for them before reading the file
+        self.inflight_writes = 0
+        self.writes_idle = asyncio.Event()
+        self.writes_idle.set()
+
+    @property
+    def received_bytes(self) -> int:
+        return sum(end - start for start, end in self.ranges)
+
+    @property
+    def complete(self) -> bool:
+        return self.ranges == [[0, self.size]]
+
+    def add_range(self, start: int, end: int) -> None:
+        """Merge [start, end) into the sorted list of received ranges"""
+        merged = []
+        for r_start, r_end in sorted(self.ranges + [[start, end]]):
+            if merged and r_start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], r_end)
+            else:
+                merged.append([r_start, r_end])
+        self.ranges = merged
+
+    def missing_ranges(self) -> List[List[int]]:
+        missing = []
+        cursor = 0
+        for start, end in self.ranges:
+            if start > cursor:
+                missing.append([cursor, start])
+            cursor = end
+        if cursor < self.size:
+            missing.append([cursor, self.size])
+        return missing
+
+    def to_dict(self) -> dict:
+        return {
+            "upload_id": self.upload_id,
+            "filename": self.filename,
+            "size": self.size,
+            "content_type": self.content_type,
+            "ranges": self.ranges,
+            "created_at": self.created_at,
+        }
+
+
+class ResumableUploadManager:
+    """
+    Create → PATCH chunks at offsets → finalize upload protocol
+
+    Chunks are written in place into a preallocated staging file, so they
+    may arrive in any order and in parallel. Received ranges are persisted
+    next to the data, which lets clients resume after a disconnect (or a
+    server restart) by asking for the missing ranges. Full validation and
+    hashing only happen once, at finalize.
+    """
+
+    def __init__(self, manager: UploadManager = upload_manager,
+                 base_path: Path = RESUMABLE_UPLOAD_DIR):
+        self.manager = manager
+        self.base_path = base_path
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        self._uploads: Dict[str, _UploadState] = {}
+
+    async def create(self, filename: str, size: int, content_type: str) -> ResumableUploadStatus:
+        """
+        Start a new resumable upload
+
+        Args:
+            filename: Original artifact filename
+            size: Total artifact size in bytes
+            content_type: Declared artifact content type
+
+        Returns:
+            ResumableUploadStatus: Initial upload status
+        """
+        validate_filename(filename)
+        validate_content_type(content_type)
+        validate_size(size)
+
+        async with storage_quota.reservation(size):
+            upload_id = str(uuid4())
+            upload_dir = self.base_path / upload_id
+            upload_dir.mkdir(parents=True)
+
+            state = _UploadState(upload_id, filename, size, content_type)
+            # Preallocate so chunks can be written at any offset
+            with open(self._data_path(state), 'wb') as f:
+                f.truncate(size)
+            self._save_state(state)
+            self._uploads[upload_id] = state
+
+            session_reaper.schedule(upload_dir, RESUMABLE_UPLOAD_EXPIRY)
+            storage_quota.add(session_reaper.key_for(upload_dir), own_bytes=size)
+
+        logger.info(f"Started resumable upload {upload_id} for {filename} ({size} bytes)")
+        return self._status(state)
+
+    def status(self, upload_id: str) -> ResumableUploadStatus:
+        """
+        Get the progress of an upload
+
+        Args:
+            upload_id: Upload ID
+
+        Returns:
+            ResumableUploadStatus: Current upload status
+        """
+        return self._status(self._get(upload_id))
+
+    async def write_chunk(self, upload_id: str, offset: int, data: bytes,
+                          checksum: Optional[str] = None) -> ResumableUploadStatus:
+        """
+        Write one chunk at the given offset
+
+        Args:
+            upload_id: Upload ID
+            offset: Byte offset of the chunk within the artifact
+            data: Chunk bytes
+            checksum: Optional SHA-256 hex digest the chunk must match
+
+        Returns:
+            ResumableUploadStatus: Upload status after the write
+        """
+        state = self._get(upload_id)
+        if state.finalizing:
+            raise HTTPException(status_code=409, detail="Upload is being finalized")
+        if not data:
+            raise HTTPException(status_code=400, detail="Empty chunk")
+        if len(data) > RESUMABLE_MAX_CHUNK_SIZE:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Chunk too large. Maximum chunk size: {RESUMABLE_MAX_CHUNK_SIZE} bytes"
+            )
+        if offset < 0 or offset + len(data) > state.size:
+            raise HTTPException(
+                status_code=416,
+                detail=f"Chunk [{offset}, {offset + len(data)}) is outside the upload size {state.size}"
+            )
+        if offset == 0:
+            validate_magic_number(data)
+
+        state.inflight_writes += 1
+        state.writes_idle.clear()
+        try:
+            await asyncio.to_thread(self._verify_and_write, self._data_path(state), offset, data, checksum)
+            state.add_range(offset, offset + len(data))
+        finally:
+            state.inflight_writes -= 1
+            if state.inflight_writes == 0:
+                state.writes_idle.set()
+
+        # Finalize or abort may have started during the write; the directory is theirs now
+        if state.finalizing:
+            raise HTTPException(status_code=409, detail="Upload is being finalized")
+        if self._uploads.get(state.upload_id) is not state:
+            raise HTTPException(status_code=404, detail="Upload not found or expired")
+        self._save_state(state)
+        # Expiry counts from the last activity
+        upload_dir = self.base_path / state.upload_id
+        session_reaper.schedule(upload_dir, RESUMABLE_UPLOAD_EXPIRY)
+        storage_quota.touch(session_reaper.key_for(upload_dir))
+        return self._status(state)
+
+    async def finalize(self, upload_id: str) -> tuple[str, Path, str, int, str, bool]:
+        """
+        Validate the assembled artifact and turn it into an upload session
+
+        Args:
+            upload_id: Upload ID
+
+        Returns:
+            tuple: (session_id, file_path, original_filename, size, sha256, deduplicated)
+        """
+        state = self._get(upload_id)
+        if state.finalizing:
+            raise HTTPException(status_code=409, detail="Upload is already being finalized")
+        if not state.complete:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Upload incomplete: missing ranges {state.missing_ranges()}"
+            )
+
+        state.finalizing = True
+        upload_dir = self.base_path / state.upload_id
+        # Cancelling also drops the staged bytes from the storage quota
+        session_reaper.cancel(upload_dir)
+        data_path = self._data_path(state)
+        try:
+            # Retried chunks still being written must land before the file is hashed and moved
+            await state.writes_idle.wait()
+            with open(data_path, 'rb') as f:
+                await validate_upload(UploadFile(
+                    file=f,
+                    filename=state.filename,
+                    headers=Headers({"content-type": state.content_type})
+                ))
+
+            digest = await asyncio.to_thread(self._hash_file, data_path)
+            session_id = str(uuid4())
+            file_path, deduplicated = self.manager.commit_staged(session_id, data_path, digest)
+        except BaseException:
+            state.finalizing = False
+            session_reaper.schedule(upload_dir, RESUMABLE_UPLOAD_EXPIRY)
+            storage_quota.add(session_reaper.key_for(upload_dir), own_bytes=state.size)
+            raise
+
+        self._discard(state.upload_id)
+        logger.info(f"Finalized resumable upload {upload_id} into session {session_id}")
+        return session_id, file_path, state.filename, state.size, digest, deduplicated
+
+    async def abort(self, upload_id: str) -> None:
+        """
+        Cancel an upload and delete its staged data
+
+        Args:
+            upload_id: Upload ID
+        """
+        state = self._get(upload_id)
+        if state.finalizing:
+            raise HTTPException(status_code=409, detail="Upload is being finalized")
+        self._discard(state.upload_id)
+        logger.info(f"Aborted resumable upload {upload_id}")
+
+    def _get(self, upload_id: str) -> _UploadState:
+        """Look up an upload, reloading its state from disk if needed"""
+        try:
+            upload_id = str(UUID(upload_id))
+        except ValueError:
+            raise HTTPException(status_code=404, detail="Upload not found or expired")
+
+        state = self._uploads.get(upload_id)
+        if state is not None and not (self.base_path / upload_id).exists():
+            # Expired by the session reaper
+            del self._uploads[upload_id]
+            state = None
+        if state is None:
+            state_path = self.base_path / upload_id / STATE_FILE
+            try:
+                data = json.loads(state_path.read_text())
+            except (OSError, ValueError):
+                raise HTTPException(status_code=404, detail="Upload not found or expired")
+            state = _UploadState(**data)
+            self._uploads[upload_id] = state
+        return state
+
+    def _status(self, state: _UploadState) -> ResumableUploadStatus:
+        return ResumableUploadStatus(
+            upload_id=state.upload_id,
+            filename=state.filename,
+            size=state.size,
+            chunk_size=RESUMABLE_CHUNK_SIZE,
+            received_bytes=state.received_bytes,
+            missing_ranges=state.missing_ranges(),
+            complete=state.complete
+        )
+
+    def _data_path(self, state: _UploadState) -> Path:
+        return self.base_path / state.upload_id / sanitize_filename(state.filename)
+
+    def _save_state(self, state: _UploadState) -> None:
+        """Atomically persist upload state"""
+        state_path = self.base_path / state.upload_id / STATE_FILE
+        tmp_path = state_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(state.to_dict()))
+        os.replace(tmp_path, state_path)
+
+    def _discard(self, upload_id: str) -> None:
+        self._uploads.pop(upload_id, None)
+        session_reaper.cancel(self.base_path / upload_id)
+        shutil.rmtree(self.base_path / upload_id, ignore_errors=True)
+
+    @staticmethod
+    def _verify_and_write(path: Path, offset: int, data: bytes, checksum: Optional[str]) -> None:
+        """Check the chunk digest and write it in place (runs in a worker thread)"""
+        if checksum and hashlib.sha256(data).hexdigest() != checksum.strip().lower():
+            raise HTTPException(status_code=400, detail="Chunk checksum mismatch")
+
+        fd = os.open(path, os.O_WRONLY)
+        try:
+            view = memoryview(data)
+            while view:
+                written = os.pwrite(fd, view, offset)
+                view = view[written:]
+                offset += written
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _hash_file(path: Path) -> str:
+        """SHA-256 of a staged file (runs in a worker thread)"""
+        with open(path, 'rb') as f:
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+
+# Global instance
+resumable_upload_manager = ResumableUploadManager()
@@ -0,0 +1,359 @@
+"""Centralized expiry of upload sessions and staged uploads"""
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import asyncio
+import heapq
+import json
+import os
+import shutil
+import time
+import logging
+
+from app.config import (
+    UPLOAD_DIR,
+    UPLOAD_STAGING_DIR,
+    RESUMABLE_UPLOAD_DIR,
+    SESSION_CLEANUP_DELAY,
+    RESUMABLE_UPLOAD_EXPIRY,
+    REAPER_INTERVAL,
+    REAPER_BATCH_SIZE,
+)
+from app.utils.artifact_store import ArtifactStore, TRASH_DIRNAME, artifact_store
+
+logger = logging.getLogger(__name__)
+
+SESSION_INFO_FILE = "session.json"
+INDEX_FILE = ".expiry-index.json"
+
+
+def read_session_info(session_dir: Path) -> dict:
+    """
+    Read the record a session keeps about the artifact it references
+
+    Args:
+        session_dir: Session directory
+
+    Returns:
+        dict: Session record, empty if the session holds no artifact
+    """
+    try:
+        return json.loads((session_dir / SESSION_INFO_FILE).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def tree_size(path: Path) -> int:
+    """Total size of files under path that are not hard-linked elsewhere"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                st = os.lstat(os.path.join(root, name))
+            except OSError:
+                continue
+            # Hard-linked artifacts are accounted for when their blob is released
+            if st.st_nlink <= 1:
+                total += st.st_size
+    return total
+
+
+class SessionReaper:
+    """
+    Expires session and staging directories from a single background task
+
+    Expiry times live in a min-heap keyed by directory (relative to the
+    upload root) and are persisted to an index file, so pending expiries
+    survive restarts. Due directories are deleted in batches on a worker
+    thread; blobs that lose their last reference are released afterwards.
+    """
+
+    def __init__(self, base_path: Path = UPLOAD_DIR, store: ArtifactStore = artifact_store):
+        self.base_path = base_path
+        self.store = store
+        self.index_path = base_path / INDEX_FILE
+        self._expiry: Dict[str, float] = {}
+        self._heap: List[tuple[float, str]] = []
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._reclaimed_dirs = 0
+        self._reclaimed_bytes = 0
+        self._reclaim_seconds = 0.0
+        self._last_batch: Dict[str, float] = {}
+        self._listeners: List[Callable[[List[str]], None]] = []
+
+    def schedule(self, path: Path, delay: float) -> None:
+        """
+        Schedule (or reschedule) a directory for deletion
+
+        Args:
+            path: Directory under the upload root
+            delay: Seconds from now until it expires
+        """
+        key = self._key(path)
+        expires_at = time.time() + delay
+        previous = self._expiry.get(key)
+        self._expiry[key] = expires_at
+        heapq.heappush(self._heap, (expires_at, key))
+        self._dirty = True
+
+        # Stale heap entries are skipped lazily; compact when they dominate
+        if len(self._heap) > 2 * len(self._expiry) + 64:
+            self._heap = [(t, k) for k, t in self._expiry.items()]
+            heapq.heapify(self._heap)
+
+        if previous is None or expires_at < previous:
+            self._wakeup.set()
+
+    def cancel(self, path: Path) -> None:
+        """
+        Forget a directory that was removed or finalized by its owner
+
+        Args:
+            path: Directory under the upload root
+        """
+        key = self._key(path)
+        if self._expiry.pop(key, None) is not None:
+            self._dirty = True
+            self._notify([key])
+
+    async def reap_now(self, keys: List[str]) -> None:
+        """
+        Delete tracked directories immediately, ahead of their expiry
+
+        Args:
+            keys: Directory keys as returned by ``keys()``
+        """
+        keys = [key for key in keys if self._expiry.pop(key, None) is not None]
+        if keys:
+            self._dirty = True
+            await self._reap(keys)
+
+    def add_listener(self, callback: Callable[[List[str]], None]) -> None:
+        """
+        Register a callback for directories that stop being tracked
+
+        The callback runs on the event loop with the keys of directories
+        that were reaped or cancelled by their owner.
+
+        Args:
+            callback: Function taking a list of directory keys
+        """
+        self._listeners.append(callback)
+
+    def keys(self) -> List[str]:
+        """Keys (paths relative to the upload root) of tracked directories"""
+        return list(self._expiry)
+
+    def key_for(self, path: Path) -> str:
+        """Key under which a directory is tracked"""
+        return self._key(path)
+
+    def next_expiry_in(self) -> Optional[float]:
+        """Seconds until the next tracked directory expires"""
+        if not self._expiry:
+            return None
+        return max(min(self._expiry.values()) - time.time(), 0.0)
+
+    def pending(self) -> int:
+        """Number of directories waiting to expire"""
+        return len(self._expiry)
+
+    async def start(self) -> None:
+        """Rebuild the expiry index from disk and start the reaper task"""
+        if self._task is not None:
+            return
+        await asyncio.to_thread(self._rebuild)
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Session reaper started with {self.pending()} pending expiries")
+
+    async def stop(self) -> None:
+        """Stop the reaper task and persist the index"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._flush_index()
+
+    def stats(self) -> dict:
+        """
+        Reaper metrics
+
+        Returns:
+            dict: Pending expiries and reclaim totals/throughput
+        """
+        next_expiry = self.next_expiry_in()
+        return {
+            "pending_expiries": self.pending(),
+            "next_expiry_in_seconds": round(next_expiry, 3) if next_expiry is not None else None,
+            "reclaimed_directories": self._reclaimed_dirs,
+            "reclaimed_bytes": self._reclaimed_bytes,
+            "reclaim_bytes_per_second": (
+                round(self._reclaimed_bytes / self._reclaim_seconds, 2) if self._reclaim_seconds else 0.0
+            ),
+            "last_batch": self._last_batch,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                due = self._pop_due(REAPER_BATCH_SIZE)
+                if due:
+                    await self._reap(due)
+                    continue
+
+                if self._dirty:
+                    # Snapshot on the loop, write on a worker thread
+                    self._dirty = False
+                    await asyncio.to_thread(self._write_index, json.dumps(self._expiry))
+
+                timeout = REAPER_INTERVAL
+                if self._heap:
+                    timeout = min(timeout, max(self._heap[0][0] - time.time(), 0.0))
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Session reaper iteration failed: {e}")
+                await asyncio.sleep(REAPER_INTERVAL)
+
+    def _pop_due(self, limit: int) -> List[str]:
+        now = time.time()
+        due = []
+        while self._heap and self._heap[0][0] <= now and len(due) < limit:
+            expires_at, key = heapq.heappop(self._heap)
+            # Skip entries superseded by a reschedule or cancel
+            if self._expiry.get(key) != expires_at:
+                continue
+            del self._expiry[key]
+            due.append(key)
+        if due:
+            self._dirty = True
+        return due
+
+    async def _reap(self, keys: List[str]) -> None:
+        started = time.monotonic()
+        digests, reclaimed = await asyncio.to_thread(self._delete_dirs, keys)
+
+        # Release on the event loop so it cannot interleave with an ingest
+        detached = [d for d in (self.store.release(digest) for digest in digests) if d]
+        if detached:
+            reclaimed += await asyncio.to_thread(self._delete_detached, detached)
+
+        elapsed = time.monotonic() - started
+        self._reclaimed_dirs += len(keys)
+        self._reclaimed_bytes += reclaimed
+        self._reclaim_seconds += elapsed
+        self._last_batch = {
+            "directories": len(keys),
+            "bytes": reclaimed,
+            "seconds": round(elapsed, 6),
+        }
+        logger.info(f"Reaped {len(keys)} expired directories ({reclaimed} bytes) in {elapsed:.3f}s")
+        self._notify(keys)
+
+    def _notify(self, keys: List[str]) -> None:
+        for callback in self._listeners:
+            try:
+                callback(keys)
+            except Exception as e:
+                logger.error(f"Session reaper listener failed: {e}")
+
+    def _delete_dirs(self, keys: List[str]) -> tuple[set, int]:
+        """Delete expired directories (runs in a worker thread)"""
+        digests = set()
+        reclaimed = 0
+        for key in keys:
+            path = self.base_path / key
+            if not path.exists():
+                continue
+            digest = read_session_info(path).get("sha256")
+            if digest:
+                digests.add(digest)
+            reclaimed += tree_size(path)
+            shutil.rmtree(path, ignore_errors=True)
+        return digests, reclaimed
+
+    @staticmethod
+    def _delete_detached(paths: List[Path]) -> int:
+        """Delete released blob directories (runs in a worker thread)"""
+        reclaimed = 0
+        for path in paths:
+            reclaimed += tree_size(path)
+            shutil.rmtree(path, ignore_errors=True)
+        return reclaimed
+
+    def _key(self, path: Path) -> str:
+        return path.relative_to(self.base_path).as_posix()
+
+    def _flush_index(self) -> None:
+        """Persist pending expiries synchronously"""
+        if self._dirty:
+            self._dirty = False
+            self._write_index(json.dumps(self._expiry))
+
+    def _write_index(self, payload: str) -> None:
+        """Atomically replace the index file (safe to run in a worker thread)"""
+        tmp_path = self.index_path.with_suffix(".tmp")
+        try:
+            tmp_path.write_text(payload)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            self._dirty = True
+            logger.error(f"Failed to persist expiry index: {e}")
+
+    def _rebuild(self) -> None:
+        """
+        Restore pending expiries from the index and reconcile with disk
+
+        Directories missing from the index (e.g. written by an older
+        version or before a crash) expire relative to their mtime.
+        Orphaned blobs and detached blob trash left by a crash are purged.
+        """
+        try:
+            indexed = json.loads(self.index_path.read_text())
+        except (OSError, ValueError):
+            indexed = {}
+
+        candidates: Dict[str, float] = {}
+        defaults = [
+            (self.base_path, SESSION_CLEANUP_DELAY),
+            (UPLOAD_STAGING_DIR, SESSION_CLEANUP_DELAY),
+            (RESUMABLE_UPLOAD_DIR, RESUMABLE_UPLOAD_EXPIRY),
+        ]
+        for parent, delay in defaults:
+            if not parent.exists():
+                continue
+            for entry in os.scandir(parent):
+                if not entry.is_dir() or entry.name.startswith("."):
+                    continue
+                # Uploads under it are scanned with their own expiry
+                if Path(entry.path) == RESUMABLE_UPLOAD_DIR:
+                    continue
+                key = self._key(Path(entry.path))
+                candidates[key] = indexed.get(key, entry.stat().st_mtime + delay)
+
+        # Anything scheduled before start() wins over what was on disk
+        candidates.update(self._expiry)
+        self._expiry = candidates
+        self._heap = [(t, k) for k, t in candidates.items()]
+        heapq.heapify(self._heap)
+        self._dirty = True
+
+        for digest in self.store.unreferenced():
+            detached = self.store.release(digest)
+            if detached:
+                shutil.rmtree(detached, ignore_errors=True)
+        shutil.rmtree(self.store.base_path / TRASH_DIRNAME, ignore_errors=True)
+
+
+# Global instance
+session_reaper = SessionReaper()
@@ -0,0 +1,258 @@
+"""Byte budget and LRU eviction for the upload store"""
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import asyncio
+import math
+import logging
+
+from fastapi import HTTPException
+
+from app.config import UPLOAD_QUOTA_BYTES, QUOTA_RETRY_AFTER, RESUMABLE_UPLOAD_DIR
+from app.utils.artifact_store import ArtifactStore, artifact_store
+from app.utils.session_reaper import SessionReaper, read_session_info, session_reaper, tree_size
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    """Bytes attributed to one tracked directory"""
+
+    __slots__ = ("own_bytes", "digest")
+
+    def __init__(self, own_bytes: int = 0, digest: Optional[str] = None):
+        self.own_bytes = own_bytes
+        self.digest = digest
+
+
+class StorageQuota:
+    """
+    Keeps the upload store under a byte budget
+
+    Usage is maintained incrementally: directories are added as they are
+    written and removed when the session reaper reports them gone. Blob
+    bytes are counted once no matter how many sessions reference them.
+    When a write would exceed the budget, least-recently-used directories
+    are evicted through the reaper; a 503 with Retry-After is returned only
+    when nothing is left to evict. Directories under ``pinned_dirs`` (uploads
+    still receiving chunks) count toward usage but are never evicted; the
+    reaper still expires them once they go idle.
+    """
+
+    def __init__(self, budget: int = UPLOAD_QUOTA_BYTES, reaper: SessionReaper = session_reaper,
+                 store: ArtifactStore = artifact_store, pinned_dirs: Iterable[Path] = (RESUMABLE_UPLOAD_DIR,)):
+        self.budget = budget
+        self.reaper = reaper
+        self.store = store
+        self._pinned_prefixes = tuple(reaper.key_for(path) + "/" for path in pinned_dirs)
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._blob_refs: Dict[str, int] = {}
+        self._blob_bytes: Dict[str, int] = {}
+        self._used = 0
+        self._reserved = 0
+        self._evictions = 0
+        self._evicted_bytes = 0
+        self._rejections = 0
+        self._lock = asyncio.Lock()
+        reaper.add_listener(self._forget)
+
+    @property
+    def used(self) -> int:
+        """Bytes currently attributed to stored directories and blobs"""
+        return self._used
+
+    def add(self, key: str, own_bytes: int = 0, digest: Optional[str] = None) -> None:
+        """
+        Start accounting for a directory
+
+        Args:
+            key: Reaper key of the directory
+            own_bytes: Bytes stored only in this directory
+            digest: Blob the directory references, if any
+        """
+        if key in self._entries:
+            self.grow(key, own_bytes)
+            return
+
+        self._entries[key] = _Entry(own_bytes, digest)
+        self._used += own_bytes
+        if digest:
+            refs = self._blob_refs.get(digest, 0)
+            if refs == 0:
+                blob_bytes = self._stat_blob(digest)
+                self._blob_bytes[digest] = blob_bytes
+                self._used += blob_bytes
+            self._blob_refs[digest] = refs + 1
+
+    def grow(self, key: str, nbytes: int) -> None:
+        """
+        Attribute additional private bytes to a tracked directory
+
+        Args:
+            key: Reaper key of the directory
+            nbytes: Bytes added
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.add(key, nbytes)
+            return
+        entry.own_bytes += nbytes
+        self._used += nbytes
+        self._entries.move_to_end(key)
+
+    def touch(self, key: str) -> None:
+        """
+        Mark a directory as recently used
+
+        Args:
+            key: Reaper key of the directory
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+
+    @asynccontextmanager
+    async def reservation(self, nbytes: int):
+        """
+        Hold room for a write of up to ``nbytes`` while it is in progress
+
+        Evicts least-recently-used directories if needed.
+
+        Args:
+            nbytes: Upper bound of bytes about to be written
+
+        Raises:
+            HTTPException: 503 with Retry-After when nothing can be evicted
+        """
+        await self.reserve(nbytes)
+        try:
+            yield
+        finally:
+            self.release_reservation(nbytes)
+
+    async def reserve(self, nbytes: int) -> None:
+        """
+        Reserve room for ``nbytes``; pair with ``release_reservation``
+
+        Args:
+            nbytes: Bytes to reserve
+
+        Raises:
+            HTTPException: 503 with Retry-After when nothing can be evicted
+        """
+        if self.budget <= 0:
+            self._reserved += nbytes
+            return
+
+        async with self._lock:
+            while self._used + self._reserved + nbytes > self.budget:
+                overflow = self._used + self._reserved + nbytes - self.budget
+                victims = self._pick_victims(overflow)
+                if not victims:
+                    self._rejections += 1
+                    raise HTTPException(
+                        status_code=503,
+                        detail="Upload storage is full, please retry later",
+                        headers={"Retry-After": str(self._retry_after())}
+                    )
+                before = self._used
+                await self.reaper.reap_now(victims)
+                for key in victims:
+                    # Entries the reaper no longer tracked are dropped here
+                    self._forget([key])
+                self._evictions += len(victims)
+                self._evicted_bytes += before - self._used
+                logger.info(f"Evicted {len(victims)} least-recently-used directories ({before - self._used} bytes)")
+            self._reserved += nbytes
+
+    def release_reservation(self, nbytes: int) -> None:
+        """
+        Return reserved room once the write has been accounted for
+
+        Args:
+            nbytes: Bytes previously reserved
+        """
+        self._reserved -= nbytes
+
+    def stats(self) -> dict:
+        """
+        Quota metrics
+
+        Returns:
+            dict: Budget, usage and eviction counters
+        """
+        return {
+            "budget_bytes": self.budget,
+            "used_bytes": self._used,
+            "reserved_bytes": self._reserved,
+            "tracked_directories": len(self._entries),
+            "stored_blobs": len(self._blob_refs),
+            "evictions": self._evictions,
+            "evicted_bytes": self._evicted_bytes,
+            "rejections": self._rejections,
+        }
+
+    async def rebuild(self) -> None:
+        """Seed usage from the directories the reaper tracks (once, at startup)"""
+        keys = [key for key in self.reaper.keys() if key not in self._entries]
+        sizes = await asyncio.to_thread(self._measure, keys)
+        for key, (own_bytes, digest) in sizes.items():
+            self.add(key, own_bytes, digest)
+        logger.info(f"Storage quota: {self._used} of {self.budget} bytes in use")
+
+    def _pick_victims(self, overflow: int) -> List[str]:
+        """Least-recently-used keys whose removal frees at least ``overflow`` bytes"""
+        victims = []
+        freed = 0
+        released: Dict[str, int] = {}
+        for key, entry in self._entries.items():
+            if freed >= overflow:
+                break
+            if key.startswith(self._pinned_prefixes):
+                continue
+            victims.append(key)
+            freed += entry.own_bytes
+            if entry.digest:
+                released[entry.digest] = released.get(entry.digest, 0) + 1
+                if released[entry.digest] == self._blob_refs.get(entry.digest):
+                    freed += self._blob_bytes.get(entry.digest, 0)
+        # Evicting is pointless if even everything evictable would not make room
+        return victims if freed >= overflow else []
+
+    def _forget(self, keys: List[str]) -> None:
+        for key in keys:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                continue
+            self._used -= entry.own_bytes
+            if entry.digest:
+                refs = self._blob_refs.get(entry.digest, 1) - 1
+                if refs <= 0:
+                    self._blob_refs.pop(entry.digest, None)
+                    self._used -= self._blob_bytes.pop(entry.digest, 0)
+                else:
+                    self._blob_refs[entry.digest] = refs
+
+    def _retry_after(self) -> int:
+        next_expiry = self.reaper.next_expiry_in()
+        if next_expiry is None:
+            return QUOTA_RETRY_AFTER
+        return max(1, min(QUOTA_RETRY_AFTER, math.ceil(next_expiry)))
+
+    def _stat_blob(self, digest: str) -> int:
+        try:
+            return self.store.blob_path(digest).stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _measure(self, keys: List[str]) -> Dict[str, tuple[int, Optional[str]]]:
+        """Private bytes and referenced blob per directory (runs in a worker thread)"""
+        sizes = {}
+        for key in keys:
+            path = self.reaper.base_path / key
+            sizes[key] = (tree_size(path), read_session_info(path).get("sha256"))
+        return sizes
+
+
+# Global instance
+storage_quota = StorageQuota()
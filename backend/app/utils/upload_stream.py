@@ -0,0 +1,268 @@
+"""Single-pass streaming upload pipeline for Java artifacts"""
+from pathlib import Path
+from typing import List, Optional
+import hashlib
+import time
+import logging
+
+import aiofiles
+from fastapi import HTTPException, Request
+from python_multipart import MultipartParser
+from python_multipart.multipart import parse_options_header
+
+from app.config import MAX_UPLOAD_SIZE
+from app.models.schemas import UploadStats
+from app.utils.security import (
+    ZIP_MAGIC,
+    sanitize_filename,
+    validate_content_type,
+    validate_filename,
+    validate_magic_number,
+    validate_size,
+)
+
+logger = logging.getLogger(__name__)
+
+# Allowance for multipart boundaries and part headers on top of the artifact itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class StreamingUploadSink:
+    """
+    Validates, hashes and writes an artifact as its bytes arrive
+
+    The sink is fed from synchronous parser callbacks; data is buffered
+    until the next ``flush()`` so that disk writes stay off the event loop.
+    """
+
+    def __init__(self, dest_dir: Path):
+        self.dest_dir = dest_dir
+        self.filename: Optional[str] = None
+        self.file_path: Optional[Path] = None
+        self.bytes_received = 0
+        self._hasher = hashlib.sha256()
+        self._header = b""
+        self._pending: List[bytes] = []
+        self._file = None
+        self._started_at = time.monotonic()
+        self._first_byte_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+
+    def begin(self, filename: Optional[str], content_type: Optional[str]) -> None:
+        """
+        Start a new artifact part, validating its declared metadata
+
+        Args:
+            filename: Client-supplied filename
+            content_type: Client-supplied part Content-Type
+        """
+        validate_filename(filename)
+        validate_content_type(content_type)
+        self.filename = filename
+        self.file_path = self.dest_dir / sanitize_filename(filename)
+
+    def feed(self, data: bytes) -> None:
+        """
+        Accept the next slice of artifact bytes
+
+        Args:
+            data: Raw bytes from the request body
+        """
+        if not data:
+            return
+        if self._first_byte_at is None:
+            self._first_byte_at = time.monotonic()
+
+        # Magic number check as soon as the first four bytes are in
+        if len(self._header) < len(ZIP_MAGIC):
+            self._header += data[:len(ZIP_MAGIC) - len(self._header)]
+            if len(self._header) == len(ZIP_MAGIC):
+                validate_magic_number(self._header)
+
+        self.bytes_received += len(data)
+        validate_size(self.bytes_received)
+
+        self._hasher.update(data)
+        self._pending.append(data)
+
+    async def flush(self) -> None:
+        """Write buffered bytes to the destination file"""
+        if not self._pending:
+            return
+        if self._file is None:
+            self._file = await aiofiles.open(self.file_path, 'wb')
+        data = b"".join(self._pending)
+        self._pending.clear()
+        await self._file.write(data)
+
+    async def finish(self) -> UploadStats:
+        """
+        Flush remaining data and close the destination file
+
+        Returns:
+            UploadStats: Transfer statistics for the artifact
+        """
+        if len(self._header) < len(ZIP_MAGIC):
+            validate_magic_number(self._header)
+        await self.flush()
+        await self.close()
+        self._finished_at = time.monotonic()
+        return self.stats()
+
+    async def close(self) -> None:
+        """Close the destination file if it was opened"""
+        if self._file is not None:
+            await self._file.close()
+            self._file = None
+
+    def stats(self) -> UploadStats:
+        """Build transfer statistics from the timings recorded so far"""
+        end = self._finished_at or time.monotonic()
+        duration = end - self._started_at
+        ttfb = None
+        if self._first_byte_at is not None:
+            ttfb = round(self._first_byte_at - self._started_at, 6)
+        return UploadStats(
+            bytes_received=self.bytes_received,
+            sha256=self._hasher.hexdigest(),
+            duration_seconds=round(duration, 6),
+            bytes_per_second=round(self.bytes_received / duration, 2) if duration > 0 else 0.0,
+            time_to_first_byte=ttfb
+        )
+
+
+class _MultipartArtifactReader:
+    """Drives a multipart parser and routes the artifact part into a sink"""
+
+    def __init__(self, sink: StreamingUploadSink, field_name: str):
+        self.sink = sink
+        self.field_name = field_name
+        self.found = False
+        self._in_artifact = False
+        self._header_name = b""
+        self._header_value = b""
+        self._headers: dict = {}
+
+    def on_part_begin(self) -> None:
+        self._headers = {}
+        self._in_artifact = False
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self._headers[self._header_name.lower()] = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", errors="replace")
+        if name != self.field_name or b"filename" not in options:
+            return
+        if self.found:
+            raise HTTPException(status_code=400, detail="Only one artifact may be uploaded per request")
+
+        self.found = True
+        self._in_artifact = True
+        filename = options[b"filename"].decode("utf-8", errors="replace")
+        content_type = self._headers.get(b"content-type", b"").decode("latin-1") or None
+        self.sink.begin(filename, content_type)
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_artifact:
+            self.sink.feed(data[start:end])
+
+    def on_part_end(self) -> None:
+        self._in_artifact = False
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+
+def check_content_length(request: Request) -> Optional[int]:
+    """
+    Reject oversized uploads before reading the body
+
+    Args:
+        request: Incoming request
+
+    Returns:
+        Optional[int]: Declared Content-Length, if any
+
+    Raises:
+        HTTPException: If the declared length cannot fit under MAX_UPLOAD_SIZE
+    """
+    content_length = request.headers.get("content-length")
+    if content_length is None:
+        return None
+    try:
+        declared = int(content_length)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Content-Length header")
+
+    if declared > MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD:
+        validate_size(declared)
+    return declared
+
+
+async def receive_artifact(request: Request, dest_dir: Path, field_name: str = "file") -> StreamingUploadSink:
+    """
+    Stream a multipart artifact upload straight into ``dest_dir``
+
+    Extension, content type, magic number and size are validated while the
+    body is being received, and the SHA-256 digest is computed on the fly,
+    so the artifact is written to disk exactly once.
+
+    Args:
+        request: Incoming multipart/form-data request
+        dest_dir: Directory that receives the artifact
+        field_name: Form field carrying the artifact
+
+    Returns:
+        StreamingUploadSink: Finished sink with file path and stats
+
+    Raises:
+        HTTPException: If the request or artifact fails validation
+    """
+    check_content_length(request)
+
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=400, detail="Expected multipart/form-data upload")
+
+    sink = StreamingUploadSink(dest_dir)
+    reader = _MultipartArtifactReader(sink, field_name)
+    parser = MultipartParser(params[b"boundary"], reader.callbacks())
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            await sink.flush()
+        parser.finalize()
+
+        if not reader.found:
+            raise HTTPException(status_code=400, detail=f"Missing '{field_name}' file field")
+
+        stats = await sink.finish()
+    except BaseException:
+        await sink.close()
+        raise
+
+    logger.info(
+        f"Received {sink.filename}: {stats.bytes_received} bytes "
+        f"in {stats.duration_seconds:.2f}s ({stats.bytes_per_second / (1024 * 1024):.1f} MB/s, "
+        f"ttfb={stats.time_to_first_byte}s)"
+    )
+    return sink
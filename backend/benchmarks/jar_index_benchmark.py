@@ -0,0 +1,116 @@
+"""
+Benchmark JAR introspection: legacy rescans vs the single-pass JarIndex
+
+Builds synthetic Spring Boot fat JARs with 10k and 100k entries and times
+the manifest / fat-JAR / build-tool detection both ways. By default the
+archives carry no META-INF/maven metadata (as produced by Gradle), so the
+legacy scans cannot stop early; pass --maven for the best case.
+
+Usage (from the backend directory):
+    python -m benchmarks.jar_index_benchmark [--entries 10000 100000] [--repeat 5] [--maven]
+"""
+from pathlib import Path
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.file_analyzer import file_analyzer  # noqa: E402
+from app.services.jar_index import JarIndex  # noqa: E402
+
+MANIFEST = (
+    "Manifest-Version: 1.0\n"
+    "Main-Class: org.springframework.boot.loader.launch.JarLauncher\n"
+    "Start-Class: com.example.demo.DemoApplication\n"
+    "Spring-Boot-Version: 3.3.2\n"
+    "Build-Jdk-Spec: 17\n"
+    "\n"
+)
+
+
+def build_archive(path: Path, entries: int, maven: bool) -> None:
+    """Write a fat JAR with roughly ``entries`` stored (empty) entries"""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as jar:
+        jar.writestr("META-INF/MANIFEST.MF", MANIFEST)
+        jar.writestr("BOOT-INF/layers.idx", "")
+        libs = max(entries // 50, 1)
+        for i in range(libs):
+            jar.writestr(f"BOOT-INF/lib/dependency-{i}.jar", b"")
+        if maven:
+            jar.writestr("META-INF/maven/com.example/demo/pom.properties", "version=1.0\n")
+        for i in range(entries - libs - 3):
+            jar.writestr(f"BOOT-INF/classes/com/example/pkg{i // 200}/Class{i}.class", b"")
+
+
+def legacy_detect(jar: zipfile.ZipFile) -> tuple:
+    """The pre-index detection: one filelist scan plus namelist() lowercased twice"""
+    manifest_data = jar.read("META-INF/MANIFEST.MF").decode("utf-8")
+    manifest = {}
+    for line in manifest_data.split("\n"):
+        if ":" in line:
+            key, value = line.split(":", 1)
+            manifest[key.strip()] = value.strip()
+    fat_jar = "BOOT-INF" in [f.filename for f in jar.filelist]
+    files = jar.namelist()
+    if any("maven" in f.lower() for f in files):
+        build_tool = "maven"
+    elif any("gradle" in f.lower() for f in files):
+        build_tool = "gradle"
+    else:
+        build_tool = "jar"
+    return manifest.get("Start-Class"), fat_jar, build_tool
+
+
+def indexed_detect(jar: zipfile.ZipFile) -> tuple:
+    """Detection through the JarIndex, as FileAnalyzer does it"""
+    index = JarIndex.from_zip(jar)
+    manifest_info = file_analyzer._parse_manifest(index)
+    build_tool = file_analyzer._detect_java_build_tool(index, manifest_info)
+    return manifest_info.get("main_class"), manifest_info.get("fat_jar"), build_tool
+
+
+def time_it(fn, path: Path, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        # The central directory is parsed by ZipFile() itself in both cases
+        with zipfile.ZipFile(path) as jar:
+            start = time.perf_counter()
+            fn(jar)
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--maven", action="store_true", help="include META-INF/maven metadata")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'entries':>8}  {'legacy ms':>10}  {'index ms':>10}  {'open+index ms':>14}")
+        for entries in args.entries:
+            path = Path(tmp) / f"bench-{entries}.jar"
+            build_archive(path, entries, args.maven)
+
+            legacy = time_it(legacy_detect, path, args.repeat)
+            indexed = time_it(indexed_detect, path, args.repeat)
+            opened = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                with zipfile.ZipFile(path) as jar:
+                    indexed_detect(jar)
+                opened.append(time.perf_counter() - start)
+
+            print(
+                f"{entries:>8}  {statistics.median(legacy) * 1000:>10.1f}  "
+                f"{statistics.median(indexed) * 1000:>10.1f}  {statistics.median(opened) * 1000:>14.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark template cold start: compiling from source vs the compiled bundle
+
+Each sample runs in a fresh interpreter and times importing the template
+engine, then creating it and loading every registered template, which is
+what a new worker does before it reports ready. Three modes are compared:
+
+    source    no bytecode cache, every template lexed, parsed and compiled
+    bytecode  FileSystemBytecodeCache already populated by an earlier run
+    bundle    ModuleLoader over the ahead-of-time compiled bundle
+
+Usage (from the backend directory):
+    python -m benchmarks.template_startup_benchmark [--repeat 10]
+"""
+from pathlib import Path
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+SAMPLE = """
+import time
+started = time.perf_counter()
+from pathlib import Path
+from app.services.template_engine import TemplateEngine
+imported = time.perf_counter()
+mode, cache = "{mode}", Path("{cache}")
+engine = TemplateEngine(
+    bytecode_dir=cache / "jinja" if mode == "bytecode" else None,
+    bundle_path=cache / "templates.zip" if mode == "bundle" else None,
+)
+assert engine.loader_kind == ("bundle" if mode == "bundle" else "filesystem")
+engine._compile_all()
+print(imported - started, time.perf_counter() - imported)
+"""
+
+
+def sample(mode: str, cache: Path) -> tuple:
+    """Seconds spent importing and seconds spent loading every template"""
+    output = subprocess.run(
+        [sys.executable, "-c", SAMPLE.format(mode=mode, cache=cache)],
+        cwd=BACKEND_DIR, env={**os.environ, "PYTHONPATH": str(BACKEND_DIR)},
+        capture_output=True, text=True, check=True
+    ).stdout
+    import_seconds, load_seconds = output.strip().splitlines()[-1].split()
+    return float(import_seconds), float(load_seconds)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = Path(tmp)
+        subprocess.run(
+            [sys.executable, "-m", "app.services.template_bundle", "--output", str(cache / "templates.zip")],
+            cwd=BACKEND_DIR, check=True, capture_output=True
+        )
+        # Populate the bytecode cache once
+        sample("bytecode", cache)
+
+        print(f"{'mode':>8}  {'import ms':>10}  {'load ms':>8}  {'total ms':>9}")
+        for mode in ("source", "bytecode", "bundle"):
+            timings = [sample(mode, cache) for _ in range(args.repeat)]
+            imports = statistics.median(t[0] for t in timings) * 1000
+            loads = statistics.median(t[1] for t in timings) * 1000
+            totals = statistics.median(t[0] + t[1] for t in timings) * 1000
+            print(f"{mode:>8}  {imports:>10.1f}  {loads:>8.1f}  {totals:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Concurrent analysis of large uploads through the shared worker pool"""
+import asyncio
+import io
+import os
+import zipfile
+
+import pytest
+
+from app.services.file_analyzer import file_analyzer
+from app.utils.process_pool import analysis_pool
+
+# Above every *_PARALLEL_MIN_BYTES threshold, so each scan is split into parts
+LARGE_ARCHIVE_BYTES = 21 * 1024 * 1024
+
+
+def _nested_jar(artifact: str, version: str) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as jar:
+        jar.writestr("META-INF/MANIFEST.MF", "Manifest-Version: 1.0\n")
+        jar.writestr(
+            f"META-INF/maven/org.example/{artifact}/pom.properties",
+            f"groupId=org.example\nartifactId={artifact}\nversion={version}\n"
+        )
+        jar.writestr("org/example/Lib.class", b"\xca\xfe\xba\xbe java/sql/Connection")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def large_boot_jar(tmp_path):
+    path = tmp_path / "app.jar"
+    with zipfile.ZipFile(path, "w") as jar:
+        jar.writestr(
+            "META-INF/MANIFEST.MF",
+            "Manifest-Version: 1.0\n"
+            "Main-Class: org.springframework.boot.loader.launch.JarLauncher\n"
+            "Start-Class: com.example.App\n"
+            "Spring-Boot-Version: 3.3.2\n"
+        )
+        jar.writestr("BOOT-INF/classes/com/example/App.class", b"\xca\xfe\xba\xbe java/lang/Object")
+        for index in range(8):
+            jar.writestr(f"BOOT-INF/lib/lib{index}-1.0.jar", _nested_jar(f"lib{index}", "1.0"))
+        # Incompressible filler pushes the archive past the split thresholds
+        jar.writestr("BOOT-INF/classes/static/blob.bin", os.urandom(LARGE_ARCHIVE_BYTES))
+    return path
+
+
+@pytest.fixture
+def production_sized_pool(monkeypatch):
+    """The global pool sized as on a 4-CPU host, whatever this machine has"""
+    analysis_pool.shutdown()
+    monkeypatch.setattr(analysis_pool, "max_workers", 4)
+    monkeypatch.setattr(analysis_pool, "max_queue", 16)
+    yield analysis_pool
+    analysis_pool.shutdown()
+
+
+def test_two_large_uploads_are_analyzed_concurrently(large_boot_jar, production_sized_pool):
+    async def analyze_twice():
+        return await asyncio.gather(
+            file_analyzer.inspect_java_artifact(large_boot_jar),
+            file_analyzer.inspect_java_artifact(large_boot_jar),
+        )
+
+    results = asyncio.run(analyze_twice())
+
+    for project_info, report in results:
+        assert report.valid and report.complete
+        assert project_info.metadata["spring_boot_version"] == "3.3.2"
+        assert project_info.metadata["jdk_modules"] == "java.base,java.sql"
+    assert production_sized_pool.stats()["rejected"] == 0
+
+
+def test_split_scans_share_the_workers(production_sized_pool):
+    assert production_sized_pool.parts_for(LARGE_ARCHIVE_BYTES, 16 * 1024 * 1024) == 2
+    assert production_sized_pool.parts_for(1024, 16 * 1024 * 1024) == 1
@@ -2,6 +2,7 @@
 let currentLanguage = null;
 let currentSessionId = null;
 let currentJarFileName = null;
+let currentJarSettings = {};
 let editor = null;
 let pipelineEditor = null;
 let cachedPipelineScript = null;
@@ -162,6 +163,7 @@ function resetInputFields() {
   document.getElementById('javaStartCommand').value = '';
   document.getElementById('jarFile').value = '';
   currentJarFileName = null;
+  currentJarSettings = {};
 
   // Common optional fields
   document.getElementById('envVars').value = '';
@@ -291,6 +293,13 @@ async function uploadJavaFile(file) {
     const data = await response.json();
     currentSessionId = data.session_id;
     currentJarFileName = file.name;
+    currentJarSettings = jarSettingsFromAnalysis(data.project_info);
+
+    // Spring Boot Actuator found among the nested dependencies
+    const stacks = (data.project_info.metadata.stacks || '').split(',');
+    if (stacks.includes('actuator')) {
+      document.getElementById('healthCheck').value = '/actuator/health';
+    }
 
     showAlert('Jar 파일 확인 완료', 'success');
     console.log('Analysis result:', data.project_info);
@@ -302,6 +311,37 @@ async function uploadJavaFile(file) {
   }
 }
 
+// Layered Spring Boot JAR settings detected at upload
+function jarLayoutFromAnalysis(projectInfo) {
+  const metadata = (projectInfo && projectInfo.metadata) || {};
+  if (metadata.layered !== 'True') return { layered: false };
+
+  return {
+    layered: true,
+    jar_layers: metadata.jar_layers ? metadata.jar_layers.split(',') : null,
+    layer_tool: metadata.layer_tool || null,
+    launcher_class: metadata.launcher_class || null,
+  };
+}
+
+// Settings detected at upload, forwarded in the config since the generator only sees the config
+function jarSettingsFromAnalysis(projectInfo) {
+  const metadata = (projectInfo && projectInfo.metadata) || {};
+  const settings = {
+    ...jarLayoutFromAnalysis(projectInfo),
+    spring_boot_version: metadata.spring_boot_version || null,
+    web_stack: metadata.web_stack || '',
+    embedded_server: metadata.embedded_server || '',
+    jdk_modules: metadata.jdk_modules ? metadata.jdk_modules.split(',') : null,
+    jdk_modules_complete: metadata.jdk_modules_complete !== 'False',
+  };
+
+  // Native builds of a pre-built JAR need these, so they are only sent once known
+  if ('aot_processed' in metadata) settings.aot_processed = metadata.aot_processed === 'True';
+  if ('native_issues' in metadata) settings.native_issues = metadata.native_issues;
+  return settings;
+}
+
 // Parse environment variables
 function parseEnvVars(envText) {
   const envVars = {};
@@ -473,7 +513,7 @@ async function generateDockerfile() {
       // JAR file (already uploaded)
       config.build_tool = 'jar';
       config.jar_file_name = currentJarFileName || 'app.jar';
-      config.jvm_options = '-Xmx512m';
+      Object.assign(config, currentJarSettings);
     }
 
     // Make API request
@@ -744,7 +784,7 @@ function getCurrentDockerConfig() {
       custom_start_command: document.getElementById('javaStartCommand').value,
       build_tool: 'jar',
       jar_file_name: currentJarFileName || 'app.jar',
-      jvm_options: '-Xmx512m',
+      ...currentJarSettings,
     };
 
     return config;